@@ -0,0 +1,69 @@
+"""
+Achievement rules for AnchorOS.
+ACHIEVEMENT_RULES declares every achievement as a counter and a threshold. unlock_earned() starts
+from the cached list of still-locked achievements (unlocked ones are never looked at again),
+loads only the counters those rules need, from cache where possible, and unlocks everything
+earned with one bulk update.
+"""
+
+import timezone as tz
+from db_supabase import Achievement, OutreachLog, Lead, parallel_queries
+from cache import cached
+
+# Achievement key -> (counter, threshold)
+ACHIEVEMENT_RULES = {
+    'streak_7': ('outreach_streak', 7),
+    'streak_30': ('outreach_streak', 30),
+    'xp_1000': ('xp', 1000),
+    'xp_5000': ('xp', 5000),
+    'outreach_100': ('outreach_total', 100),
+    'deals_10': ('deals_won', 10),
+}
+
+
+@cached(ttl=3600, tables=('achievements',))
+def locked_achievements():
+    """(id, key) of achievements not unlocked yet that have a rule."""
+    rows = Achievement.query_all(columns=['id', 'key', 'unlocked_at'])
+    return [(a.id, a.key) for a in rows if not getattr(a, 'unlocked_at', None) and a.key in ACHIEVEMENT_RULES]
+
+
+@cached(ttl=300, tables=('outreach_logs',))
+def outreach_total():
+    return OutreachLog.count()
+
+
+@cached(ttl=300, tables=('leads',))
+def deals_won():
+    return Lead.count({'status': 'closed_won'})
+
+
+# Counters that callers don't pass in; loaded only while a locked rule still needs them
+COUNTER_LOADERS = {
+    'outreach_total': outreach_total,
+    'deals_won': deals_won,
+}
+
+
+def unlock_earned(counters):
+    """
+    Unlocks every locked achievement whose threshold is met. `counters` holds the values the
+    caller already has (xp, outreach_streak); the rest come from COUNTER_LOADERS.
+    Returns the unlocked achievement keys.
+    """
+    locked = locked_achievements()
+    if not locked:
+        return []
+
+    values = dict(counters)
+    needed = {ACHIEVEMENT_RULES[key][0] for _, key in locked} - set(values)
+    if needed:
+        with parallel_queries() as q:
+            loaded = {name: q.submit(COUNTER_LOADERS[name]) for name in needed if name in COUNTER_LOADERS}
+        values.update({name: future.result() for name, future in loaded.items()})
+
+    earned = [(id, key) for id, key in locked
+              if (values.get(ACHIEVEMENT_RULES[key][0]) or 0) >= ACHIEVEMENT_RULES[key][1]]
+    if earned:
+        Achievement.update_many([id for id, _ in earned], {'unlocked_at': tz.now_iso()})
+    return [key for _, key in earned]
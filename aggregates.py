@@ -0,0 +1,161 @@
+"""
+Date-bucketed aggregates for AnchorOS analytics.
+Each series is produced by one Postgres function (see the "Analytics aggregates" section of
+supabase_schema.sql) called via client.rpc, so a 12-bucket chart is one round trip instead of
+twelve. Every function has a pure-Python fallback over the raw rows that returns the same
+result; it is used when the database function is missing (or DB_AGGREGATE_RPC=0) and can be
+forced with use_rpc=False to check the two for equivalence (see compare_aggregates()).
+Fallbacks read their rows a page at a time, so PostgREST's 1000-row cap can't truncate them.
+"""
+
+import os
+import logging
+from datetime import timedelta
+from db_supabase import get_supabase, select_all, is_missing_function, round_money
+from cache import cached
+from revenue import RevenueSeries
+from timezone import add_months, parse_date_only
+
+logger = logging.getLogger(__name__)
+
+# RPCs found missing (schema not migrated yet); later calls go straight to the fallback
+_unavailable_rpcs = set()
+
+
+def week_buckets(start, weeks):
+    return [start + timedelta(weeks=i) for i in range(weeks)]
+
+
+def month_buckets(start, months):
+    return [add_months(start, i) for i in range(months)]
+
+
+def _rpc(fn, params):
+    """Returns the RPC's rows, or None if it is disabled or unavailable."""
+    if os.environ.get('DB_AGGREGATE_RPC', '1') == '0' or fn in _unavailable_rpcs:
+        return None
+    try:
+        return get_supabase().rpc(fn, params).execute().data or []
+    except Exception as e:
+        if is_missing_function(e):
+            _unavailable_rpcs.add(fn)
+            logger.warning(f"[Aggregates] {fn} not installed, using Python fallback (run the schema migration): {e}")
+        else:
+            # Timeouts and server errors: fall back for this call only and retry the RPC next time
+            logger.warning(f"[Aggregates] {fn} failed, using Python fallback for this call: {e}")
+        return None
+
+
+def _by_bucket(rows, buckets, column, cast=int):
+    values = {parse_date_only(row.get('bucket_start')): row.get(column) for row in rows}
+    return [cast(values.get(b) or 0) for b in buckets]
+
+
+@cached(ttl=60, tables=('outreach_logs',))
+def weekly_outreach_counts(start, weeks, use_rpc=True):
+    """Outreach logs per week for `weeks` weeks starting on `start` (a Monday)."""
+    buckets = week_buckets(start, weeks)
+    rows = _rpc('analytics_weekly_outreach', {'p_start': start.isoformat(), 'p_weeks': weeks}) if use_rpc else None
+    if rows is not None:
+        return _by_bucket(rows, buckets, 'outreach_count')
+
+    end = start + timedelta(weeks=weeks)
+    client = get_supabase()
+    rows = select_all(lambda: client.table('outreach_logs').select('date').gte('date', start.isoformat()).lt('date', end.isoformat()))
+    counts = [0] * weeks
+    for row in rows:
+        d = parse_date_only(row.get('date'))
+        if d and start <= d < end:
+            counts[(d - start).days // 7] += 1
+    return counts
+
+
+@cached(ttl=60, tables=('leads',))
+def weekly_deal_counts(start, weeks, niche=None, source=None, use_rpc=True):
+    """Leads marked closed_won per week (by updated_at), optionally filtered by niche/source."""
+    buckets = week_buckets(start, weeks)
+    params = {'p_start': start.isoformat(), 'p_weeks': weeks, 'p_niche': niche or None, 'p_source': source or None}
+    rows = _rpc('analytics_weekly_deals', params) if use_rpc else None
+    if rows is not None:
+        return _by_bucket(rows, buckets, 'deal_count')
+
+    end = start + timedelta(weeks=weeks)
+    client = get_supabase()
+    
+    def query():
+        q = client.table('leads').select('updated_at').eq('status', 'closed_won').gte('updated_at', f'{start.isoformat()}T00:00:00').lt('updated_at', f'{end.isoformat()}T00:00:00')
+        if niche:
+            q = q.eq('niche', niche)
+        if source:
+            q = q.eq('source', source)
+        return q
+    counts = [0] * weeks
+    for row in select_all(query):
+        d = parse_date_only(row.get('updated_at'))
+        if d and start <= d < end:
+            counts[(d - start).days // 7] += 1
+    return counts
+
+
+@cached(ttl=60, tables=('clients', 'freelance_jobs'))
+def monthly_revenue_series(start, months, use_rpc=True):
+    """
+    Per calendar month from `start`: project revenue (clients by start_date), freelance revenue,
+    and hosting/SaaS MRR of active clients that had started by the end of the month.
+    Returns a dict of equally long lists keyed project_revenue, freelance_revenue, hosting_mrr, saas_mrr.
+    """
+    buckets = month_buckets(start, months)
+    series = ('project_revenue', 'freelance_revenue', 'hosting_mrr', 'saas_mrr')
+    rows = _rpc('analytics_monthly_revenue', {'p_start': start.isoformat(), 'p_months': months}) if use_rpc else None
+    if rows is not None:
+        return {name: _by_bucket(rows, buckets, name, round_money) for name in series}
+
+    end = add_months(start, months)
+    client = get_supabase()
+    clients = select_all(lambda: client.table('clients').select('start_date,amount_charged,hosting_active,monthly_hosting_fee,saas_active,monthly_saas_fee').lt('start_date', end.isoformat()))
+    jobs = select_all(lambda: client.table('freelance_jobs').select('date_completed,amount').gte('date_completed', start.isoformat()).lt('date_completed', end.isoformat()))
+    result = RevenueSeries(clients, jobs).series(start, months)
+    return {name: result[name] for name in series}
+
+
+@cached(ttl=60, tables=('leads',))
+def lead_pipeline_counts(niche=None, source=None, use_rpc=True):
+    """Open (unconverted) leads per status, optionally filtered by niche/source."""
+    rows = _rpc('analytics_lead_pipeline', {'p_niche': niche or None, 'p_source': source or None}) if use_rpc else None
+    if rows is not None:
+        return {row['status']: int(row['lead_count']) for row in rows if row.get('status')}
+
+    client = get_supabase()
+    
+    def query():
+        q = client.table('leads').select('status').is_('converted_at', 'null')
+        if niche:
+            q = q.eq('niche', niche)
+        if source:
+            q = q.eq('source', source)
+        return q
+    counts = {}
+    for row in select_all(query):
+        status = row.get('status')
+        if status:
+            counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def compare_aggregates(week_start, month_start, weeks=12, months=12):
+    """
+    Computes every series via RPC and via the Python fallback and returns the ones that differ
+    as {name: (rpc_result, python_result)}. An empty dict means the two agree.
+    """
+    checks = {
+        'weekly_outreach_counts': lambda rpc: weekly_outreach_counts.uncached(week_start, weeks, use_rpc=rpc),
+        'weekly_deal_counts': lambda rpc: weekly_deal_counts.uncached(week_start, weeks, use_rpc=rpc),
+        'monthly_revenue_series': lambda rpc: monthly_revenue_series.uncached(month_start, months, use_rpc=rpc),
+        'lead_pipeline_counts': lambda rpc: lead_pipeline_counts.uncached(use_rpc=rpc),
+    }
+    mismatches = {}
+    for name, compute in checks.items():
+        via_rpc, via_python = compute(True), compute(False)
+        if via_rpc != via_python:
+            mismatches[name] = (via_rpc, via_python)
+    return mismatches
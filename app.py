@@ -66,6 +66,24 @@ def create_app():
     app.register_blueprint(freelancing_bp)
     app.register_blueprint(mobile_bp)
     
+    from db_instrumentation import init_app as init_db_instrumentation
+    init_db_instrumentation(app)
+    
+    from metrics import init_app as init_metrics
+    init_metrics(app)
+    
+    from scheduler import init_app as init_scheduler
+    init_scheduler(app)
+    
+    from seeds import init_app as init_seeds
+    init_seeds(app)
+    
+    from search_index import init_app as init_search_index
+    init_search_index(app)
+    
+    from name_index import init_app as init_name_index
+    init_name_index(app)
+    
     def is_mobile_device():
         user_agent = request.headers.get('User-Agent', '').lower()
         mobile_keywords = ['mobile', 'android', 'iphone', 'ipad', 'ipod', 'blackberry', 'windows phone']
@@ -77,7 +95,7 @@ def create_app():
     
     @app.before_request
     def require_login():
-        allowed_routes = ['auth.login', 'static', 'internal.run_daily_summary', 'health_check']
+        allowed_routes = ['auth.login', 'static', 'internal.run_daily_summary', 'internal.cache_stats', 'health_check']
         if request.endpoint and request.endpoint not in allowed_routes:
             if not session.get('authenticated'):
                 return redirect(url_for('auth.login'))
@@ -1,8 +1,11 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
-from db_supabase import get_supabase, UserSettings
+from db_supabase import get_supabase, parallel_queries, UserSettings
+from aggregates import (add_months, month_buckets, week_buckets, weekly_outreach_counts,
+                        weekly_deal_counts, monthly_revenue_series, lead_pipeline_counts)
 from datetime import datetime, date, timedelta
 import timezone as tz
-from decimal import Decimal
+import metrics
+from revenue import RevenueSeries
 import json
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
@@ -44,101 +47,61 @@ def index():
     else:
         end_date = today
     
-    niches_result = client.table('leads').select('niche').filter('niche', 'not.is', 'null').neq('niche', '').execute()
+    first_month = add_months(today, -11)
+    first_week = get_week_start(today) - timedelta(weeks=11)
+    
+    month_start = today.replace(day=1)
+    
+    # Every query below is independent, so they run concurrently and are combined afterwards
+    with parallel_queries() as q:
+        niches_future = q.submit(client.table('leads').select('niche').filter('niche', 'not.is', 'null').neq('niche', ''))
+        sources_future = q.submit(client.table('leads').select('source').filter('source', 'not.is', 'null').neq('source', ''))
+        followup_today_future = q.submit(client.table('leads').select('id', count='exact').eq('next_action_date', today.isoformat()).filter('status', 'not.in', '("closed_won","closed_lost")').is_('converted_at', 'null'))
+        followup_overdue_future = q.submit(client.table('leads').select('id', count='exact').lt('next_action_date', today.isoformat()).filter('status', 'not.in', '("closed_won","closed_lost")').is_('converted_at', 'null'))
+        
+        # Bucketed series come back whole from one RPC each (see aggregates.py)
+        revenue_future = q.submit(monthly_revenue_series, first_month, 12)
+        outreach_weekly_future = q.submit(weekly_outreach_counts, first_week, 12)
+        deals_weekly_future = q.submit(weekly_deal_counts, first_week, 12, niche_filter, source_filter)
+        pipeline_future = q.submit(lead_pipeline_counts, niche_filter, source_filter)
+        
+        won_leads_future = q.submit(client.table('leads').select('close_reason').eq('status', 'closed_won').filter('close_reason', 'not.is', 'null').neq('close_reason', ''))
+        lost_leads_future = q.submit(client.table('leads').select('close_reason').eq('status', 'closed_lost').filter('close_reason', 'not.is', 'null').neq('close_reason', ''))
+        
+        # This month's figures from the daily rollup (deals have no upper bound, the rest end today)
+        this_month_future = q.submit(metrics.daily, month_start,
+                                     tables=('clients', 'freelance_jobs', 'outreach_logs', 'leads'))
+    
+    niches_result = niches_future.result()
     niches = list(set([n['niche'] for n in niches_result.data if n.get('niche')]))
     
-    sources_result = client.table('leads').select('source').filter('source', 'not.is', 'null').neq('source', '').execute()
+    sources_result = sources_future.result()
     sources = list(set([s['source'] for s in sources_result.data if s.get('source')]))
     
-    followup_today_result = client.table('leads').select('id', count='exact').eq('next_action_date', today.isoformat()).filter('status', 'not.in', '("closed_won","closed_lost")').is_('converted_at', 'null').execute()
+    followup_today_result = followup_today_future.result()
     followup_today = followup_today_result.count if followup_today_result.count else len(followup_today_result.data)
     
-    followup_overdue_result = client.table('leads').select('id', count='exact').lt('next_action_date', today.isoformat()).filter('status', 'not.in', '("closed_won","closed_lost")').is_('converted_at', 'null').execute()
+    followup_overdue_result = followup_overdue_future.result()
     followup_overdue = followup_overdue_result.count if followup_overdue_result.count else len(followup_overdue_result.data)
     
-    monthly_revenue_data = []
-    monthly_freelance_data = []
-    monthly_total_revenue_data = []
-    month_labels = []
+    revenue = revenue_future.result()
+    month_labels = [m.strftime('%b %Y') for m in month_buckets(first_month, 12)]
+    monthly_revenue_data = revenue['project_revenue']
+    monthly_freelance_data = revenue['freelance_revenue']
+    hosting_mrr_data = revenue['hosting_mrr']
+    saas_mrr_data = revenue['saas_mrr']
+    total_mrr_data = [h + s for h, s in zip(hosting_mrr_data, saas_mrr_data)]
+    monthly_total_revenue_data = [r + m + f for r, m, f in zip(monthly_revenue_data, total_mrr_data, monthly_freelance_data)]
     
-    for i in range(11, -1, -1):
-        m_start = (today.replace(day=1) - timedelta(days=i*30)).replace(day=1)
-        if m_start.month == 12:
-            m_end = m_start.replace(year=m_start.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            m_end = m_start.replace(month=m_start.month + 1, day=1) - timedelta(days=1)
-        
-        month_labels.append(m_start.strftime('%b %Y'))
-        
-        revenue_result = client.table('clients').select('amount_charged').gte('start_date', m_start.isoformat()).lte('start_date', m_end.isoformat()).execute()
-        month_revenue = sum(float(r.get('amount_charged') or 0) for r in revenue_result.data)
-        
-        freelance_result = client.table('freelance_jobs').select('amount').gte('date_completed', m_start.isoformat()).lte('date_completed', m_end.isoformat()).execute()
-        month_freelance = sum(float(r.get('amount') or 0) for r in freelance_result.data)
-        
-        monthly_revenue_data.append(float(month_revenue))
-        monthly_freelance_data.append(float(month_freelance))
+    week_labels = [w.strftime('%b %d') for w in week_buckets(first_week, 12)]
+    outreach_weekly_data = outreach_weekly_future.result()
+    deals_weekly_data = deals_weekly_future.result()
     
-    hosting_mrr_data = []
-    saas_mrr_data = []
-    total_mrr_data = []
-    
-    for i in range(11, -1, -1):
-        m_start = (today.replace(day=1) - timedelta(days=i*30)).replace(day=1)
-        if m_start.month == 12:
-            m_end = m_start.replace(year=m_start.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            m_end = m_start.replace(month=m_start.month + 1, day=1) - timedelta(days=1)
-        
-        hosting_result = client.table('clients').select('monthly_hosting_fee').eq('hosting_active', True).lte('start_date', m_end.isoformat()).execute()
-        hosting_at_month = sum(float(r.get('monthly_hosting_fee') or 0) for r in hosting_result.data)
-        
-        saas_result = client.table('clients').select('monthly_saas_fee').eq('saas_active', True).lte('start_date', m_end.isoformat()).execute()
-        saas_at_month = sum(float(r.get('monthly_saas_fee') or 0) for r in saas_result.data)
-        
-        hosting_mrr_data.append(float(hosting_at_month))
-        saas_mrr_data.append(float(saas_at_month))
-        total_mrr_data.append(float(hosting_at_month + saas_at_month))
-    
-    for i in range(12):
-        monthly_total_revenue_data.append(
-            monthly_revenue_data[i] + total_mrr_data[i] + monthly_freelance_data[i]
-        )
-    
-    outreach_weekly_data = []
-    deals_weekly_data = []
-    week_labels = []
-    
-    for i in range(11, -1, -1):
-        w_start = get_week_start(today) - timedelta(weeks=i)
-        w_end = w_start + timedelta(days=6)
-        
-        week_labels.append(w_start.strftime('%b %d'))
-        
-        outreach_result = client.table('outreach_logs').select('id', count='exact').gte('date', w_start.isoformat()).lte('date', w_end.isoformat()).execute()
-        outreach_weekly_data.append(outreach_result.count if outreach_result.count else len(outreach_result.data))
-        
-        deals_query = client.table('leads').select('id', count='exact').eq('status', 'closed_won').gte('updated_at', f'{w_start.isoformat()}T00:00:00').lte('updated_at', f'{w_end.isoformat()}T23:59:59')
-        if niche_filter:
-            deals_query = deals_query.eq('niche', niche_filter)
-        if source_filter:
-            deals_query = deals_query.eq('source', source_filter)
-        deals_result = deals_query.execute()
-        deals_weekly_data.append(deals_result.count if deals_result.count else len(deals_result.data))
-    
-    lead_pipeline = {}
-    for status in status_choices():
-        query = client.table('leads').select('id', count='exact').eq('status', status).is_('converted_at', 'null')
-        if niche_filter:
-            query = query.eq('niche', niche_filter)
-        if source_filter:
-            query = query.eq('source', source_filter)
-        result = query.execute()
-        lead_pipeline[status] = result.count if result.count else len(result.data)
+    pipeline_counts = pipeline_future.result()
+    lead_pipeline = {status: pipeline_counts.get(status, 0) for status in status_choices()}
     
     win_reasons_count = {}
-    won_leads_result = client.table('leads').select('close_reason').eq('status', 'closed_won').filter('close_reason', 'not.is', 'null').neq('close_reason', '').execute()
-    for lead in won_leads_result.data:
+    for lead in won_leads_future.result().data:
         close_reason = lead.get('close_reason', '')
         if close_reason:
             for reason in close_reason.split(','):
@@ -147,8 +110,7 @@ def index():
                 win_reasons_count[reason_key] = win_reasons_count.get(reason_key, 0) + 1
     
     loss_reasons_count = {}
-    lost_leads_result = client.table('leads').select('close_reason').eq('status', 'closed_lost').filter('close_reason', 'not.is', 'null').neq('close_reason', '').execute()
-    for lead in lost_leads_result.data:
+    for lead in lost_leads_future.result().data:
         close_reason = lead.get('close_reason', '')
         if close_reason:
             for reason in close_reason.split(','):
@@ -165,24 +127,13 @@ def index():
     forecast_monthly = current_mrr + avg_project_revenue
     forecast_3_months = forecast_monthly * 3
     
-    month_start = today.replace(day=1)
-    this_month_revenue_result = client.table('clients').select('amount_charged').gte('start_date', month_start.isoformat()).lte('start_date', today.isoformat()).execute()
-    this_month_project_revenue = sum(float(r.get('amount_charged') or 0) for r in this_month_revenue_result.data)
-    
-    this_month_freelance_result = client.table('freelance_jobs').select('amount').gte('date_completed', month_start.isoformat()).lte('date_completed', today.isoformat()).execute()
-    this_month_freelance_revenue = sum(float(r.get('amount') or 0) for r in this_month_freelance_result.data)
-    
-    this_month_clients_result = client.table('clients').select('id', count='exact').gte('start_date', month_start.isoformat()).lte('start_date', today.isoformat()).execute()
-    this_month_new_clients = this_month_clients_result.count if this_month_clients_result.count else len(this_month_clients_result.data)
-    
-    this_month_outreach_result = client.table('outreach_logs').select('id', count='exact').gte('date', month_start.isoformat()).lte('date', today.isoformat()).execute()
-    this_month_outreach = this_month_outreach_result.count if this_month_outreach_result.count else len(this_month_outreach_result.data)
-    
-    this_month_deals_result = client.table('leads').select('id', count='exact').eq('status', 'closed_won').gte('closed_at', f'{month_start.isoformat()}T00:00:00').execute()
-    this_month_deals = this_month_deals_result.count if this_month_deals_result.count else len(this_month_deals_result.data)
-    
-    this_month_leads_result = client.table('leads').select('id', count='exact').gte('created_at', f'{month_start.isoformat()}T00:00:00').lte('created_at', f'{today.isoformat()}T23:59:59').execute()
-    this_month_new_leads = this_month_leads_result.count if this_month_leads_result.count else len(this_month_leads_result.data)
+    this_month = this_month_future.result()
+    this_month_project_revenue = float(metrics.total(this_month, 'project_revenue', end=today))
+    this_month_freelance_revenue = float(metrics.total(this_month, 'freelance_revenue', end=today))
+    this_month_new_clients = metrics.total(this_month, 'clients_started', end=today)
+    this_month_outreach = metrics.total(this_month, 'outreach_count', end=today)
+    this_month_deals = metrics.total(this_month, 'deals_won')
+    this_month_new_leads = metrics.total(this_month, 'leads_created', end=today)
     
     this_month_total_revenue = this_month_project_revenue + current_mrr + this_month_freelance_revenue
     this_month_name = today.strftime('%B %Y')
@@ -268,32 +219,15 @@ def flex():
     client = get_supabase()
     today = tz.today()
     
-    total_revenue_result = client.table('clients').select('amount_charged').execute()
-    total_revenue = sum(float(r.get('amount_charged') or 0) for r in total_revenue_result.data)
-    
     month_start = today.replace(day=1)
-    current_month_result = client.table('clients').select('amount_charged').gte('start_date', month_start.isoformat()).lte('start_date', today.isoformat()).execute()
-    current_month_revenue = sum(float(r.get('amount_charged') or 0) for r in current_month_result.data)
-    
-    last_3_months = []
-    for i in range(2, -1, -1):
-        if i == 0:
-            m_start = today.replace(day=1)
-            m_end = today
-        else:
-            m_start = (today.replace(day=1) - timedelta(days=i*30)).replace(day=1)
-            if m_start.month == 12:
-                m_end = m_start.replace(year=m_start.year + 1, month=1, day=1) - timedelta(days=1)
-            else:
-                m_end = m_start.replace(month=m_start.month + 1, day=1) - timedelta(days=1)
-        
-        month_result = client.table('clients').select('amount_charged').gte('start_date', m_start.isoformat()).lte('start_date', m_end.isoformat()).execute()
-        month_rev = sum(float(r.get('amount_charged') or 0) for r in month_result.data)
-        
-        last_3_months.append({
-            'label': m_start.strftime('%b %Y'),
-            'amount': float(month_rev)
-        })
+    clients_data = client.table('clients').select('amount_charged,start_date').execute().data
+    revenue = RevenueSeries(clients_data)
+    total_revenue = revenue.totals()['project_revenue']
+    
+    recent = revenue.series(add_months(today, -2), 3)
+    current_month_revenue = recent['project_revenue'][-1]
+    last_3_months = [{'label': label, 'amount': amount}
+                     for label, amount in zip(recent['labels'], recent['project_revenue'])]
     
     won_result = client.table('leads').select('id', count='exact').eq('status', 'closed_won').execute()
     total_deals_won = won_result.count if won_result.count else len(won_result.data)
@@ -315,28 +249,14 @@ def flex():
     outreach_result = client.table('outreach_logs').select('id', count='exact').execute()
     total_outreach = outreach_result.count if outreach_result.count else len(outreach_result.data)
     
-    this_month_outreach_result = client.table('outreach_logs').select('id', count='exact').gte('date', month_start.isoformat()).lte('date', today.isoformat()).execute()
-    this_month_outreach = this_month_outreach_result.count if this_month_outreach_result.count else len(this_month_outreach_result.data)
+    this_month_outreach = metrics.total(metrics.daily(month_start, today, tables=('outreach_logs',)), 'outreach_count')
     
-    largest_deal_result = client.table('clients').select('amount_charged').order('amount_charged', desc=True).limit(1).execute()
-    largest_deal = float(largest_deal_result.data[0].get('amount_charged', 0)) if largest_deal_result.data else 0
+    largest_deal = max((float(r.get('amount_charged') or 0) for r in clients_data), default=0)
     
-    monthly_revenues = []
-    for i in range(24):
-        m_start = (today.replace(day=1) - timedelta(days=i*30)).replace(day=1)
-        if m_start.month == 12:
-            m_end = m_start.replace(year=m_start.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            m_end = m_start.replace(month=m_start.month + 1, day=1) - timedelta(days=1)
-        
-        month_result = client.table('clients').select('amount_charged').gte('start_date', m_start.isoformat()).lte('start_date', m_end.isoformat()).execute()
-        month_rev = sum(float(r.get('amount_charged') or 0) for r in month_result.data)
-        
-        if float(month_rev) > 0:
-            monthly_revenues.append({
-                'month': m_start.strftime('%B %Y'),
-                'amount': float(month_rev)
-            })
+    history = revenue.series(add_months(today, -23), 24)
+    monthly_revenues = [{'month': m.strftime('%B %Y'), 'amount': amount}
+                        for m, amount in zip(reversed(history['months']), reversed(history['project_revenue']))
+                        if amount > 0]
     
     highest_month = max(monthly_revenues, key=lambda x: x['amount']) if monthly_revenues else None
     
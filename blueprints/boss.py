@@ -1,5 +1,5 @@
-from flask import Blueprint, render_template, flash
-from db_supabase import BossBattle, ActivityLog, WinsLog, UserTokens, get_supabase
+from flask import Blueprint, render_template
+from db_supabase import BossBattle, get_supabase
 from datetime import date
 import timezone as tz
 
@@ -32,47 +32,3 @@ def index():
                          current_boss=current_boss,
                          progress_percent=progress_percent,
                          past_bosses=past_bosses)
-
-
-def update_boss_progress(boss_type, increment=1):
-    current_boss = BossBattle.get_current_battle()
-    
-    if not current_boss:
-        return False
-    
-    current_boss_type = getattr(current_boss, 'boss_type', '')
-    if current_boss_type != boss_type:
-        return False
-    
-    is_completed = getattr(current_boss, 'is_completed', False)
-    if is_completed:
-        return False
-    
-    progress_value = (getattr(current_boss, 'progress_value', 0) or 0) + increment
-    target_value = getattr(current_boss, 'target_value', 0) or 0
-    
-    is_now_completed = progress_value >= target_value and target_value > 0
-    
-    update_data = {'progress_value': progress_value}
-    if is_now_completed:
-        update_data['is_completed'] = True
-    
-    BossBattle.update_by_id(current_boss.id, update_data)
-    
-    if is_now_completed:
-        reward_tokens = getattr(current_boss, 'reward_tokens', 0) or 0
-        description = getattr(current_boss, 'description', 'Monthly Boss')
-        
-        UserTokens.add_tokens(reward_tokens, f'Boss completed: {description}')
-        
-        flash(f'Boss Defeated! +{reward_tokens} tokens!', 'success')
-        ActivityLog.log_activity('boss_defeated', f'Boss defeated: {description}', current_boss.id, 'boss')
-        WinsLog.insert({
-            'title': 'Boss Defeated!',
-            'description': f'Defeated the monthly boss: {description}',
-            'xp_value': 0,
-            'token_value': reward_tokens
-        })
-        return True
-    
-    return False
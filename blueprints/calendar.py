@@ -1,8 +1,8 @@
-from flask import Blueprint, render_template, request, jsonify, abort
+from flask import Blueprint, render_template, request, jsonify, abort, current_app
 from db_supabase import Lead, Task, DailyMission, BossBattle, get_supabase
 from datetime import datetime, date, timedelta
 import timezone as tz
-from calendar import monthrange
+from calendar_data import cached_month, calendar_range, prefetch_adjacent, MAX_RANGE_DAYS
 
 calendar_bp = Blueprint('calendar', __name__, url_prefix='/calendar')
 
@@ -28,10 +28,6 @@ def get_mission_display_name(mission):
 
 def get_month_data(year, month):
     first_day = date(year, month, 1)
-    _, days_in_month = monthrange(year, month)
-    last_day = date(year, month, days_in_month)
-    
-    start_weekday = first_day.weekday()
     
     if month == 1:
         prev_month = 12
@@ -47,116 +43,24 @@ def get_month_data(year, month):
         next_month = month + 1
         next_year = year
     
-    _, prev_days_in_month = monthrange(prev_year, prev_month)
-    
-    grid_start = first_day - timedelta(days=start_weekday)
-    grid_end = grid_start + timedelta(days=41)
-    
-    client = get_supabase()
-    
-    tasks_result = client.table('tasks').select('*').gte('due_date', grid_start.isoformat()).lte('due_date', grid_end.isoformat()).execute()
-    tasks = [Task._parse_row(row) for row in tasks_result.data]
-    
-    leads_result = client.table('leads').select('*').gte('next_action_date', grid_start.isoformat()).lte('next_action_date', grid_end.isoformat()).filter('status', 'not.in', '("closed_won","closed_lost")').is_('converted_at', 'null').execute()
-    leads = [Lead._parse_row(row) for row in leads_result.data]
-    
-    missions_result = client.table('daily_missions').select('*').gte('mission_date', grid_start.isoformat()).lte('mission_date', grid_end.isoformat()).execute()
-    missions = [DailyMission._parse_row(row) for row in missions_result.data]
-    
-    boss_result = client.table('boss_fights').select('*').eq('month', f"{year}-{month:02d}").execute()
-    current_boss = BossBattle._parse_row(boss_result.data[0]) if boss_result.data else None
-    
-    task_dates = {}
-    for task in tasks:
-        due_date = getattr(task, 'due_date', '')
-        if isinstance(due_date, str):
-            d = due_date.split('T')[0]
-        else:
-            d = due_date.isoformat() if due_date else ''
-        if d:
-            if d not in task_dates:
-                task_dates[d] = []
-            task_dates[d].append({
-                'id': getattr(task, 'id', 0),
-                'title': getattr(task, 'title', ''),
-                'status': getattr(task, 'status', ''),
-                'type': 'task'
-            })
-    
-    lead_dates = {}
-    for lead in leads:
-        next_action = getattr(lead, 'next_action_date', '')
-        if isinstance(next_action, str):
-            d = next_action.split('T')[0]
-        else:
-            d = next_action.isoformat() if next_action else ''
-        if d:
-            if d not in lead_dates:
-                lead_dates[d] = []
-            lead_dates[d].append({
-                'id': getattr(lead, 'id', 0),
-                'name': getattr(lead, 'name', ''),
-                'status': getattr(lead, 'status', ''),
-                'type': 'lead'
-            })
-    
-    mission_dates = {}
-    for mission in missions:
-        mission_date = getattr(mission, 'mission_date', '')
-        if isinstance(mission_date, str):
-            d = mission_date.split('T')[0]
-        else:
-            d = mission_date.isoformat() if mission_date else ''
-        if d:
-            mission_dates[d] = {
-                'id': getattr(mission, 'id', 0),
-                'mission_type': getattr(mission, 'mission_type', ''),
-                'is_completed': getattr(mission, 'is_completed', False),
-                'type': 'mission'
-            }
+    grid = cached_month(year, month)
+    prefetch_adjacent(current_app._get_current_object(), year, month)
+    boss_row = grid.boss(year, month)
+    current_boss = BossBattle._parse_row(boss_row) if boss_row else None
     
     calendar_days = []
     today = tz.today()
     
-    for i in range(start_weekday):
-        day_num = prev_days_in_month - start_weekday + 1 + i
-        cell_date = date(prev_year, prev_month, day_num)
-        date_str = cell_date.isoformat()
-        calendar_days.append({
-            'day': day_num,
-            'current_month': False,
-            'date': date_str,
-            'is_today': cell_date == today,
-            'tasks': task_dates.get(date_str, []),
-            'leads': lead_dates.get(date_str, []),
-            'mission': mission_dates.get(date_str)
-        })
-    
-    for day in range(1, days_in_month + 1):
-        current_date = date(year, month, day)
-        date_str = current_date.isoformat()
-        calendar_days.append({
-            'day': day,
-            'current_month': True,
-            'date': date_str,
-            'is_today': current_date == today,
-            'tasks': task_dates.get(date_str, []),
-            'leads': lead_dates.get(date_str, []),
-            'mission': mission_dates.get(date_str)
-        })
-    
-    remaining = 42 - len(calendar_days)
-    for day in range(1, remaining + 1):
-        cell_date = date(next_year, next_month, day)
-        date_str = cell_date.isoformat()
+    for cell in grid.days():
+        cell_date = date.fromisoformat(cell['date'])
         calendar_days.append({
-            'day': day,
-            'current_month': False,
-            'date': date_str,
+            'day': cell_date.day,
+            'current_month': cell_date.month == month,
+            'date': cell['date'],
             'is_today': cell_date == today,
-            'tasks': task_dates.get(date_str, []),
-            'leads': lead_dates.get(date_str, []),
-            'mission': mission_dates.get(date_str)
+            'tasks': cell['tasks'],
+            'leads': cell['leads'],
+            'mission': cell['mission']
         })
     
     return {
@@ -169,10 +73,30 @@ def get_month_data(year, month):
         'next_year': next_year,
         'next_month': next_month,
         'current_boss': current_boss,
-        'task_dates': task_dates,
-        'lead_dates': lead_dates
+        'task_dates': grid.tasks,
+        'lead_dates': grid.leads
     }
 
+def boss_data(boss):
+    if not boss:
+        return None
+    return {
+        'description': getattr(boss, 'description', '') or 'Monthly Boss',
+        'progress': getattr(boss, 'progress_value', 0) or 0,
+        'target': getattr(boss, 'target_value', 1) or 1,
+        'is_completed': getattr(boss, 'is_completed', False),
+        'reward_tokens': getattr(boss, 'reward_tokens', 0) or 0
+    }
+
+def _date_arg(name, default):
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        abort(400)
+
 @calendar_bp.route('')
 def index():
     year = request.args.get('year', type=int, default=tz.today().year)
@@ -203,23 +127,55 @@ def calendar_data():
     
     data = get_month_data(year, month)
     
-    boss_data = None
-    if data['current_boss']:
-        boss = data['current_boss']
-        boss_data = {
-            'description': getattr(boss, 'description', '') or 'Monthly Boss',
-            'progress': getattr(boss, 'progress_value', 0) or 0,
-            'target': getattr(boss, 'target_value', 1) or 1,
-            'is_completed': getattr(boss, 'is_completed', False),
-            'reward_tokens': getattr(boss, 'reward_tokens', 0) or 0
-        }
-    
     return jsonify({
         'year': year,
         'month': month,
         'month_name': data['month_name'],
         'days': data['days'],
-        'boss': boss_data
+        'boss': boss_data(data['current_boss'])
+    })
+
+@calendar_bp.route('/range')
+def range_data():
+    """Every day from start to end (e.g. several months while scrolling), from one batch of queries."""
+    start = _date_arg('start', tz.today().replace(day=1))
+    end = _date_arg('end', tz.add_months(start, 1) - timedelta(days=1))
+    if end < start or (end - start).days > MAX_RANGE_DAYS:
+        abort(400)
+    data = calendar_range(start, end)
+    today = tz.today().isoformat()
+    
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'days': [{**day, 'is_today': day['date'] == today} for day in data.days(start, end)],
+        'bosses': {month: boss_data(BossBattle._parse_row(row)) for month, row in data.bosses.items()}
+    })
+
+@calendar_bp.route('/week')
+def week_data():
+    target = _date_arg('date', tz.today())
+    monday = target - timedelta(days=target.weekday())
+    days = calendar_range(monday, monday + timedelta(days=6)).week(target)
+    today = tz.today().isoformat()
+    
+    return jsonify({
+        'start': monday.isoformat(),
+        'end': (monday + timedelta(days=6)).isoformat(),
+        'days': [{**day, 'is_today': day['date'] == today} for day in days]
+    })
+
+@calendar_bp.route('/agenda')
+def agenda_data():
+    start = _date_arg('start', tz.today())
+    days = min(max(request.args.get('days', type=int, default=14), 1), MAX_RANGE_DAYS)
+    end = start + timedelta(days=days - 1)
+    
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'items': [{**day, 'date_formatted': date.fromisoformat(day['date']).strftime('%a %d %b')}
+                  for day in calendar_range(start, end).agenda(start, end)]
     })
 
 @calendar_bp.route('/day/<date_str>')
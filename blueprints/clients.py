@@ -1,7 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
 from db_supabase import Client, Lead
 from datetime import datetime, date
-from cache import clear_all_cache
 import timezone as tz
 
 clients_bp = Blueprint('clients', __name__, url_prefix='/clients')
@@ -79,7 +78,6 @@ def create():
             'notes': request.form.get('notes'),
             'created_at': tz.now_iso()
         })
-        clear_all_cache()
         flash('Client created successfully!', 'success')
         return redirect(url_for('clients.index'))
     
@@ -128,7 +126,6 @@ def edit(id):
             'notes': request.form.get('notes'),
             'updated_at': tz.now_iso()
         })
-        clear_all_cache()
         flash('Client updated successfully!', 'success')
         return redirect(url_for('clients.detail', id=id))
     
@@ -146,6 +143,5 @@ def delete(id):
     if not client:
         abort(404)
     Client.delete_by_id(id)
-    clear_all_cache()
     flash('Client deleted successfully!', 'success')
     return redirect(url_for('clients.index'))
@@ -1,12 +1,15 @@
 from flask import Blueprint, render_template, request, jsonify
-from db_supabase import (Lead, Client, OutreachLog, UserSettings, UserStats, UserTokens, 
-                         DailyMission, BossBattle, ActivityLog, RevenueReward, FreelancingIncome, get_supabase)
-from datetime import datetime, date, timedelta
-from decimal import Decimal
+from db_supabase import (Lead, Client, UserSettings, UserStats, UserTokens, DailyMission, BossBattle,
+                         ActivityLog, RevenueReward, FreelancingIncome, get_supabase, parallel_queries)
+from datetime import datetime, timedelta
 from blueprints.gamification import calculate_consistency_score
-from blueprints.monthly_review import auto_generate_monthly_review_if_needed, get_newly_generated_review
-from cache import cache, CACHE_KEY_DASHBOARD_CHARTS, CACHE_KEY_MRR
+from blueprints.monthly_review import get_newly_generated_review
+from revenue import RevenueSeries, current_mrr
+from aggregates import week_buckets, weekly_outreach_counts, weekly_deal_counts
+from cache import cache, CACHE_KEY_DASHBOARD_CHARTS, CACHE_KEY_MRR, REVENUE_TABLES, MRR_TABLES
 import timezone as tz
+import metrics
+import scheduler
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,246 +23,102 @@ def get_month_start(d):
     return d.replace(day=1)
 
 
-def normalize_date(d):
-    """Convert date object or ISO string to date object for comparison."""
-    if d is None:
-        return None
-    if isinstance(d, date):
-        return d
-    if isinstance(d, str):
-        try:
-            return date.fromisoformat(d.split('T')[0])
-        except (ValueError, AttributeError):
-            return None
-    return None
-
-def get_cached_client_stats(clients):
-    cached_value, hit = cache.get(CACHE_KEY_MRR)
-    if hit:
-        logger.debug("[Dashboard] Using cached MRR/client stats")
-        return cached_value
-    
+# Only the columns the revenue stats read; the Client field schema decodes dates and money
+CLIENT_REVENUE_COLUMNS = ['id', 'start_date', 'amount_charged', 'hosting_active', 'monthly_hosting_fee',
+                          'saas_active', 'monthly_saas_fee']
+
+def _revenue_clients():
+    return Client.query_all(columns=CLIENT_REVENUE_COLUMNS)
+
+
+def get_cached_client_stats(clients=None):
+    # Clients are only fetched when the cached stats are missing
+    return cache.get_or_load(CACHE_KEY_MRR, lambda: _compute_client_stats(clients if clients is not None else _revenue_clients()),
+                             ttl=45, stale_ttl=300, tables=MRR_TABLES)
+
+
+def _compute_client_stats(clients):
     today = tz.today()
-    month_start = get_month_start(today)
-    
-    new_clients_month = 0
-    project_revenue_month = Decimal('0')
-    hosting_mrr = Decimal('0')
-    saas_mrr = Decimal('0')
-    
-    for c in clients:
-        start_date = normalize_date(getattr(c, 'start_date', None))
-        if start_date and start_date >= month_start:
-            new_clients_month += 1
-            project_revenue_month += Decimal(str(getattr(c, 'amount_charged', 0) or 0))
-        
-        if getattr(c, 'hosting_active', False):
-            hosting_mrr += Decimal(str(getattr(c, 'monthly_hosting_fee', 0) or 0))
-        if getattr(c, 'saas_active', False):
-            saas_mrr += Decimal(str(getattr(c, 'monthly_saas_fee', 0) or 0))
+    revenue = RevenueSeries(clients)
+    this_month = revenue.month(today)
     
-    last_3_months_revenue = []
-    for i in range(1, 4):
-        m_start = (today.replace(day=1) - timedelta(days=i*30)).replace(day=1)
-        m_end = (m_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        rev = Decimal('0')
-        for c in clients:
-            start_date = normalize_date(getattr(c, 'start_date', None))
-            if start_date and m_start <= start_date <= m_end:
-                rev += Decimal(str(getattr(c, 'amount_charged', 0) or 0))
-        last_3_months_revenue.append(float(rev))
-    
-    avg_project_revenue = sum(last_3_months_revenue) / 3 if last_3_months_revenue else 0
+    # MRR counts every client with an active fee, including ones without a start date
+    hosting_mrr, saas_mrr = current_mrr(clients)
     total_mrr = hosting_mrr + saas_mrr
-    forecast_monthly = float(total_mrr) + avg_project_revenue
+    
+    last_3_months_revenue = revenue.trailing(today, 3)['project_revenue']
+    avg_project_revenue = sum(last_3_months_revenue) / 3
+    forecast_monthly = total_mrr + avg_project_revenue
     forecast_3_months = forecast_monthly * 3
     
     result = {
-        'new_clients_month': new_clients_month,
-        'project_revenue_month': float(project_revenue_month),
-        'hosting_mrr': float(hosting_mrr),
-        'saas_mrr': float(saas_mrr),
-        'total_mrr': float(total_mrr),
+        'new_clients_month': this_month['new_clients'],
+        'project_revenue_month': this_month['project_revenue'],
+        'hosting_mrr': hosting_mrr,
+        'saas_mrr': saas_mrr,
+        'total_mrr': total_mrr,
         'forecast_monthly': forecast_monthly,
         'forecast_3_months': forecast_3_months
     }
-    
-    cache.set(CACHE_KEY_MRR, result, ttl=45)
-    logger.debug("[Dashboard] Cached MRR/client stats")
+    logger.debug("[Dashboard] Computed MRR/client stats")
     return result
 
 
-def get_cached_chart_data(clients, freelance_jobs=None):
-    cached_value, hit = cache.get(CACHE_KEY_DASHBOARD_CHARTS)
-    if hit:
-        logger.debug("[Dashboard] Using cached chart data")
-        return cached_value
-    
+def get_cached_chart_data(clients=None, freelance_jobs=None):
+    return cache.get_or_load(CACHE_KEY_DASHBOARD_CHARTS,
+                             lambda: _compute_chart_data(clients if clients is not None else _revenue_clients(), freelance_jobs),
+                             ttl=60, stale_ttl=300, tables=REVENUE_TABLES)
+
+
+def _compute_chart_data(clients, freelance_jobs=None):
     today = tz.today()
     
     if freelance_jobs is None:
-        freelance_jobs = FreelancingIncome.query_all()
+        freelance_jobs = FreelancingIncome.query_all(columns=['amount', 'date_completed'])
     
-    monthly_revenue_data = []
-    monthly_mrr_data = []
-    monthly_total_data = []
-    month_labels = []
-    
-    for i in range(11, -1, -1):
-        m_start = (today.replace(day=1) - timedelta(days=i*30)).replace(day=1)
-        if m_start.month == 12:
-            m_end = m_start.replace(year=m_start.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            m_end = m_start.replace(month=m_start.month + 1, day=1) - timedelta(days=1)
-        
-        month_labels.append(m_start.strftime('%b %Y'))
-        
-        month_revenue = Decimal('0')
-        hosting_at_month = Decimal('0')
-        saas_at_month = Decimal('0')
-        freelance_month = Decimal('0')
-        
-        for c in clients:
-            start_date = normalize_date(getattr(c, 'start_date', None))
-            if start_date:
-                if m_start <= start_date <= m_end:
-                    month_revenue += Decimal(str(getattr(c, 'amount_charged', 0) or 0))
-                if start_date <= m_end:
-                    if getattr(c, 'hosting_active', False):
-                        hosting_at_month += Decimal(str(getattr(c, 'monthly_hosting_fee', 0) or 0))
-                    if getattr(c, 'saas_active', False):
-                        saas_at_month += Decimal(str(getattr(c, 'monthly_saas_fee', 0) or 0))
-        
-        for job in freelance_jobs:
-            job_date = normalize_date(getattr(job, 'date_completed', None))
-            if job_date and m_start <= job_date <= m_end:
-                freelance_month += Decimal(str(getattr(job, 'amount', 0) or 0))
-        
-        mrr_month = hosting_at_month + saas_at_month
-        total_month = month_revenue + mrr_month + freelance_month
-        
-        monthly_revenue_data.append(float(month_revenue))
-        monthly_mrr_data.append(float(mrr_month))
-        monthly_total_data.append(float(total_month))
+    series = RevenueSeries(clients, freelance_jobs).series(tz.add_months(today, -11), 12)
     
     result = {
-        'month_labels': month_labels,
-        'monthly_revenue_data': monthly_revenue_data,
-        'monthly_mrr_data': monthly_mrr_data,
-        'monthly_total_data': monthly_total_data
+        'month_labels': series['labels'],
+        'monthly_revenue_data': series['project_revenue'],
+        'monthly_mrr_data': series['mrr'],
+        'monthly_total_data': series['total']
     }
-    
-    cache.set(CACHE_KEY_DASHBOARD_CHARTS, result, ttl=60)
-    logger.debug("[Dashboard] Cached chart data")
+    logger.debug("[Dashboard] Computed chart data")
     return result
 
-@dashboard_bp.route('/')
-def index():
+# Dashboard widgets are rendered by /dashboard/widgets/<widget_id> after the page shell loads.
+# Each loader returns (template context, chart data) for templates/dashboard/widgets/<widget_id>.html.
+
+def _load_followups(settings):
     today = tz.today()
-    week_start = get_week_start(today)
-    month_start = get_month_start(today)
-    
-    supabase_client = get_supabase()
-    
-    leads = Lead.query_all()
-    lead_counts_dict = {}
-    for lead in leads:
-        status = getattr(lead, 'status', 'new')
-        lead_counts_dict[status] = lead_counts_dict.get(status, 0) + 1
-    
-    new_leads_week = 0
-    new_leads_month = 0
-    for lead in leads:
-        created = getattr(lead, 'created_at', '')
-        created_date = None
-        if isinstance(created, str):
-            created_date = created.split('T')[0]
-        elif isinstance(created, date):
-            created_date = created.isoformat()
-        
-        if created_date:
-            if created_date >= week_start.isoformat():
-                new_leads_week += 1
-            if created_date >= month_start.isoformat():
-                new_leads_month += 1
-    
-    outreach_today_result = supabase_client.table('outreach_logs').select('id', count='exact').eq('date', today.isoformat()).execute()
-    outreach_today = outreach_today_result.count if outreach_today_result.count else len(outreach_today_result.data)
-    
-    outreach_week_result = supabase_client.table('outreach_logs').select('id', count='exact').gte('date', week_start.isoformat()).execute()
-    outreach_week = outreach_week_result.count if outreach_week_result.count else len(outreach_week_result.data)
-    
-    outreach_month_result = supabase_client.table('outreach_logs').select('id', count='exact').gte('date', month_start.isoformat()).execute()
-    outreach_month = outreach_month_result.count if outreach_month_result.count else len(outreach_month_result.data)
-    
-    twelve_weeks_ago = get_week_start(today) - timedelta(weeks=11)
-    outreach_result = supabase_client.table('outreach_logs').select('date').gte('date', twelve_weeks_ago.isoformat()).execute()
-    
-    clients = Client.query_all()
-    
-    client_stats = get_cached_client_stats(clients)
-    new_clients_month = client_stats['new_clients_month']
-    project_revenue_month = client_stats['project_revenue_month']
-    hosting_mrr = client_stats['hosting_mrr']
-    saas_mrr = client_stats['saas_mrr']
-    total_mrr = client_stats['total_mrr']
-    forecast_monthly = client_stats['forecast_monthly']
-    forecast_3_months = client_stats['forecast_3_months']
-    
-    outreach_weekly_data = []
-    deals_weekly_data = []
-    week_labels = []
-    
-    for i in range(11, -1, -1):
-        w_start = get_week_start(today) - timedelta(weeks=i)
-        w_end = w_start + timedelta(days=6)
-        
-        week_labels.append(w_start.strftime('%b %d'))
-        
-        outreach_count = sum(1 for o in outreach_result.data 
-                            if w_start.isoformat() <= o.get('date', '') <= w_end.isoformat())
-        outreach_weekly_data.append(outreach_count)
-        
-        deals_count = 0
-        for lead in leads:
-            if getattr(lead, 'status', '') == 'closed_won':
-                updated = getattr(lead, 'updated_at', '')
-                if isinstance(updated, str):
-                    updated_date = updated.split('T')[0]
-                    if w_start.isoformat() <= updated_date <= w_end.isoformat():
-                        deals_count += 1
-        deals_weekly_data.append(deals_count)
-    
-    settings = UserSettings.get_settings()
-    
-    user_stats = UserStats.get_stats()
+    rows = get_supabase().table('leads').select('next_action_date').lte('next_action_date', today.isoformat()) \
+        .filter('status', 'not.in', '("closed_won","closed_lost")').is_('converted_at', 'null').execute().data
+    due = [tz.parse_date_only(row.get('next_action_date')) for row in rows]
+    return {
+        'followup_today': sum(1 for d in due if d == today),
+        'followup_overdue': sum(1 for d in due if d and d < today)
+    }, None
+
+
+def _load_gamification_stats(settings):
+    with parallel_queries() as q:
+        user_stats_future = q.submit(UserStats.get_stats)
+        token_balance_future = q.submit(UserTokens.get_balance)
     consistency = calculate_consistency_score()
-    
-    followup_today = 0
-    followup_overdue = 0
-    for lead in leads:
-        next_action = getattr(lead, 'next_action_date', None)
-        status = getattr(lead, 'status', '')
-        converted = getattr(lead, 'converted_at', None)
-        if next_action and status not in ['closed_won', 'closed_lost'] and not converted:
-            if isinstance(next_action, str):
-                next_action = next_action.split('T')[0]
-            if next_action == today.isoformat() or (isinstance(next_action, date) and next_action == today):
-                followup_today += 1
-            elif (isinstance(next_action, str) and next_action < today.isoformat()) or (isinstance(next_action, date) and next_action < today):
-                followup_overdue += 1
-    
-    chart_data = get_cached_chart_data(clients)
-    month_labels = chart_data['month_labels']
-    monthly_revenue_data = chart_data['monthly_revenue_data']
-    monthly_mrr_data = chart_data['monthly_mrr_data']
-    monthly_total_data = chart_data['monthly_total_data']
-    
-    token_balance = UserTokens.get_balance()
-    
+    return {
+        'user_stats': user_stats_future.result(),
+        'token_balance': token_balance_future.result(),
+        'consistency_score': consistency['score']
+    }, None
+
+
+def _load_daily_mission(settings):
+    # Created by the scheduler's daily_mission job; after a cold start the dashboard may get
+    # here before the first tick, so run the job now if it hasn't run today
     daily_mission = DailyMission.get_today_mission()
-    if not daily_mission:
-        daily_mission = DailyMission.create_today_mission()
+    if not daily_mission and DailyMission.is_weekday(tz.today()) and scheduler.ensure('daily_mission'):
+        daily_mission = DailyMission.get_today_mission()
     
     mission_progress_pct = 0
     if daily_mission:
@@ -267,10 +126,13 @@ def index():
         progress = getattr(daily_mission, 'progress_count', 0) or 0
         if target > 0:
             mission_progress_pct = min(100, int((progress / target) * 100))
-    
+    return {'daily_mission': daily_mission, 'mission_progress_pct': mission_progress_pct}, None
+
+
+def _load_boss_battle(settings):
     current_boss = BossBattle.get_current_battle()
-    if not current_boss:
-        current_boss = BossBattle.create_current_battle()
+    if not current_boss and scheduler.ensure('boss_battle'):
+        current_boss = BossBattle.get_current_battle()
     
     boss_progress_pct = 0
     if current_boss:
@@ -278,30 +140,92 @@ def index():
         progress = getattr(current_boss, 'progress_value', 0) or 0
         if target > 0:
             boss_progress_pct = min(100, int((progress / target) * 100))
-    
-    pause_active = settings.is_paused()
-    pause_end = getattr(settings, 'pause_end', None)
-    
+    return {'current_boss': current_boss, 'boss_progress_pct': boss_progress_pct}, None
+
+
+def _load_focus_session(settings):
+    return {}, None
+
+
+def _load_activity_calendar(settings):
     recent_activities = ActivityLog.query_all(order_by='timestamp', order_desc=True, limit=5)
+    return {'recent_activities': recent_activities}, None
+
+
+def _load_lead_stats(settings):
+    today = tz.today()
+    week_start = get_week_start(today)
+    month_start = get_month_start(today)
+    # One day of margin so leads created just before local midnight are still compared by local date
+    since = min(week_start, month_start) - timedelta(days=1)
+    rows = get_supabase().table('leads').select('created_at').gte('created_at', since.isoformat()).execute().data
+    created = [tz.local_date(lead.created_at) for lead in Lead._load_rows(rows, ['created_at'])
+               if getattr(lead, 'created_at', None)]
+    client_stats = get_cached_client_stats()
+    return {
+        'settings': settings,
+        'new_leads_week': sum(1 for d in created if d >= week_start),
+        'new_leads_month': sum(1 for d in created if d >= month_start),
+        'new_clients_month': client_stats['new_clients_month'],
+        'project_revenue_month': client_stats['project_revenue_month']
+    }, None
+
+
+def _load_outreach_stats(settings):
+    today = tz.today()
+    week_start, month_start = get_week_start(today), get_month_start(today)
+    days = metrics.daily(min(week_start, month_start), tables=('outreach_logs',))
+    return {
+        'settings': settings,
+        'outreach_today': metrics.total(days, 'outreach_count', today, today),
+        'outreach_week': metrics.total(days, 'outreach_count', week_start),
+        'outreach_month': metrics.total(days, 'outreach_count', month_start)
+    }, None
+
+
+def _load_mrr_forecast(settings):
+    return {'settings': settings, **get_cached_client_stats()}, None
+
+
+def _load_leads_by_status(settings):
+    lead_counts = {}
+    for row in get_supabase().table('leads').select('status').execute().data:
+        status = row.get('status') or 'new'
+        lead_counts[status] = lead_counts.get(status, 0) + 1
+    return {'lead_counts': lead_counts, 'lead_statuses': Lead.status_choices()}, None
+
+
+def _load_outreach_deals_charts(settings):
+    first_week = get_week_start(tz.today()) - timedelta(weeks=11)
+    charts = {'week_labels': [w.strftime('%b %d') for w in week_buckets(first_week, 12)]}
+    if settings.show_outreach_widget:
+        charts['outreach_weekly_data'] = weekly_outreach_counts(first_week, 12)
+    if settings.show_deals_widget:
+        charts['deals_weekly_data'] = weekly_deal_counts(first_week, 12)
+    return {'settings': settings}, charts
+
+
+def _load_revenue_chart(settings):
+    if not (settings.show_project_revenue_widget or settings.show_mrr_widget):
+        return {'settings': settings}, None
+    return {'settings': settings}, get_cached_chart_data()
+
+
+def _load_notifications(settings):
+    """Deals closed today, a newly generated monthly review and unclaimed revenue rewards."""
+    today = tz.today()
+    with parallel_queries() as q:
+        closed_future = q.submit(get_supabase().table('leads').select('name,status,close_reason,closed_at')
+                                 .in_('status', ['closed_won', 'closed_lost'])
+                                 .gte('closed_at', (today - timedelta(days=1)).isoformat()))
+        revenue_rewards_future = q.submit(RevenueReward.query_all)
     
-    deals_closed_today = []
-    for lead in leads:
-        closed_at = getattr(lead, 'closed_at', None)
-        status = getattr(lead, 'status', '')
-        if closed_at and status in ['closed_won', 'closed_lost']:
-            if isinstance(closed_at, str):
-                closed_date = closed_at.split('T')[0]
-                if closed_date == today.isoformat():
-                    deals_closed_today.append(lead)
-    
-    widget_order = settings.get_dashboard_order()
-    widget_active = settings.get_dashboard_active()
-    widget_names = UserSettings.DEFAULT_WIDGET_NAMES
+    deals_closed_today = [lead for lead in Lead._load_rows(closed_future.result().data, ['name', 'status', 'close_reason', 'closed_at'])
+                          if getattr(lead, 'closed_at', None) and tz.local_date(lead.closed_at) == today]
     
     seven_days_ago = (tz.now() - timedelta(days=7)).isoformat()
-    revenue_rewards = RevenueReward.query_all()
     revenue_notifications = []
-    for r in revenue_rewards:
+    for r in revenue_rewards_future.result():
         unlocked = getattr(r, 'unlocked_at', None)
         claimed = getattr(r, 'claimed_at', None)
         if unlocked and not claimed:
@@ -309,53 +233,86 @@ def index():
                 revenue_notifications.append(r)
     revenue_notifications.sort(key=lambda x: getattr(x, 'target_revenue', 0))
     
-    auto_generate_monthly_review_if_needed()
     new_monthly_review = get_newly_generated_review()
     
+    return {
+        'deals_closed_today': deals_closed_today,
+        'revenue_notifications': revenue_notifications,
+        'new_monthly_review': new_monthly_review
+    }, None
+
+
+# widget id -> (loader, tables whose writes invalidate the cached widget; None = never cached)
+DASHBOARD_WIDGETS = {
+    'followups': (_load_followups, ('leads',)),
+    'gamification_stats': (_load_gamification_stats, ('user_stats', 'user_tokens', 'outreach_logs', 'leads', 'tasks',
+                                                       'goals', 'user_settings')),
+    'daily_mission': (_load_daily_mission, ('daily_missions',)),
+    'boss_battle': (_load_boss_battle, ('boss_fights',)),
+    'focus_session': (_load_focus_session, ()),
+    'activity_calendar': (_load_activity_calendar, ('activity_log',)),
+    'lead_stats': (_load_lead_stats, ('leads', 'clients', 'user_settings')),
+    'outreach_stats': (_load_outreach_stats, ('outreach_logs', 'user_settings')),
+    'mrr_forecast': (_load_mrr_forecast, ('clients', 'user_settings')),
+    'leads_by_status': (_load_leads_by_status, ('leads',)),
+    'outreach_deals_charts': (_load_outreach_deals_charts, ('outreach_logs', 'leads', 'user_settings')),
+    'revenue_chart': (_load_revenue_chart, ('clients', 'freelance_jobs', 'user_settings')),
+    'notifications': (_load_notifications, ('leads', 'revenue_rewards', 'monthly_reviews')),
+}
+
+WIDGET_CACHE_TTL = 60
+
+
+def render_widget(widget_id, settings):
+    """Returns {'widget', 'html', 'charts'} for one widget; cached per widget until its tables change."""
+    loader, tables = DASHBOARD_WIDGETS[widget_id]
+    
+    def build():
+        context, charts = loader(settings)
+        html = render_template(f'dashboard/widgets/{widget_id}.html', **context)
+        return {'widget': widget_id, 'html': html, 'charts': charts}
+    
+    if tables is None:
+        return build()
+    # Rendered in the request (url_for), so no stale-while-revalidate refresh in the background
+    return cache.get_or_load(f'dashboard_widget:{widget_id}', build, ttl=WIDGET_CACHE_TTL, tables=tables)
+
+
+@dashboard_bp.route('/')
+def index():
+    # Only the shell: widgets and notifications are fetched by the page from dashboard.widget
+    settings = UserSettings.get_settings()
+    widget_order = settings.get_dashboard_order()
+    widget_active = settings.get_dashboard_active()
+    
     return render_template('dashboard.html',
         settings=settings,
-        user_stats=user_stats,
-        consistency_score=consistency['score'],
-        followup_today=followup_today,
-        followup_overdue=followup_overdue,
-        lead_counts=lead_counts_dict,
-        lead_statuses=Lead.status_choices(),
-        new_leads_week=new_leads_week,
-        new_leads_month=new_leads_month,
-        outreach_today=outreach_today,
-        outreach_week=outreach_week,
-        outreach_month=outreach_month,
-        new_clients_month=new_clients_month,
-        project_revenue_month=float(project_revenue_month),
-        hosting_mrr=float(hosting_mrr),
-        saas_mrr=float(saas_mrr),
-        total_mrr=float(total_mrr),
-        forecast_monthly=forecast_monthly,
-        forecast_3_months=forecast_3_months,
-        week_labels=week_labels,
-        outreach_weekly_data=outreach_weekly_data,
-        deals_weekly_data=deals_weekly_data,
-        month_labels=month_labels,
-        monthly_revenue_data=monthly_revenue_data,
-        monthly_mrr_data=monthly_mrr_data,
-        monthly_total_data=monthly_total_data,
-        token_balance=token_balance,
-        daily_mission=daily_mission,
-        mission_progress_pct=mission_progress_pct,
-        current_boss=current_boss,
-        boss_progress_pct=boss_progress_pct,
-        pause_active=pause_active,
-        pause_end=pause_end,
-        recent_activities=recent_activities,
-        deals_closed_today=deals_closed_today,
+        pause_active=settings.is_paused(),
+        pause_end=getattr(settings, 'pause_end', None),
         widget_order=widget_order,
         widget_active=widget_active,
-        widget_names=widget_names,
-        revenue_notifications=revenue_notifications,
-        new_monthly_review=new_monthly_review
+        widget_names=UserSettings.DEFAULT_WIDGET_NAMES,
+        visible_widgets=[w for w in widget_order if w in DASHBOARD_WIDGETS and widget_active.get(w, True)]
     )
 
 
+@dashboard_bp.route('/dashboard/widgets/<widget_id>')
+def widget(widget_id):
+    if widget_id not in DASHBOARD_WIDGETS:
+        return jsonify({'error': 'Unknown widget'}), 404
+    
+    settings = UserSettings.get_settings()
+    # Hidden widgets are never computed, even if requested directly
+    if widget_id != 'notifications' and not settings.get_dashboard_active().get(widget_id, True):
+        return jsonify({'widget': widget_id, 'html': '', 'charts': None})
+    
+    response = jsonify(render_widget(widget_id, settings))
+    # Browsers revalidate every time; unchanged widgets come back as 304
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+
 @dashboard_bp.route('/widget-settings', methods=['POST'])
 def save_widget_settings():
     data = request.get_json()
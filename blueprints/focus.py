@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from datetime import datetime, date, timedelta
-from db_supabase import UserSettings, UserStats, UserTokens, FocusSession, ActivityLog, XPLog, get_supabase
+from db_supabase import UserSettings, FocusSession, ActivityLog, get_supabase
+from gamification_engine import emit
 import timezone as tz
 
 focus_bp = Blueprint('focus', __name__, url_prefix='/focus')
@@ -121,14 +122,8 @@ def complete_session_internal(settings):
         'focus_timer_length': None
     })
     
-    UserTokens.add_tokens(3, f'Focus session completed ({duration} min)')
-    
-    stats = UserStats.get_stats()
-    new_xp = (getattr(stats, 'current_xp', 0) or 0) + 5
-    UserStats.update_by_id(stats.id, {'current_xp': new_xp})
-    XPLog.insert({'amount': 5, 'reason': f'Focus session completed ({duration} min)'})
-    
-    ActivityLog.log_activity('focus_completed', f'Completed {duration}-minute focus session (+3 tokens, +5 XP)')
+    emit('focus_completed', reason=f'Focus session completed ({duration} min)',
+         description=f'Completed {duration}-minute focus session (+3 tokens, +5 XP)')
     
     return jsonify({
         'active': False,
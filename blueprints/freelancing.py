@@ -3,7 +3,7 @@ from db_supabase import FreelancingIncome, get_supabase
 from datetime import date
 import timezone as tz
 import calendar
-from cache import clear_all_cache
+from cache import cached
 
 freelancing_bp = Blueprint('freelancing', __name__, url_prefix='/freelancing')
 
@@ -38,22 +38,17 @@ def get_income_by_category():
     return income_by_cat
 
 
+@cached(ttl=300, tables=('freelance_jobs',))
 def get_monthly_income(months=6):
-    client = get_supabase()
     # Only fetch amount and date for monthly calculations
-    result = client.table('freelance_jobs').select('amount,date_completed').order('date_completed', desc=True).execute()
+    jobs = FreelancingIncome.query_all(order_by='date_completed', order_desc=True, columns=['amount', 'date_completed'])
     
     monthly_totals = {}
-    for row in result.data:
-        job_date = row.get('date_completed', '')
-        if isinstance(job_date, str):
-            try:
-                d = date.fromisoformat(job_date.split('T')[0])
-                key = (d.year, d.month)
-                amount = float(row.get('amount', 0) or 0)
-                monthly_totals[key] = monthly_totals.get(key, 0) + amount
-            except:
-                pass
+    for job in jobs:
+        d = getattr(job, 'date_completed', None)
+        if d:
+            key = (d.year, d.month)
+            monthly_totals[key] = monthly_totals.get(key, 0) + (job.amount or 0)
     
     sorted_months = sorted(monthly_totals.keys(), reverse=True)[:months]
     sorted_months.reverse()
@@ -75,7 +70,7 @@ def index():
     chart_data = []
     for year, month, amount in monthly_income:
         chart_labels.append(f"{calendar.month_abbr[month]} {year}")
-        chart_data.append(amount)
+        chart_data.append(float(amount))
     
     category_chart_labels = []
     category_chart_data = []
@@ -136,7 +131,6 @@ def add():
             'client_name': client_name,
             'notes': notes
         })
-        clear_all_cache()
         
         flash('Freelance income added successfully!', 'success')
         return redirect(url_for('freelancing.index'))
@@ -184,7 +178,6 @@ def edit(id):
             'client_name': client_name,
             'notes': notes
         })
-        clear_all_cache()
         
         flash('Freelance income updated!', 'success')
         return redirect(url_for('freelancing.index'))
@@ -198,6 +191,5 @@ def delete(id):
     if not job:
         abort(404)
     FreelancingIncome.delete_by_id(id)
-    clear_all_cache()
     flash('Freelance income deleted', 'success')
     return redirect(url_for('freelancing.index'))
@@ -1,10 +1,12 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort
-from db_supabase import (UserStats, Achievement, Goal, OutreachLog, Lead, Task, XPLog, 
-                         LevelReward, MilestoneReward, UnlockedReward, UserTokens, DailyMission, 
-                         TokenTransaction, UserSettings, ActivityLog, WinsLog, BossBattle, 
-                         RewardItem, RevenueReward, Client, FreelancingIncome, get_supabase)
-from datetime import datetime, date, timedelta
+from db_supabase import (UserStats, Achievement, Goal, Task, LevelReward, MilestoneReward, UnlockedReward,
+                         UserTokens, UserSettings, WinsLog, BossBattle, RewardItem, RevenueReward, RewardGrant,
+                         Client, FreelancingIncome, get_supabase)
+from datetime import datetime, timedelta
+from decimal import Decimal
 import timezone as tz
+import metrics
+from cache import cached, CACHE_KEY_LIFETIME_REVENUE, REVENUE_TABLES
 
 
 def is_paused():
@@ -25,6 +27,7 @@ XP_RULES = {
     'monthly_revenue_goal_hit': 50,
     'streak_10': 20,
     'streak_30': 50,
+    'focus_session': 5,
 }
 
 TOKEN_RULES = {
@@ -39,6 +42,7 @@ TOKEN_RULES = {
     'streak_14': 20,
     'streak_30': 30,
     'cold_lead_revived': 5,
+    'focus_session': 3,
 }
 
 LEVELS = [
@@ -79,45 +83,10 @@ def add_tokens(amount, reason=""):
     return UserTokens.add_tokens(amount, reason)
 
 
-def update_mission_progress(mission_type, count=1):
-    today = tz.today()
-    mission = DailyMission.get_first({'mission_date': today.isoformat(), 'mission_type': mission_type})
-    if mission and not getattr(mission, 'is_completed', False):
-        new_progress = (getattr(mission, 'progress_count', 0) or 0) + count
-        target = getattr(mission, 'target_count', 0) or 0
-        is_completed = new_progress >= target
-        DailyMission.update_by_id(mission.id, {'progress_count': new_progress, 'is_completed': is_completed})
-        if is_completed:
-            reward_tokens = getattr(mission, 'reward_tokens', 0) or 0
-            add_tokens(reward_tokens, f'Mission completed: {mission_type}')
-            flash(f'Mission complete! +{reward_tokens} tokens!', 'success')
-
-
 def add_xp(amount, reason=""):
-    stats = UserStats.get_stats()
-    old_level = getattr(stats, 'current_level', 1) or 1
-    current_xp = (getattr(stats, 'current_xp', 0) or 0) + amount
-    new_level = get_level_from_xp(current_xp)
-    
-    UserStats.update_by_id(stats.id, {'current_xp': current_xp, 'current_level': new_level})
-    XPLog.insert({'amount': amount, 'reason': reason, 'created_at': tz.now_iso()})
-    
-    check_and_unlock_achievements()
-    
-    if new_level > old_level:
-        flash(f'Level Up! You are now Level {new_level}!', 'success')
-        ActivityLog.log_activity('level_up', f'Leveled up to Level {new_level}!')
-        WinsLog.insert({
-            'title': f'Level Up to {new_level}',
-            'description': f'Reached Level {new_level} after gaining XP.',
-            'xp_value': amount,
-            'token_value': 0,
-            'timestamp': tz.now_iso()
-        })
-        check_level_interval_rewards(new_level)
-        check_milestone_rewards(new_level)
-    
-    return current_xp
+    """Awards XP outside the domain events (goal bonuses); see gamification_engine."""
+    from gamification_engine import emit
+    return emit('xp_awarded', amount=amount, reason=reason).xp
 
 
 def check_level_interval_rewards(current_level):
@@ -165,48 +134,35 @@ def check_milestone_rewards(current_level):
             flash(f'Milestone reward unlocked: {reward.reward_text}!', 'success')
 
 
+@cached(ttl=60, stale_ttl=300, tables=REVENUE_TABLES, key=CACHE_KEY_LIFETIME_REVENUE)
 def get_lifetime_revenue():
-    from cache import cache, CACHE_KEY_LIFETIME_REVENUE
-    
-    cached_value, hit = cache.get(CACHE_KEY_LIFETIME_REVENUE)
-    if hit:
-        return cached_value
-    
-    total_revenue = 0.0
-    clients = Client.query_all()
+    total_revenue = Decimal('0')
+    clients = Client.query_all(columns=['id', 'start_date', 'amount_charged', 'hosting_active',
+                                        'monthly_hosting_fee', 'saas_active', 'monthly_saas_fee'])
     today = tz.today()
     
     for client in clients:
-        total_revenue += float(getattr(client, 'amount_charged', 0) or 0)
+        total_revenue += getattr(client, 'amount_charged', 0) or 0
         
         start_date = getattr(client, 'start_date', None)
         if start_date:
-            if isinstance(start_date, str):
-                try:
-                    start_date = date.fromisoformat(start_date.split('T')[0])
-                except:
-                    start_date = None
+            months_active = (today.year - start_date.year) * 12 + (today.month - start_date.month)
+            months_active = max(1, months_active)
+            
+            if getattr(client, 'hosting_active', False) and getattr(client, 'monthly_hosting_fee', 0):
+                total_revenue += client.monthly_hosting_fee * months_active
             
-            if start_date:
-                months_active = (today.year - start_date.year) * 12 + (today.month - start_date.month)
-                months_active = max(1, months_active)
-                
-                if getattr(client, 'hosting_active', False) and getattr(client, 'monthly_hosting_fee', 0):
-                    total_revenue += float(client.monthly_hosting_fee) * months_active
-                
-                if getattr(client, 'saas_active', False) and getattr(client, 'monthly_saas_fee', 0):
-                    total_revenue += float(client.monthly_saas_fee) * months_active
-    
-    freelance_income = FreelancingIncome.query_all()
+            if getattr(client, 'saas_active', False) and getattr(client, 'monthly_saas_fee', 0):
+                total_revenue += client.monthly_saas_fee * months_active
+    
+    freelance_income = FreelancingIncome.query_all(columns=['amount'])
     for income in freelance_income:
-        total_revenue += float(getattr(income, 'amount', 0) or 0)
+        total_revenue += getattr(income, 'amount', 0) or 0
     
-    cache.set(CACHE_KEY_LIFETIME_REVENUE, total_revenue, ttl=60)
-    return total_revenue
+    return float(total_revenue)
 
 
 def check_revenue_rewards():
-    RevenueReward.seed_defaults()
     lifetime_revenue = get_lifetime_revenue()
     revenue_rewards = RevenueReward.query_filter({'is_active': True})
     now = tz.now_iso()
@@ -249,102 +205,22 @@ def get_upcoming_rewards(current_level):
     upcoming.sort(key=lambda x: x['level'])
     return upcoming[:5]
 
-def update_outreach_streak():
-    stats = UserStats.get_stats()
-    today = tz.today()
-    yesterday = today - timedelta(days=1)
-    
-    last_outreach = getattr(stats, 'last_outreach_date', None)
-    if last_outreach:
-        if isinstance(last_outreach, str):
-            try:
-                last_outreach = date.fromisoformat(last_outreach.split('T')[0])
-            except:
-                last_outreach = None
-    
-    if last_outreach == today:
-        return getattr(stats, 'current_outreach_streak_days', 0) or 0
-    
-    old_streak = getattr(stats, 'current_outreach_streak_days', 0) or 0
-    
-    if is_paused():
-        UserStats.update_by_id(stats.id, {'last_outreach_date': today.isoformat()})
-        return old_streak
-    
-    if last_outreach == yesterday:
-        new_streak = old_streak + 1
-    elif last_outreach is None or last_outreach < yesterday:
-        new_streak = 1
-    else:
-        new_streak = old_streak
-    
-    longest = getattr(stats, 'longest_outreach_streak_days', 0) or 0
-    if new_streak > longest:
-        longest = new_streak
-    
-    UserStats.update_by_id(stats.id, {
-        'current_outreach_streak_days': new_streak,
-        'longest_outreach_streak_days': longest,
-        'last_outreach_date': today.isoformat()
-    })
-    
-    if new_streak > old_streak:
-        ActivityLog.log_activity('streak_increased', f'Streak increased to {new_streak} days!')
-    
-    if old_streak < 10 and new_streak >= 10:
-        add_xp(XP_RULES['streak_10'], "10-day outreach streak!")
-        flash('10-day streak bonus: +20 XP!', 'success')
-    if old_streak < 30 and new_streak >= 30:
-        add_xp(XP_RULES['streak_30'], "30-day outreach streak!")
-        flash('30-day streak bonus: +50 XP!', 'success')
-    
-    streak_token_milestones = [
-        (3, 'streak_3', '3-day streak bonus'),
-        (7, 'streak_7', '7-day streak bonus'),
-        (14, 'streak_14', '14-day streak bonus'),
-        (30, 'streak_30', '30-day streak bonus'),
-    ]
-    
-    for milestone, rule_key, reason in streak_token_milestones:
-        if old_streak < milestone and new_streak >= milestone:
-            existing = TokenTransaction.get_first({'reason': reason})
-            if not existing:
-                add_tokens(TOKEN_RULES[rule_key], reason)
-                flash(f'{reason}: +{TOKEN_RULES[rule_key]} tokens!', 'success')
-                if milestone in [7, 14, 30]:
-                    WinsLog.insert({
-                        'title': f'{milestone}-Day Streak!',
-                        'description': f'Reached a {milestone}-day outreach streak. Keep it up!',
-                        'xp_value': XP_RULES.get(f'streak_{milestone}', 0) if milestone in [10, 30] else 0,
-                        'token_value': TOKEN_RULES[rule_key]
-                    })
-    
-    check_and_unlock_achievements()
-    return new_streak
-
-
 def check_daily_goal():
     today = tz.today()
+    period = today.isoformat()
     
     daily_goal = Goal.get_first({'goal_type': 'daily_outreach'})
     if not daily_goal or (getattr(daily_goal, 'target_value', 0) or 0) <= 0:
         return False
+    if RewardGrant.is_granted('daily_goal', period):
+        return False
     
     client = get_supabase()
     result = client.table('outreach_logs').select('id', count='exact').eq('date', today.isoformat()).execute()
     today_outreach = result.count if result.count else len(result.data)
     
-    xp_logs = XPLog.query_filter({'reason': 'Daily outreach goal hit!'})
-    today_start = f'{today.isoformat()}T00:00:00'
-    existing_log = None
-    for log in xp_logs:
-        created = getattr(log, 'created_at', '')
-        if isinstance(created, str) and created >= today_start:
-            existing_log = log
-            break
-    
     target = getattr(daily_goal, 'target_value', 0) or 0
-    if today_outreach >= target and not existing_log:
+    if today_outreach >= target and RewardGrant.claim('daily_goal', period):
         add_xp(XP_RULES['daily_goal_hit'], "Daily outreach goal hit!")
         add_tokens(TOKEN_RULES['daily_goal_hit'], "Daily goal hit!")
         flash('Daily goal hit: +10 XP, +3 tokens!', 'success')
@@ -356,33 +232,29 @@ def check_daily_goal():
 def check_weekly_goal():
     today = tz.today()
     week_start = today - timedelta(days=today.weekday())
+    iso_year, iso_week, _ = today.isocalendar()
+    period = f'{iso_year}-W{iso_week:02d}'
     
     weekly_goal = Goal.get_first({'goal_type': 'weekly_outreach'})
     if not weekly_goal or (getattr(weekly_goal, 'target_value', 0) or 0) <= 0:
         return False
+    if RewardGrant.is_granted('weekly_goal', period):
+        return False
     
     client = get_supabase()
     result = client.table('outreach_logs').select('id', count='exact').gte('date', week_start.isoformat()).execute()
     week_outreach = result.count if result.count else len(result.data)
     
-    xp_logs = XPLog.query_filter({'reason': 'Weekly outreach goal hit!'})
-    week_start_ts = f'{week_start.isoformat()}T00:00:00'
-    existing_log = None
-    for log in xp_logs:
-        created = getattr(log, 'created_at', '')
-        if isinstance(created, str) and created >= week_start_ts:
-            existing_log = log
-            break
-    
     target = getattr(weekly_goal, 'target_value', 0) or 0
-    if week_outreach >= target and not existing_log:
+    if week_outreach >= target and RewardGrant.claim('weekly_goal', period):
         add_xp(XP_RULES['weekly_goal_hit'], "Weekly outreach goal hit!")
         add_tokens(TOKEN_RULES['weekly_goal_hit'], "Weekly goal hit!")
         WinsLog.insert({
             'title': 'Weekly Goal Hit',
             'description': f'Completed {week_outreach} outreach activities this week, hitting the weekly target of {target}.',
             'xp_value': XP_RULES['weekly_goal_hit'],
-            'token_value': TOKEN_RULES['weekly_goal_hit']
+            'token_value': TOKEN_RULES['weekly_goal_hit'],
+            'timestamp': tz.now_iso()
         })
         flash('Weekly goal hit: +25 XP, +7 tokens!', 'success')
         return True
@@ -393,35 +265,23 @@ def check_weekly_goal():
 def check_monthly_revenue_goal():
     today = tz.today()
     month_start = today.replace(day=1)
+    period = today.strftime('%Y-%m')
     
     monthly_goal = Goal.get_first({'goal_type': 'monthly_revenue'})
     if not monthly_goal or (getattr(monthly_goal, 'target_value', 0) or 0) <= 0:
         return False
+    if RewardGrant.is_granted('monthly_revenue_goal', period):
+        return False
     
-    clients = Client.query_all()
+    clients = Client.query_all(columns=['start_date', 'amount_charged'])
     monthly_revenue = 0
     for c in clients:
         start_date = getattr(c, 'start_date', None)
-        if start_date:
-            if isinstance(start_date, str):
-                try:
-                    start_date = date.fromisoformat(start_date.split('T')[0])
-                except:
-                    continue
-            if month_start <= start_date <= today:
-                monthly_revenue += float(getattr(c, 'amount_charged', 0) or 0)
-    
-    xp_logs = XPLog.query_filter({'reason': 'Monthly revenue goal hit!'})
-    month_start_ts = f'{month_start.isoformat()}T00:00:00'
-    existing_log = None
-    for log in xp_logs:
-        created = getattr(log, 'created_at', '')
-        if isinstance(created, str) and created >= month_start_ts:
-            existing_log = log
-            break
+        if start_date and month_start <= start_date <= today:
+            monthly_revenue += getattr(c, 'amount_charged', 0) or 0
     
     target = getattr(monthly_goal, 'target_value', 0) or 0
-    if monthly_revenue >= target and not existing_log:
+    if monthly_revenue >= target and RewardGrant.claim('monthly_revenue_goal', period):
         add_xp(XP_RULES['monthly_revenue_goal_hit'], "Monthly revenue goal hit!")
         flash('Monthly revenue goal hit: +50 XP!', 'success')
         return True
@@ -444,6 +304,7 @@ def count_weekdays_in_range(start_date, end_date):
         current += timedelta(days=1)
     return weekdays
 
+@cached(ttl=60, tables=('outreach_logs', 'leads', 'tasks', 'goals', 'user_settings'))
 def calculate_consistency_score():
     stats = UserStats.get_stats()
     today = tz.today()
@@ -460,8 +321,7 @@ def calculate_consistency_score():
         daily_target = 3
     
     client = get_supabase()
-    result = client.table('outreach_logs').select('id', count='exact').gte('date', week_ago.isoformat()).execute()
-    outreach_count = result.count if result.count else len(result.data)
+    outreach_count = metrics.total(metrics.daily(week_ago, tables=('outreach_logs',)), 'outreach_count')
     # Use weekdays instead of full 7 days for outreach goal
     outreach_goal = daily_target * weekdays_in_range
     outreach_pct = min(100, (outreach_count / outreach_goal * 100)) if outreach_goal > 0 else 0
@@ -484,12 +344,8 @@ def calculate_consistency_score():
     
     consistency_score = int((outreach_pct + followup_pct + task_pct) / 3)
     
-    if not is_paused():
-        UserStats.update_by_id(stats.id, {
-            'last_consistency_score': consistency_score,
-            'last_consistency_calculated_at': tz.now_iso()
-        })
-    else:
+    # Read-only: the stored score is written by record_consistency_score() (scheduler)
+    if is_paused():
         consistency_score = getattr(stats, 'last_consistency_score', 0) or consistency_score
     
     return {
@@ -503,41 +359,18 @@ def calculate_consistency_score():
         'tasks_due': tasks_due
     }
 
-def check_and_unlock_achievements():
-    stats = UserStats.get_stats()
-    now = tz.now_iso()
-    
-    streak = getattr(stats, 'current_outreach_streak_days', 0) or 0
-    xp = getattr(stats, 'current_xp', 0) or 0
-    
-    streak_7 = Achievement.get_first({'key': 'streak_7'})
-    if streak_7 and not getattr(streak_7, 'unlocked_at', None) and streak >= 7:
-        Achievement.update_by_id(streak_7.id, {'unlocked_at': now})
-    
-    streak_30 = Achievement.get_first({'key': 'streak_30'})
-    if streak_30 and not getattr(streak_30, 'unlocked_at', None) and streak >= 30:
-        Achievement.update_by_id(streak_30.id, {'unlocked_at': now})
-    
-    xp_1000 = Achievement.get_first({'key': 'xp_1000'})
-    if xp_1000 and not getattr(xp_1000, 'unlocked_at', None) and xp >= 1000:
-        Achievement.update_by_id(xp_1000.id, {'unlocked_at': now})
-    
-    xp_5000 = Achievement.get_first({'key': 'xp_5000'})
-    if xp_5000 and not getattr(xp_5000, 'unlocked_at', None) and xp >= 5000:
-        Achievement.update_by_id(xp_5000.id, {'unlocked_at': now})
-    
-    outreach_100 = Achievement.get_first({'key': 'outreach_100'})
-    if outreach_100 and not getattr(outreach_100, 'unlocked_at', None):
-        total_outreach = OutreachLog.count()
-        if total_outreach >= 100:
-            Achievement.update_by_id(outreach_100.id, {'unlocked_at': now})
-    
-    deals_10 = Achievement.get_first({'key': 'deals_10'})
-    if deals_10 and not getattr(deals_10, 'unlocked_at', None):
-        total_deals = Lead.count({'status': 'closed_won'})
-        if total_deals >= 10:
-            Achievement.update_by_id(deals_10.id, {'unlocked_at': now})
+def record_consistency_score():
+    """Stores the current consistency score on user_stats; skipped while paused so the score stays frozen."""
+    if is_paused():
+        return None
+    consistency = calculate_consistency_score.uncached()
+    UserStats.update_by_id(UserStats.get_stats().id, {
+        'last_consistency_score': consistency['score'],
+        'last_consistency_calculated_at': tz.now_iso()
+    })
+    return consistency['score']
 
+@cached(ttl=300, tables=('outreach_logs', 'clients', 'leads'))
 def get_recommended_goal(goal_type):
     today = tz.today()
     client = get_supabase()
@@ -558,18 +391,12 @@ def get_recommended_goal(goal_type):
     
     elif goal_type == 'monthly_revenue':
         three_months_ago = today - timedelta(days=90)
-        clients = Client.query_all()
+        clients = Client.query_all(columns=['start_date', 'amount_charged'])
         total = 0
         for c in clients:
             start_date = getattr(c, 'start_date', None)
-            if start_date:
-                if isinstance(start_date, str):
-                    try:
-                        start_date = date.fromisoformat(start_date.split('T')[0])
-                    except:
-                        continue
-                if start_date >= three_months_ago:
-                    total += float(getattr(c, 'amount_charged', 0) or 0)
+            if start_date and start_date >= three_months_ago:
+                total += getattr(c, 'amount_charged', 0) or 0
         avg = total / 3
         return max(100, int(avg) + 100)
     
@@ -582,6 +409,7 @@ def get_recommended_goal(goal_type):
     
     return 0
 
+@cached(ttl=60, tables=('xp_logs',))
 def get_xp_this_week():
     today = tz.today()
     week_start = today - timedelta(days=today.weekday())
@@ -618,10 +446,6 @@ def get_consistency_history(days=30):
 @gamification_bp.route('/')
 def index():
     stats = UserStats.get_stats()
-    Achievement.seed_defaults()
-    LevelReward.seed_defaults()
-    MilestoneReward.seed_defaults()
-    
     check_all_goals()
     
     achievements = Achievement.query_all()
@@ -653,7 +477,6 @@ def index():
     max_level = 15
     
     token_balance = UserTokens.get_balance()
-    RewardItem.seed_defaults()
     available_rewards = RewardItem.count({'is_active': True})
     
     current_boss = BossBattle.get_current_battle()
@@ -5,7 +5,8 @@ from email.mime.multipart import MIMEMultipart
 from datetime import datetime, date, timedelta
 import timezone as tz
 from flask import Blueprint, request, jsonify, session
-from db_supabase import get_supabase
+from db_supabase import get_supabase, parallel_queries
+from cache import get_cache_stats
 
 internal_bp = Blueprint('internal', __name__, url_prefix='/internal')
 
@@ -14,32 +15,41 @@ def get_summary_data():
     today = tz.today()
     yesterday = today - timedelta(days=1)
     
-    followups_result = client.table('leads').select('id', count='exact').eq('next_action_date', today.isoformat()).filter('status', 'not.in', '("closed_won","closed_lost")').execute()
+    with parallel_queries() as q:
+        followups_future = q.submit(client.table('leads').select('id', count='exact').eq('next_action_date', today.isoformat()).filter('status', 'not.in', '("closed_won","closed_lost")'))
+        overdue_future = q.submit(client.table('leads').select('id', count='exact').lt('next_action_date', today.isoformat()).filter('status', 'not.in', '("closed_won","closed_lost")'))
+        tasks_future = q.submit(client.table('tasks').select('id', count='exact').eq('due_date', today.isoformat()).neq('status', 'done'))
+        outreach_future = q.submit(client.table('outreach_logs').select('id', count='exact').eq('date', yesterday.isoformat()))
+        goals_future = q.submit(client.table('goals').select('target_value').eq('goal_type', 'daily_outreach').eq('period', 'daily'))
+        stats_future = q.submit(client.table('user_stats').select('*'))
+        new_leads_future = q.submit(client.table('leads').select('id', count='exact').gte('updated_at', f'{yesterday.isoformat()}T00:00:00').lt('updated_at', f'{today.isoformat()}T00:00:00'))
+        hosting_future = q.submit(client.table('clients').select('monthly_hosting_fee').eq('hosting_active', True))
+        saas_future = q.submit(client.table('clients').select('monthly_saas_fee').eq('saas_active', True))
+    
+    followups_result = followups_future.result()
     followups_today = followups_result.count if followups_result.count else len(followups_result.data)
     
-    overdue_result = client.table('leads').select('id', count='exact').lt('next_action_date', today.isoformat()).filter('status', 'not.in', '("closed_won","closed_lost")').execute()
+    overdue_result = overdue_future.result()
     overdue_followups = overdue_result.count if overdue_result.count else len(overdue_result.data)
     
-    tasks_result = client.table('tasks').select('id', count='exact').eq('due_date', today.isoformat()).neq('status', 'done').execute()
+    tasks_result = tasks_future.result()
     tasks_today = tasks_result.count if tasks_result.count else len(tasks_result.data)
     
-    outreach_result = client.table('outreach_logs').select('id', count='exact').eq('date', yesterday.isoformat()).execute()
+    outreach_result = outreach_future.result()
     outreach_yesterday = outreach_result.count if outreach_result.count else len(outreach_result.data)
     
-    goals_result = client.table('goals').select('target_value').eq('goal_type', 'daily_outreach').eq('period', 'daily').execute()
+    goals_result = goals_future.result()
     daily_goal_value = goals_result.data[0]['target_value'] if goals_result.data else 5
     
-    stats_result = client.table('user_stats').select('*').execute()
+    stats_result = stats_future.result()
     stats = stats_result.data[0] if stats_result.data else {}
     
-    new_leads_result = client.table('leads').select('id', count='exact').gte('updated_at', f'{yesterday.isoformat()}T00:00:00').lt('updated_at', f'{today.isoformat()}T00:00:00').execute()
+    new_leads_result = new_leads_future.result()
     new_leads_yesterday = new_leads_result.count if new_leads_result.count else len(new_leads_result.data)
     
-    hosting_result = client.table('clients').select('monthly_hosting_fee').eq('hosting_active', True).execute()
-    hosting_mrr = sum(float(c.get('monthly_hosting_fee') or 0) for c in hosting_result.data)
+    hosting_mrr = sum(float(c.get('monthly_hosting_fee') or 0) for c in hosting_future.result().data)
     
-    saas_result = client.table('clients').select('monthly_saas_fee').eq('saas_active', True).execute()
-    saas_mrr = sum(float(c.get('monthly_saas_fee') or 0) for c in saas_result.data)
+    saas_mrr = sum(float(c.get('monthly_saas_fee') or 0) for c in saas_future.result().data)
     
     total_mrr = hosting_mrr + saas_mrr
     
@@ -224,3 +234,14 @@ def run_daily_summary():
             'status': 'error',
             'reason': message
         })
+
+
+@internal_bp.route('/cache-stats')
+def cache_stats():
+    auth_token = os.environ.get('INTERNAL_API_TOKEN', '')
+    provided_token = request.args.get('token', '')
+    
+    if not session.get('authenticated') and (not auth_token or provided_token != auth_token):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify(get_cache_stats())
@@ -1,9 +1,8 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
 from db_supabase import Lead, OutreachLog, Client, ActivityLog, WinsLog, get_supabase
 from datetime import datetime, date
-from blueprints.gamification import add_xp, XP_RULES, TOKEN_RULES, add_tokens, update_mission_progress
-from blueprints.boss import update_boss_progress
-from cache import clear_all_cache
+from blueprints.gamification import XP_RULES
+from gamification_engine import emit
 import timezone as tz
 
 leads_bp = Blueprint('leads', __name__, url_prefix='/leads')
@@ -218,20 +217,16 @@ def update_status(id):
         
         if old_status != new_status:
             if new_status == 'contacted':
-                add_xp(XP_RULES['lead_contacted'], 'Lead contacted')
-                add_tokens(TOKEN_RULES['lead_contacted'], 'Lead contacted')
-                update_mission_progress('contact_lead')
-                ActivityLog.log_activity('lead_contacted', f'Contacted {lead.name}', lead.id, 'lead')
+                emit('lead_status_changed', status=new_status, description=f'Contacted {lead.name}',
+                     related_id=lead.id, related_type='lead')
                 flash('Status updated! +4 XP, +1 token', 'success')
             elif new_status == 'call_booked':
-                add_xp(XP_RULES['lead_call_booked'], 'Call booked')
-                ActivityLog.log_activity('call_booked', f'Booked call with {lead.name}', lead.id, 'lead')
+                emit('lead_status_changed', status=new_status, description=f'Booked call with {lead.name}',
+                     related_id=lead.id, related_type='lead')
                 flash('Status updated! +8 XP', 'success')
             elif new_status == 'proposal_sent':
-                add_xp(XP_RULES['lead_proposal_sent'], 'Proposal sent')
-                add_tokens(TOKEN_RULES['proposal_sent'], 'Proposal sent')
-                update_boss_progress('proposals')
-                ActivityLog.log_activity('proposal_sent', f'Sent proposal to {lead.name}', lead.id, 'lead')
+                emit('lead_status_changed', status=new_status, description=f'Sent proposal to {lead.name}',
+                     related_id=lead.id, related_type='lead')
                 flash('Status updated! +12 XP, +2 tokens', 'success')
             elif new_status == 'closed_lost':
                 flash('Lead marked as lost. Please select a reason.', 'info')
@@ -295,10 +290,9 @@ def convert_to_client(id):
             'closed_at': now
         })
         
-        add_xp(XP_RULES['lead_closed_won'], 'Deal closed')
-        update_boss_progress('close_deals')
-        
-        ActivityLog.log_activity('deal_closed_won', f'Closed {lead.name} (WON): {close_reason_str}', lead.id, 'lead')
+        emit('lead_status_changed', status='closed_won',
+             description=f'Closed {lead.name} (WON): {close_reason_str}',
+             related_id=lead.id, related_type='lead')
         
         WinsLog.insert({
             'title': f'Deal Won: {lead.name}',
@@ -308,7 +302,6 @@ def convert_to_client(id):
             'timestamp': now
         })
         
-        clear_all_cache()
         flash('Lead converted to client successfully!', 'success')
         return redirect(url_for('clients.detail', id=client.id))
     
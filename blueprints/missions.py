@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template
 from db_supabase import DailyMission, UserTokens, get_supabase
-from datetime import date, timedelta
+from datetime import timedelta
 import timezone as tz
 
 missions_bp = Blueprint('missions', __name__, url_prefix='/missions')
@@ -26,12 +26,7 @@ def index():
         past_missions = []
         if result.data:
             for row in result.data:
-                m = DailyMission._parse_row(row)
-                mission_date_val = getattr(m, 'mission_date', None)
-                if mission_date_val:
-                    if isinstance(mission_date_val, str):
-                        m.mission_date = date.fromisoformat(mission_date_val.split('T')[0])
-                past_missions.append(m)
+                past_missions.append(DailyMission._parse_row(row))
         
         return render_template('missions/index.html',
             mission=None,
@@ -45,12 +40,7 @@ def index():
     target = getattr(mission, 'target_count', 0) or 0
     progress = getattr(mission, 'progress_count', 0) or 0
     is_completed = getattr(mission, 'is_completed', False)
-    mission_date = getattr(mission, 'mission_date', today.isoformat())
-    
-    if isinstance(mission_date, str):
-        mission_date_obj = date.fromisoformat(mission_date.split('T')[0])
-    else:
-        mission_date_obj = mission_date
+    mission_date_obj = getattr(mission, 'mission_date', None) or today
     
     if not is_completed and progress >= target and target > 0:
         reward_tokens = getattr(mission, 'reward_tokens', 0) or 0
@@ -75,16 +65,7 @@ def index():
     past_missions = []
     if result.data:
         for row in result.data:
-            mission = DailyMission._parse_row(row)
-            # Convert mission_date string to date object for template formatting
-            mission_date = getattr(mission, 'mission_date', None)
-            if mission_date:
-                if isinstance(mission_date, str):
-                    mission.mission_date = date.fromisoformat(mission_date.split('T')[0])
-                elif hasattr(mission_date, 'date'):
-                    # If it's a datetime object, extract the date
-                    mission.mission_date = mission_date.date()
-            past_missions.append(mission)
+            past_missions.append(DailyMission._parse_row(row))
     
     token_balance = UserTokens.get_balance()
     
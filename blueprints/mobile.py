@@ -1,11 +1,14 @@
 from flask import Blueprint, render_template, request, redirect, url_for, jsonify, flash
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from db_supabase import (
     Lead, Client, Task, OutreachLog, Note, FreelancingIncome, 
-    UserStats, UserSettings, ActivityLog, get_supabase
+    UserStats, UserSettings, ActivityLog, get_supabase, parallel_queries
 )
 from blueprints.notes import get_all_tags
+from revenue import RevenueSeries, current_mrr
+from gamification_engine import emit
 import timezone as tz
+import metrics
 
 mobile_bp = Blueprint('mobile', __name__, url_prefix='/mobile')
 
@@ -20,69 +23,65 @@ def is_mobile_device():
 def index():
     today = tz.today()
     today_str = today.isoformat()
-    stats = UserStats.get_stats()
-    settings = UserSettings.get_settings()
+    first_of_month = today.replace(day=1).isoformat()
+    # Six calendar months including the current one
+    six_month_start = tz.add_months(today, -5)
+    next_month = tz.add_months(today, 1).isoformat()
     
     client = get_supabase()
     
-    tasks_result = client.table('tasks').select('*').eq('due_date', today_str).neq('status', 'done').order('id', desc=True).limit(5).execute()
-    today_tasks = [Task._parse_row(row) for row in tasks_result.data]
-    
-    # Count active leads using count query (safe - only returns count)
-    leads_count_result = client.table('leads').select('id', count='exact').filter('status', 'not.in', '("closed_won","closed_lost")').execute()
+    with parallel_queries() as q:
+        stats_future = q.submit(UserStats.get_stats)
+        q.submit(UserSettings.get_settings)
+        tasks_future = q.submit(client.table('tasks').select('*').eq('due_date', today_str).neq('status', 'done').order('id', desc=True).limit(5))
+        # Count queries only return counts
+        leads_count_future = q.submit(client.table('leads').select('id', count='exact').filter('status', 'not.in', '("closed_won","closed_lost")'))
+        clients_count_future = q.submit(client.table('clients').select('id', count='exact').eq('status', 'active'))
+        pending_count_future = q.submit(client.table('tasks').select('id', count='exact').neq('status', 'done'))
+        clients_month_future = q.submit(client.table('clients').select('id', count='exact').gte('updated_at', first_of_month))
+        # Only fetch the columns needed for sums
+        active_clients_future = q.submit(client.table('clients').select('monthly_hosting_fee,monthly_saas_fee,hosting_active,saas_active').eq('status', 'active'))
+        # Today's outreach and this month's freelance income from the daily rollup
+        month_metrics_future = q.submit(metrics.daily, today.replace(day=1), tables=('outreach_logs', 'freelance_jobs'))
+        freelance_6mo_future = q.submit(client.table('freelance_jobs').select('amount,date_completed').gte('date_completed', six_month_start.isoformat()).lt('date_completed', next_month))
+        revenue_clients_future = q.submit(client.table('clients').select('start_date,amount_charged,hosting_active,monthly_hosting_fee,saas_active,monthly_saas_fee').lt('start_date', next_month))
+        # Follow-ups need all columns for the template
+        followups_future = q.submit(client.table('leads').select('*').lte('next_action_date', today_str).filter('status', 'not.in', '("closed_won","closed_lost")').order('next_action_date').limit(3))
+    
+    stats = stats_future.result()
+    today_tasks = [Task._parse_row(row) for row in tasks_future.result().data]
+    
+    leads_count_result = leads_count_future.result()
     total_leads = leads_count_result.count if leads_count_result.count else len(leads_count_result.data)
     
-    # Count active clients (safe - only returns count)
-    clients_count_result = client.table('clients').select('id', count='exact').eq('status', 'active').execute()
+    clients_count_result = clients_count_future.result()
     total_clients = clients_count_result.count if clients_count_result.count else len(clients_count_result.data)
     
-    # Get MRR from active clients - only fetch needed columns for sum (safe)
-    active_clients = client.table('clients').select('monthly_hosting_fee,monthly_saas_fee,hosting_active,saas_active').eq('status', 'active').execute()
+    active_clients = active_clients_future.result()
     mrr = sum(
         float(row.get('monthly_hosting_fee', 0) or 0) for row in active_clients.data if row.get('hosting_active')
     ) + sum(
         float(row.get('monthly_saas_fee', 0) or 0) for row in active_clients.data if row.get('saas_active')
     )
     
-    # Count today's outreach (safe - only returns count)
-    outreach_count_result = client.table('outreach_logs').select('id', count='exact').eq('date', today_str).execute()
-    today_outreach = outreach_count_result.count if outreach_count_result.count else len(outreach_count_result.data)
+    month_metrics = month_metrics_future.result()
+    today_outreach = metrics.total(month_metrics, 'outreach_count', today, today)
     
-    # Count pending tasks (safe - only returns count)
-    pending_count_result = client.table('tasks').select('id', count='exact').neq('status', 'done').execute()
+    pending_count_result = pending_count_future.result()
     pending_tasks = pending_count_result.count if pending_count_result.count else len(pending_count_result.data)
     
-    # Get follow-ups - need all columns for template
-    followups_result = client.table('leads').select('*').lte('next_action_date', today_str).filter('status', 'not.in', '("closed_won","closed_lost")').order('next_action_date').limit(3).execute()
-    follow_ups = [Lead._parse_row(row) for row in followups_result.data]
-    
-    first_of_month = today.replace(day=1).isoformat()
-    # Only fetch amount for sum calculation (safe - only sums values)
-    freelance_result = client.table('freelance_jobs').select('amount').gte('date_completed', first_of_month).execute()
-    month_income = sum(float(row.get('amount', 0) or 0) for row in freelance_result.data)
-    
-    six_months_ago = (today - timedelta(days=180)).isoformat()
+    follow_ups = [Lead._parse_row(row) for row in followups_future.result().data]
     
-    # Freelance 6mo
-    freance_6mo = client.table('freelance_jobs').select('amount').gte('date_completed', six_months_ago).execute()
-    total_freelance_6mo = sum(float(row.get('amount', 0) or 0) for row in freance_6mo.data)
+    month_income = float(metrics.total(month_metrics, 'freelance_revenue'))
     
-    # Project revenue 6mo
-    project_6mo = client.table('clients').select('amount_charged').gte('start_date', six_months_ago).execute()
-    total_project_6mo = sum(float(row.get('amount_charged', 0) or 0) for row in project_6mo.data)
+    # Average of the monthly totals (projects + MRR in effect that month + freelance), as on the dashboard chart
+    revenue = RevenueSeries(revenue_clients_future.result().data, freelance_6mo_future.result().data)
+    avg_monthly = sum(revenue.series(six_month_start, 6)['total']) / 6
     
-    # MRR (simplification: use current MRR for previous months as historical MRR isn't fully tracked per month here)
-    total_mrr_6mo = mrr * 6
-    
-    total_6mo = total_freelance_6mo + total_project_6mo + total_mrr_6mo
-    avg_monthly = float(total_6mo) / 6 if total_6mo else 0
-    
-    # Count clients this month (safe - only returns count)
-    clients_month_result = client.table('clients').select('id', count='exact').gte('updated_at', first_of_month).execute()
+    clients_month_result = clients_month_future.result()
     clients_this_month = clients_month_result.count if clients_month_result.count else len(clients_month_result.data)
     
-    # Get MRR from active clients - only fetch needed columns for sum (safe)
-    active_clients = client.table('clients').select('monthly_hosting_fee,monthly_saas_fee').eq('status', 'active').execute()
+    # Headline MRR counts both fees for every active client
     mrr = sum(
         float(row.get('monthly_hosting_fee', 0) or 0) + float(row.get('monthly_saas_fee', 0) or 0)
         for row in active_clients.data
@@ -203,9 +202,7 @@ def lead_outreach(lead_id):
         
         Lead.update_by_id(lead_id, update_data)
         
-        add_xp(XP_RULES.get('outreach_log', 5), 'Outreach logged')
-        add_tokens(TOKEN_RULES.get('outreach_log', 1), 'Outreach logged')
-        update_mission_progress('outreach')
+        emit('outreach_logged', related_id=lead_id, related_type='lead')
         
         flash('Outreach logged', 'success')
         return redirect(url_for('mobile.lead_detail', lead_id=lead_id))
@@ -316,10 +313,7 @@ def task_complete(task_id):
     Task.update_by_id(task_id, {'status': 'done'})
     
     if old_status != 'done':
-        add_xp(XP_RULES.get('task_done', 8), 'Task completed')
-        add_tokens(TOKEN_RULES.get('task_done', 1), 'Task completed')
-        update_mission_progress('complete_tasks')
-        ActivityLog.log_activity('task_completed', f'Completed task: {getattr(task, "title", "")}', task_id, 'task')
+        emit('task_done', description=f'Completed task: {getattr(task, "title", "")}', related_id=task_id, related_type='task')
         flash('Task completed! +8 XP, +1 token', 'success')
     else:
         flash('Task already completed', 'success')
@@ -471,34 +465,34 @@ def freelancing():
     current_month_start = today.replace(day=1).isoformat()
     client = get_supabase()
     
+    # One pass over all clients and jobs gives this month's figures and the all-time totals
+    with parallel_queries() as q:
+        jobs_future = q.submit(client.table('freelance_jobs').select('*').order('date_completed', desc=True))
+        clients_future = q.submit(client.table('clients').select('name,status,start_date,amount_charged,hosting_active,monthly_hosting_fee,saas_active,monthly_saas_fee').order('start_date', desc=True))
+    jobs = jobs_future.result().data
+    clients = clients_future.result().data
+    revenue = RevenueSeries(clients, jobs)
+    this_month = revenue.month(today)
+    
     # Freelance this month
-    freelance_result = client.table('freelance_jobs').select('*').gte('date_completed', current_month_start).order('date_completed', desc=True).execute()
-    freelance_entries = [FreelancingIncome._parse_row(row) for row in freelance_result.data]
-    freelance_month = sum(float(getattr(e, 'amount', 0) or 0) for e in freelance_entries)
+    freelance_entries = [FreelancingIncome._parse_row(row) for row in jobs if (row.get('date_completed') or '') >= current_month_start]
+    freelance_month = this_month['freelance_revenue']
     
     # Project revenue this month
-    project_result = client.table('clients').select('amount_charged,name,start_date').gte('start_date', current_month_start).order('start_date', desc=True).execute()
-    project_month = sum(float(row.get('amount_charged', 0) or 0) for row in project_result.data)
-    recent_projects = project_result.data[:5]
+    project_month = this_month['project_revenue']
+    recent_projects = [row for row in clients if (row.get('start_date') or '') >= current_month_start][:5]
     
     # MRR from active clients
-    mrr_result = client.table('clients').select('monthly_hosting_fee,monthly_saas_fee,hosting_active,saas_active').eq('status', 'active').execute()
-    hosting_mrr = sum(float(row.get('monthly_hosting_fee', 0) or 0) for row in mrr_result.data if row.get('hosting_active'))
-    saas_mrr = sum(float(row.get('monthly_saas_fee', 0) or 0) for row in mrr_result.data if row.get('saas_active'))
+    hosting_mrr, saas_mrr = current_mrr([row for row in clients if row.get('status') == 'active'])
     total_mrr = hosting_mrr + saas_mrr
     
     # Total this month
     total_this_month = freelance_month + project_month + total_mrr
     
-    # All-time totals
-    all_freelance = client.table('freelance_jobs').select('amount').execute()
-    all_time_freelance = sum(float(row.get('amount', 0) or 0) for row in all_freelance.data)
-    
-    all_projects = client.table('clients').select('amount_charged').execute()
-    all_time_projects = sum(float(row.get('amount_charged', 0) or 0) for row in all_projects.data)
-    
     # Lifetime revenue (projects + freelance, MRR is recurring so not counted in lifetime the same way)
-    lifetime_revenue = all_time_freelance + all_time_projects
+    totals = revenue.totals()
+    all_time_freelance = totals['freelance_revenue']
+    lifetime_revenue = totals['lifetime_revenue']
     
     return render_template('mobile/freelancing.html',
         freelance_entries=freelance_entries,
@@ -560,9 +554,7 @@ def quick_outreach():
                 'updated_at': tz.now_iso()
             })
         
-        add_xp(XP_RULES.get('outreach_log', 5), 'Outreach logged')
-        add_tokens(TOKEN_RULES.get('outreach_log', 1), 'Outreach logged')
-        update_mission_progress('outreach')
+        emit('outreach_logged')
         
         flash('Outreach logged', 'success')
         return redirect(url_for('mobile.index'))
@@ -3,6 +3,8 @@ from db_supabase import (MonthlyReview, XPLog, TokenTransaction, OutreachLog, Le
                          DailyMission, BossBattle, UserStats, WinsLog, ActivityLog, Client, get_supabase)
 from datetime import datetime, date, timedelta
 import timezone as tz
+import metrics
+from revenue import RevenueSeries
 from collections import Counter
 
 monthly_review_bp = Blueprint('monthly_review', __name__)
@@ -25,16 +27,13 @@ def generate_review_content(year_month):
     
     client = get_supabase()
     
-    xp_result = client.table('xp_logs').select('amount').gte('created_at', first_datetime).lte('created_at', last_datetime).execute()
-    total_xp = sum(row.get('amount', 0) or 0 for row in xp_result.data)
+    # XP, token gains and outreach per day from the daily rollup
+    days = metrics.daily(first_day, last_day, tables=('xp_logs', 'token_transactions', 'outreach_logs'))
+    total_xp = metrics.total(days, 'xp_earned')
+    token_gains = metrics.total(days, 'tokens_earned')
+    total_outreach = metrics.total(days, 'outreach_count')
     
-    token_result = client.table('token_transactions').select('amount').gt('amount', 0).gte('created_at', first_datetime).lte('created_at', last_datetime).execute()
-    token_gains = sum(row.get('amount', 0) or 0 for row in token_result.data)
-    
-    outreach_result = client.table('outreach_logs').select('id, date, outcome', count='exact').gte('date', first_day.isoformat()).lte('date', last_day.isoformat()).execute()
-    total_outreach = len(outreach_result.data)
-    
-    outreach_calls_booked = sum(1 for row in outreach_result.data if row.get('outcome') == 'booked_call')
+    outreach_calls_booked = sum((values.get('outreach_by_outcome') or {}).get('booked_call', 0) for values in days.values())
     calls_booked = outreach_calls_booked
     
     proposals_result = client.table('activity_log').select('id', count='exact').eq('action_type', 'proposal_sent').execute()
@@ -64,17 +63,15 @@ def generate_review_content(year_month):
     clients_result = client.table('clients').select('*').execute()
     clients_data = clients_result.data
     
-    new_clients = [c for c in clients_data if first_datetime <= c.get('created_at', '') <= last_datetime]
-    new_client_count = len(new_clients)
-    project_revenue = sum(float(c.get('amount_charged', 0) or 0) for c in new_clients)
+    # New clients and MRR by start_date, matching the dashboard and analytics revenue figures
+    month_revenue = RevenueSeries(clients_data).month(first_day)
+    new_client_count = month_revenue['new_clients']
+    project_revenue = month_revenue['project_revenue']
     
     active_clients_count = sum(1 for c in clients_data if c.get('status') == 'active' and c.get('created_at', '') <= last_datetime)
     
-    hosting_clients = [c for c in clients_data if c.get('hosting_active') and c.get('created_at', '') <= last_datetime]
-    monthly_hosting_revenue = sum(float(c.get('monthly_hosting_fee', 0) or 0) for c in hosting_clients)
-    
-    saas_clients = [c for c in clients_data if c.get('saas_active') and c.get('created_at', '') <= last_datetime]
-    monthly_saas_revenue = sum(float(c.get('monthly_saas_fee', 0) or 0) for c in saas_clients)
+    monthly_hosting_revenue = month_revenue['hosting_mrr']
+    monthly_saas_revenue = month_revenue['saas_mrr']
     
     mrr = monthly_hosting_revenue + monthly_saas_revenue
     total_revenue = project_revenue + mrr
@@ -85,11 +82,8 @@ def generate_review_content(year_month):
     streak_current = getattr(stats, 'current_outreach_streak_days', 0) or 0
     streak_longest = getattr(stats, 'longest_outreach_streak_days', 0) or 0
     
-    outreach_by_day = {}
-    for row in outreach_result.data:
-        d = row.get('date', '')
-        if d:
-            outreach_by_day[d] = outreach_by_day.get(d, 0) + 1
+    outreach_by_day = {d.isoformat(): values['outreach_count'] for d, values in sorted(days.items())
+                       if values.get('outreach_count')}
     
     if outreach_by_day:
         sorted_days = sorted(outreach_by_day.items(), key=lambda x: x[1], reverse=True)
@@ -170,8 +164,9 @@ def generate_review_content(year_month):
     return content
 
 
-def auto_generate_monthly_review_if_needed():
-    today = tz.today()
+def auto_generate_monthly_review_if_needed(today=None):
+    # today: the day to act as, so the scheduler can catch up on a missed month end
+    today = today or tz.today()
     
     if today.month == 12:
         next_month_first = date(today.year + 1, 1, 1)
@@ -1,11 +1,13 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
-from db_supabase import Note, UserStats, ActivityLog, XPLog, get_supabase
+from db_supabase import Note, UserStats, ActivityLog, get_supabase
 from datetime import date, datetime
 import timezone as tz
+from cache import cached
 
 notes_bp = Blueprint('notes', __name__, url_prefix='/notes')
 
 
+@cached(ttl=300, tables=('notes',))
 def get_all_tags():
     client = get_supabase()
     result = client.table('notes').select('tags').filter('tags', 'not.is', 'null').neq('tags', '').execute()
@@ -118,10 +120,7 @@ def new():
         })
         
         if is_first_today:
-            user_stats = UserStats.get_stats()
-            new_xp = (getattr(user_stats, 'current_xp', 0) or 0) + 2
-            UserStats.update_by_id(user_stats.id, {'current_xp': new_xp})
-            XPLog.insert({'amount': 2, 'reason': 'First note of the day'})
+            UserStats.add_xp([{'amount': 2, 'reason': 'First note of the day'}])
             ActivityLog.log_activity('note_created', f'Created note: {title}', note.id, 'note')
             flash(f'Note created! +2 XP for first note today!', 'success')
         else:
@@ -201,10 +200,7 @@ def pin(id):
         Note.update_by_id(id, {'pinned': True, 'updated_at': tz.now_iso()})
         
         if not pinned_today:
-            user_stats = UserStats.get_stats()
-            new_xp = (getattr(user_stats, 'current_xp', 0) or 0) + 1
-            UserStats.update_by_id(user_stats.id, {'current_xp': new_xp})
-            XPLog.insert({'amount': 1, 'reason': 'Pinned a note'})
+            UserStats.add_xp([{'amount': 1, 'reason': 'Pinned a note'}])
             flash(f'Note pinned! +1 XP', 'success')
         else:
             flash('Note pinned!', 'success')
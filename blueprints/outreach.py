@@ -1,8 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
-from db_supabase import OutreachLog, Lead, ActivityLog, get_supabase
+from db_supabase import OutreachLog, Lead, get_supabase
 from datetime import datetime, date, timedelta
-from blueprints.gamification import add_xp, update_outreach_streak, XP_RULES, TOKEN_RULES, add_tokens, update_mission_progress
-from blueprints.boss import update_boss_progress
+from gamification_engine import emit
 import timezone as tz
 
 outreach_bp = Blueprint('outreach', __name__, url_prefix='/outreach')
@@ -106,17 +105,9 @@ def create():
         'notes': request.form.get('notes')
     })
     
-    add_xp(XP_RULES['outreach_log'], 'Outreach logged')
-    add_tokens(TOKEN_RULES['outreach_log'], 'Outreach logged')
-    update_outreach_streak()
-    update_mission_progress('outreach')
-    update_boss_progress('outreach')
-    
-    if is_cold_lead_revival:
-        update_boss_progress('revive_leads')
-    
-    ActivityLog.log_activity('outreach_logged', f'Logged {log.type} outreach for {lead_name}', 
-                            lead_id, 'lead' if lead_id else None)
+    emit('outreach_logged', revived=is_cold_lead_revival,
+         description=f'Logged {log.type} outreach for {lead_name}',
+         related_id=lead_id, related_type='lead' if lead_id else None)
     
     flash('Outreach logged successfully! +5 XP, +1 token', 'success')
     
@@ -7,8 +7,6 @@ rewards_bp = Blueprint('rewards', __name__, url_prefix='/rewards')
 
 @rewards_bp.route('/')
 def index():
-    RewardItem.seed_defaults()
-    
     token_balance = UserTokens.get_balance()
     rewards = RewardItem.query_filter({'is_active': True}, order_by='cost')
     
@@ -1,80 +1,44 @@
 from flask import Blueprint, request, jsonify, url_for
-from db_supabase import Lead, Client, Task, Note, ActivityLog, BossBattle, DailyMission, get_supabase
+from search_index import cached_search, CATEGORIES
+import name_index
 
 search_bp = Blueprint('search', __name__, url_prefix='/search')
 
+# Result category -> (item type, link builder)
+RESULT_LINKS = {
+    'leads': ('lead', lambda id: url_for('leads.detail', id=id)),
+    'clients': ('client', lambda id: url_for('clients.detail', id=id)),
+    'tasks': ('task', lambda id: url_for('tasks.index') + f'#task-{id}'),
+    'notes': ('note', lambda id: url_for('notes.edit', id=id)),
+    'timeline': ('timeline', lambda id: url_for('timeline.index')),
+    'missions': ('mission', lambda id: url_for('missions.index')),
+    'boss_fights': ('boss_fight', lambda id: url_for('boss.index')),
+}
+
 @search_bp.route('')
 def search():
     q = request.args.get('q', '').strip()
-    
+
     if not q or len(q) < 2:
-        return jsonify({
-            'leads': [],
-            'clients': [],
-            'tasks': [],
-            'notes': [],
-            'timeline': [],
-            'missions': [],
-            'boss_fights': []
-        })
-    
-    client = get_supabase()
+        return jsonify({category: [] for category in CATEGORIES})
+
+    matches_by_category = {category: [m[:3] for m in matches] for category, matches in cached_search(q, per_source=20).items()}
+    # Lead and client names also match with typos; fuzzy hits go after the full-text ones
+    for category, fuzzy in name_index.index.lookup(q, limit=20).items():
+        matches = matches_by_category[category]
+        found = {id for id, _, _ in matches}
+        matches.extend((id, label, None) for id, label, _ in fuzzy if id not in found)
+        del matches[20:]
+
     results = {}
-    
-    leads_result = client.table('leads').select('*').neq('status', 'closed_won').or_(f'name.ilike.%{q}%,business_name.ilike.%{q}%,notes.ilike.%{q}%').limit(20).execute()
-    results['leads'] = [{
-        'id': l['id'],
-        'label': l['name'] + (f" ({l['business_name']})" if l.get('business_name') else ''),
-        'type': 'lead',
-        'link': url_for('leads.detail', id=l['id'])
-    } for l in leads_result.data]
-    
-    clients_result = client.table('clients').select('*').or_(f'name.ilike.%{q}%,business_name.ilike.%{q}%').limit(20).execute()
-    results['clients'] = [{
-        'id': c['id'],
-        'label': c['name'] + (f" ({c['business_name']})" if c.get('business_name') else ''),
-        'type': 'client',
-        'link': url_for('clients.detail', id=c['id'])
-    } for c in clients_result.data]
-    
-    tasks_result = client.table('tasks').select('*').or_(f'title.ilike.%{q}%,description.ilike.%{q}%').limit(20).execute()
-    results['tasks'] = [{
-        'id': t['id'],
-        'label': t['title'],
-        'type': 'task',
-        'link': url_for('tasks.index') + f'#task-{t["id"]}'
-    } for t in tasks_result.data]
-    
-    notes_result = client.table('notes').select('*').or_(f'title.ilike.%{q}%,content.ilike.%{q}%').limit(20).execute()
-    results['notes'] = [{
-        'id': n['id'],
-        'label': n['title'],
-        'type': 'note',
-        'link': url_for('notes.edit', id=n['id'])
-    } for n in notes_result.data]
-    
-    timeline_result = client.table('activity_log').select('*').ilike('description', f'%{q}%').order('created_at', desc=True).limit(20).execute()
-    results['timeline'] = [{
-        'id': a['id'],
-        'label': a['description'][:80] + ('...' if len(a.get('description', '')) > 80 else ''),
-        'type': 'timeline',
-        'link': url_for('timeline.index')
-    } for a in timeline_result.data]
-    
-    missions_result = client.table('daily_missions').select('*').ilike('mission_type', f'%{q}%').order('mission_date', desc=True).limit(20).execute()
-    results['missions'] = [{
-        'id': m['id'],
-        'label': f"{m.get('mission_type', '')} - {m.get('mission_date', '')}",
-        'type': 'mission',
-        'link': url_for('missions.index')
-    } for m in missions_result.data]
-    
-    boss_result = client.table('boss_battles').select('*').ilike('boss_name', f'%{q}%').order('month_start', desc=True).limit(20).execute()
-    results['boss_fights'] = [{
-        'id': b['id'],
-        'label': b.get('boss_name', '')[:80],
-        'type': 'boss_fight',
-        'link': url_for('boss.index')
-    } for b in boss_result.data]
-    
+    for category, matches in matches_by_category.items():
+        item_type, link = RESULT_LINKS[category]
+        results[category] = [{
+            'id': id,
+            'label': label,
+            'snippet': snippet,
+            'type': item_type,
+            'link': link(id)
+        } for id, label, snippet in matches]
+
     return jsonify(results)
@@ -1,8 +1,8 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort
-from db_supabase import Task, Lead, Client, ActivityLog, get_supabase
+from db_supabase import Task, Lead, Client, ActivityLog, get_supabase, preload
 from datetime import datetime, date
 import timezone as tz
-from blueprints.gamification import add_xp, XP_RULES, TOKEN_RULES, add_tokens, update_mission_progress
+from gamification_engine import emit
 
 tasks_bp = Blueprint('tasks', __name__, url_prefix='/tasks')
 
@@ -15,17 +15,9 @@ def parse_date(date_str):
         return None
 
 def _load_related_entities(tasks):
-    """Load related lead/client objects for tasks."""
-    for task in tasks:
-        if hasattr(task, 'related_lead_id') and task.related_lead_id:
-            task.lead = Lead.get_by_id(task.related_lead_id)
-        else:
-            task.lead = None
-        
-        if hasattr(task, 'related_client_id') and task.related_client_id:
-            task.client = Client.get_by_id(task.related_client_id)
-        else:
-            task.client = None
+    """Load related lead/client objects for tasks (one query per relation)."""
+    preload(tasks, 'related_lead_id', Lead)
+    preload(tasks, 'related_client_id', Client)
     return tasks
 
 @tasks_bp.route('/')
@@ -51,19 +43,17 @@ def index():
     
     result = query.order('due_date', desc=False, nullsfirst=False).order('created_at', desc=True).execute()
     tasks = [Task._parse_row(row) for row in result.data]
-    tasks = _load_related_entities(tasks)
     
     completed_result = client.table('tasks').select('*').eq('status', 'done').order('created_at', desc=True).execute()
     completed_tasks = [Task._parse_row(row) for row in completed_result.data]
-    completed_tasks = _load_related_entities(completed_tasks)
     
     overdue_result = client.table('tasks').select('*').lt('due_date', today.isoformat()).neq('status', 'done').order('due_date', desc=False).execute()
     overdue_tasks = [Task._parse_row(row) for row in overdue_result.data]
-    overdue_tasks = _load_related_entities(overdue_tasks)
     
     today_result = client.table('tasks').select('*').eq('due_date', today.isoformat()).order('created_at', desc=True).execute()
     today_tasks = [Task._parse_row(row) for row in today_result.data]
-    today_tasks = _load_related_entities(today_tasks)
+    
+    _load_related_entities(tasks + completed_tasks + overdue_tasks + today_tasks)
     
     leads = Lead.query_all(order_by='name')
     clients = Client.query_all(order_by='name')
@@ -140,10 +130,7 @@ def update_status(id):
         Task.update_by_id(id, {'status': new_status})
         
         if new_status == 'done' and old_status != 'done':
-            add_xp(XP_RULES['task_done'], 'Task completed')
-            add_tokens(TOKEN_RULES['task_done'], 'Task completed')
-            update_mission_progress('complete_tasks')
-            ActivityLog.log_activity('task_completed', f'Completed task: {task.title}', task.id, 'task')
+            emit('task_done', description=f'Completed task: {task.title}', related_id=task.id, related_type='task')
             message = 'Task completed! +8 XP, +1 token'
         else:
             message = 'Task status updated!'
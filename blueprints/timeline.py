@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template, request
 from db_supabase import ActivityLog, get_supabase
-from datetime import date, timedelta
+from datetime import timedelta
 import timezone as tz
 
 timeline_bp = Blueprint('timeline', __name__, url_prefix='/timeline')
@@ -57,11 +57,8 @@ def group_activities_by_day(activities):
     }
     
     for activity in activities:
-        created = getattr(activity, 'timestamp', '')
-        if isinstance(created, str):
-            activity_date = date.fromisoformat(created.split('T')[0])
-        else:
-            activity_date = created.date() if hasattr(created, 'date') else today
+        created = getattr(activity, 'timestamp', None)
+        activity_date = tz.local_date(created) if created else today
         
         if activity_date == today:
             groups['Today'].append(activity)
@@ -1,48 +1,522 @@
+import os
+import sys
 import time
 import logging
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import g, has_request_context
 
 logger = logging.getLogger(__name__)
 
+
+def _approx_size(value, _depth=0):
+    """Rough in-memory size of a cached value; walks containers a few levels deep."""
+    size = sys.getsizeof(value, 64)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += _approx_size(k, _depth + 1) + _approx_size(v, _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += _approx_size(item, _depth + 1)
+    elif hasattr(value, '__dict__'):
+        size += _approx_size(vars(value), _depth + 1)
+    return size
+
+
+class _Flight:
+    """An in-progress load of one key; concurrent callers wait on it instead of loading again."""
+    
+    def __init__(self, versions, seq=None):
+        self.versions = versions
+        # shared invalidation log position when the load started
+        self.seq = seq
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+    
+    def finish(self, value=None, error=None):
+        self._value = value
+        self._error = error
+        self._done.set()
+    
+    def wait(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
 class InMemoryCache:
-    def __init__(self, default_ttl=30):
-        self._cache = {}
+    """
+    Thread-safe LRU cache bounded by entry count and approximate byte size.
+    Expired entries are removed lazily on access and by a periodic sweep.
+    
+    get_or_load() adds single-flight loading and stale-while-revalidate: entries stored with a
+    stale_ttl are served for that long past expiry while one background refresh recomputes them.
+    
+    With a shared `backend` (see cache_backend.py) this cache acts as L1: misses fall through to
+    the backend, writes go to both, and invalidations made by other processes are applied
+    before every lookup.
+    """
+    
+    def __init__(self, default_ttl=30, max_entries=1024, max_bytes=64 * 1024 * 1024, sweep_interval=60, backend=None):
+        self._cache = OrderedDict()
+        # table name -> keys of entries computed from that table
+        self._tables = {}
+        # table name -> invalidation count, so loads that raced a write are not stored
+        self._versions = {}
+        self._epoch = 0
+        # bumped by every invalidation, so backend reads that raced one are not promoted to L1
+        self._generation = 0
+        self._flights = {}
+        self._refresher = None
+        self._backend = backend
         self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.time() + sweep_interval
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale_hits': 0, 'shared_hits': 0, 'coalesced': 0, 'refreshes': 0,
+                       'sets': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
     
     def get(self, key):
-        if key in self._cache:
-            entry = self._cache[key]
-            if time.time() < entry['expires']:
-                logger.debug(f"[Cache HIT] {key}")
+        self._sync()
+        with self._lock:
+            now = time.time()
+            self._maybe_sweep(now)
+            entry = self._cache.get(key)
+            if entry is not None:
+                if now < entry['expires']:
+                    self._cache.move_to_end(key)
+                    self._stats['hits'] += 1
+                    logger.debug(f"[Cache HIT] {key}")
+                    return entry['value'], True
+                if now >= entry['stale_until']:
+                    self._remove(key)
+                    self._stats['expirations'] += 1
+                    logger.debug(f"[Cache EXPIRED] {key}")
+        
+        entry = self._fetch_shared(key)
+        with self._lock:
+            if entry is not None and time.time() < entry['expires']:
+                self._stats['hits'] += 1
                 return entry['value'], True
+            self._stats['misses'] += 1
+            logger.debug(f"[Cache MISS] {key}")
+            return None, False
+    
+    def set(self, key, value, ttl=None, tables=None, stale_ttl=0):
+        """
+        Stores a value. `tables` lists the tables the value is derived from; a write to any of
+        them invalidates the entry. Entries without tables only expire by TTL. `stale_ttl` keeps
+        the entry around after expiry so get_or_load() can serve it while refreshing.
+        """
+        if ttl is None:
+            ttl = self._default_ttl
+        tables = tuple(tables or ())
+        now = time.time()
+        if not self._store(key, value, now + ttl, now + ttl + stale_ttl, tables):
+            return
+        with self._lock:
+            self._stats['sets'] += 1
+        if self._backend is not None:
+            self._backend.set(key, value, now + ttl, now + ttl + stale_ttl, tables)
+        logger.debug(f"[Cache SET] {key} (TTL: {ttl}s, tables: {', '.join(tables) or '-'})")
+    
+    def _store(self, key, value, expires, stale_until, tables):
+        size = _approx_size(value)
+        if size > self._max_bytes:
+            logger.warning(f"[Cache] Not caching {key}: ~{size} bytes exceeds limit of {self._max_bytes}")
+            return False
+        with self._lock:
+            self._maybe_sweep(time.time())
+            self._remove(key)
+            self._cache[key] = {
+                'value': value,
+                'expires': expires,
+                'stale_until': stale_until,
+                'tables': tables,
+                'size': size
+            }
+            self._bytes += size
+            for table in tables:
+                self._tables.setdefault(table, set()).add(key)
+            self._evict()
+        return True
+    
+    def _fetch_shared(self, key):
+        """Reads key from the shared backend and copies it into L1. Returns the L1 entry or None."""
+        if self._backend is None:
+            return None
+        generation = self._generation
+        shared = self._backend.get(key)
+        if shared is None:
+            return None
+        value, expires, stale_until, tables = shared
+        with self._lock:
+            if generation != self._generation:
+                return None
+            if not self._store(key, value, expires, stale_until, tables):
+                return None
+            if time.time() < expires:
+                self._stats['shared_hits'] += 1
+            logger.debug(f"[Cache SHARED] {key}")
+            return self._cache.get(key)
+    
+    def _sync(self):
+        """Applies invalidations made by other processes to L1."""
+        if self._backend is None:
+            return
+        for kind, target in self._backend.poll():
+            if kind == 'tables':
+                self._invalidate_local(target.split(','))
+            elif kind == 'key':
+                self._delete_local(target)
+            elif kind == 'clear':
+                self._clear_local()
+    
+    def get_or_load(self, key, loader, ttl=None, stale_ttl=0, tables=None):
+        """
+        Returns the cached value for key, calling loader() to compute it on a miss.
+        Only one caller runs the loader for a key at a time; concurrent callers wait for its
+        result. Within stale_ttl after expiry the old value is returned immediately and the
+        loader runs once in the background. Invalidation removes the entry outright, so
+        writes are never answered with a stale value.
+        """
+        tables = tuple(tables or ())
+        self._sync()
+        with self._lock:
+            now = time.time()
+            self._maybe_sweep(now)
+            entry = self._cache.get(key)
+            if entry is not None and now < entry['expires']:
+                self._cache.move_to_end(key)
+                self._stats['hits'] += 1
+                logger.debug(f"[Cache HIT] {key}")
+                return entry['value']
+        
+        # Another worker may already have computed (or refreshed) it
+        shared = self._fetch_shared(key)
+        
+        with self._lock:
+            now = time.time()
+            if shared is not None and now < shared['expires']:
+                self._stats['hits'] += 1
+                return shared['value']
+            
+            entry = self._cache.get(key)
+            flight = self._flights.get(key)
+            if entry is not None and now < entry['stale_until']:
+                self._cache.move_to_end(key)
+                self._stats['stale_hits'] += 1
+                if flight is None:
+                    flight = self._start_flight(key, tables)
+                    self._stats['refreshes'] += 1
+                    self._get_refresher().submit(self._refresh, key, loader, ttl, stale_ttl, tables, flight)
+                logger.debug(f"[Cache STALE] {key}")
+                return entry['value']
+            
+            self._stats['misses'] += 1
+            leader = flight is None
+            if leader:
+                flight = self._start_flight(key, tables)
             else:
-                del self._cache[key]
-                logger.debug(f"[Cache EXPIRED] {key}")
-        logger.debug(f"[Cache MISS] {key}")
-        return None, False
+                self._stats['coalesced'] += 1
+        
+        if not leader:
+            logger.debug(f"[Cache WAIT] {key}")
+            return flight.wait()
+        return self._load(key, loader, ttl, stale_ttl, tables, flight)
+    
+    def _start_flight(self, key, tables):
+        seq = self._backend.last_seq if self._backend is not None else None
+        flight = _Flight((self._epoch, tuple(self._versions.get(t, 0) for t in tables)), seq)
+        self._flights[key] = flight
+        return flight
     
-    def set(self, key, value, ttl=None):
+    def _end_flight(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+    
+    def _load(self, key, loader, ttl, stale_ttl, tables, flight):
+        try:
+            value = loader()
+        except Exception as e:
+            with self._lock:
+                self._end_flight(key, flight)
+            flight.finish(error=e)
+            raise
         if ttl is None:
             ttl = self._default_ttl
-        self._cache[key] = {
-            'value': value,
-            'expires': time.time() + ttl
-        }
-        logger.debug(f"[Cache SET] {key} (TTL: {ttl}s)")
+        now = time.time()
+        expires, stale_until = now + ttl, now + ttl + stale_ttl
+        self._sync()
+        with self._lock:
+            versions = (self._epoch, tuple(self._versions.get(t, 0) for t in tables))
+            stored = versions == flight.versions and self._store(key, value, expires, stale_until, tables)
+            if stored:
+                self._stats['sets'] += 1
+            elif versions != flight.versions:
+                logger.debug(f"[Cache] {key} invalidated while loading, not storing")
+            self._end_flight(key, flight)
+        if stored and self._backend is not None:
+            # Skipped if any process invalidated these tables after the load started
+            self._backend.set(key, value, expires, stale_until, tables, since_seq=flight.seq)
+        flight.finish(value=value)
+        return value
+    
+    def _refresh(self, key, loader, ttl, stale_ttl, tables, flight):
+        try:
+            self._load(key, loader, ttl, stale_ttl, tables, flight)
+        except Exception as e:
+            logger.warning(f"[Cache] Background refresh of {key} failed: {e}")
+    
+    def _get_refresher(self):
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cache-refresh')
+            return self._refresher
+    
+    def delete(self, key):
+        self._delete_local(key)
+        if self._backend is not None:
+            self._backend.delete(key)
+    
+    def _delete_local(self, key):
+        with self._lock:
+            self._generation += 1
+            self._remove(key)
+    
+    def invalidate_tables(self, *tables):
+        count = self._invalidate_local(tables)
+        if self._backend is not None:
+            self._backend.invalidate_tables(tables)
+        return count
+    
+    def _invalidate_local(self, tables):
+        with self._lock:
+            self._generation += 1
+            keys = set()
+            for table in tables:
+                keys |= self._tables.pop(table, set())
+                self._versions[table] = self._versions.get(table, 0) + 1
+            for key in keys:
+                self._remove(key)
+            self._stats['invalidations'] += len(keys)
+        if keys:
+            logger.debug(f"[Cache INVALIDATE] {', '.join(tables)}: {len(keys)} entries removed")
+        return len(keys)
+    
+    def table_versions(self, tables):
+        """
+        (epoch, {table: invalidation count}) after applying other processes' invalidations.
+        Lets in-memory structures outside the cache tell whether a table was written since they loaded it.
+        """
+        self._sync()
+        with self._lock:
+            return self._epoch, {table: self._versions.get(table, 0) for table in tables}
+    
+    def sweep(self):
+        """Removes every expired entry. Called periodically from get/set."""
+        with self._lock:
+            now = time.time()
+            self._next_sweep = now + self._sweep_interval
+            expired = [key for key, entry in self._cache.items() if entry['stale_until'] <= now]
+            for key in expired:
+                self._remove(key)
+            self._stats['expirations'] += len(expired)
+        if self._backend is not None:
+            self._backend.sweep()
+        if expired:
+            logger.debug(f"[Cache SWEEP] {len(expired)} expired entries removed")
+        return len(expired)
+    
+    def _maybe_sweep(self, now):
+        if now >= self._next_sweep:
+            self.sweep()
+    
+    def _evict(self):
+        while self._cache and (len(self._cache) > self._max_entries or self._bytes > self._max_bytes):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self._stats['evictions'] += 1
+            logger.debug(f"[Cache EVICT] {key}")
+    
+    def _remove(self, key):
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry['size']
+        for table in entry['tables']:
+            keys = self._tables.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tables[table]
     
     def clear(self):
-        count = len(self._cache)
-        self._cache = {}
+        self._clear_local()
+        if self._backend is not None:
+            self._backend.clear()
+    
+    def _clear_local(self):
+        with self._lock:
+            count = len(self._cache)
+            self._cache = OrderedDict()
+            self._tables = {}
+            self._bytes = 0
+            self._epoch += 1
+            self._generation += 1
         if count > 0:
             logger.debug(f"[Cache CLEAR] {count} entries removed")
+    
+    @property
+    def shared(self):
+        """True if invalidations reach the other processes on the host (shared backend)."""
+        return self._backend is not None
+    
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            stats = {
+                **self._stats,
+                'hit_rate': round(self._stats['hits'] / lookups, 4) if lookups else None,
+                'entries': len(self._cache),
+                'bytes': self._bytes,
+                'max_entries': self._max_entries,
+                'max_bytes': self._max_bytes,
+                'tables': {table: len(keys) for table, keys in self._tables.items()}
+            }
+        if self._backend is not None:
+            stats['shared'] = self._backend.stats()
+        return stats
+    
+    def reset_stats(self):
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = 0
+
+
+def _worker_count():
+    """Worker processes serving the app: gunicorn's --workers/-w or WEB_CONCURRENCY, else 1."""
+    if 'gunicorn' not in sys.modules:
+        return 1
+    args = sys.argv[1:]
+    try:
+        for i, arg in enumerate(args):
+            if arg in ('-w', '--workers') and i + 1 < len(args):
+                return int(args[i + 1])
+            if arg.startswith('--workers='):
+                return int(arg.split('=', 1)[1])
+            if arg.startswith('-w') and arg[2:].isdigit():
+                return int(arg[2:])
+        return int(os.environ.get('WEB_CONCURRENCY', 1))
+    except ValueError:
+        return 1
+
+
+def _create_cache():
+    backend = None
+    # Several workers need the shared backend, or a write in one leaves the others' entries stale
+    default = 'sqlite' if _worker_count() > 1 else 'memory'
+    if os.environ.get('CACHE_BACKEND', default).lower() == 'sqlite':
+        from cache_backend import SQLiteCacheBackend, private_dir
+        try:
+            backend = SQLiteCacheBackend(os.environ.get('CACHE_PATH') or os.path.join(private_dir(), 'cache.db'))
+            logger.info(f"[Cache] Using shared SQLite cache at {backend.path}")
+        except OSError as e:
+            # Refuse a file someone else could have planted or can write to
+            logger.error(f"[Cache] Not using the shared cache, each worker keeps its own: {e}")
+    return InMemoryCache(
+        default_ttl=60,
+        max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', 1024)),
+        max_bytes=int(os.environ.get('CACHE_MAX_MB', 64)) * 1024 * 1024,
+        backend=backend
+    )
 
 
-cache = InMemoryCache(default_ttl=60)
+cache = _create_cache()
 
 
 CACHE_KEY_LIFETIME_REVENUE = 'dashboard:lifetime_revenue'
 CACHE_KEY_DASHBOARD_CHARTS = 'dashboard:charts'
 CACHE_KEY_MRR = 'dashboard:mrr'
 
+# Tables each shared key is computed from
+REVENUE_TABLES = ('clients', 'freelance_jobs')
+MRR_TABLES = ('clients',)
+
+
+def invalidate_tables(*tables):
+    """Drops every cache entry derived from any of the given tables."""
+    memo = _request_memo()
+    if memo:
+        for key in [k for k, (_, deps) in memo.items() if set(deps) & set(tables)]:
+            del memo[key]
+    return cache.invalidate_tables(*tables)
+
+
+def table_versions(*tables):
+    return cache.table_versions(tables)
+
 
 def clear_all_cache():
+    memo = _request_memo()
+    if memo:
+        memo.clear()
     cache.clear()
+
+
+def get_cache_stats():
+    return cache.stats()
+
+
+def _request_memo():
+    if not has_request_context():
+        return None
+    if not hasattr(g, '_cached_calls'):
+        g._cached_calls = {}
+    return g._cached_calls
+
+
+def cached(ttl=None, tables=(), key=None, stale_ttl=0):
+    """
+    Memoizes a function's result in the current request and in the process cache.
+    `tables` lists the tables the result is computed from; writes to them invalidate both.
+    `key` is either a fixed cache key or a callable taking the function's arguments; by
+    default the key is the function name plus its arguments, which must have a stable repr.
+    The undecorated function stays available as `fn.uncached`.
+    """
+    tables = tuple(tables)
+    
+    def decorator(fn):
+        prefix = f"{fn.__module__}.{fn.__qualname__}"
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if key is None:
+                cache_key = f"{prefix}:{args!r}:{sorted(kwargs.items())!r}"
+            elif callable(key):
+                cache_key = f"{prefix}:{key(*args, **kwargs)}"
+            else:
+                cache_key = key
+            
+            memo = _request_memo()
+            if memo is not None and cache_key in memo:
+                return memo[cache_key][0]
+            
+            value = cache.get_or_load(cache_key, lambda: fn(*args, **kwargs),
+                                      ttl=ttl, stale_ttl=stale_ttl, tables=tables)
+            if memo is not None:
+                memo[cache_key] = (value, tables)
+            return value
+        
+        wrapper.uncached = fn
+        return wrapper
+    return decorator
@@ -0,0 +1,362 @@
+"""
+Shared cache backend for AnchorOS.
+Stores cache entries in a local SQLite file (WAL mode) so every gunicorn worker on the
+host sees the same values. Invalidations are appended to a log table; each process
+polls the log and applies new events to its in-process LRU, which stays in front as L1.
+Values are stored as JSON (see encode_value): decoding only rebuilds plain data and the
+classes registered with shareable(), so a tampered file can't run code. The file lives in
+a directory only the app user can access (private_dir()).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import stat
+import logging
+import tempfile
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
+
+# How long invalidation events are kept; a worker idle for longer drops its whole L1 instead
+LOG_RETENTION_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    tables TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS cache_tags (
+    table_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (table_name, key)
+);
+CREATE INDEX IF NOT EXISTS idx_cache_tags_key ON cache_tags (key);
+CREATE TABLE IF NOT EXISTS cache_invalidations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    pid INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL
+);
+-- Sequence number of the latest invalidation, so a lookup can check for news with one row read
+CREATE TABLE IF NOT EXISTS cache_generation (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_generation (id, value)
+    SELECT 1, COALESCE(MAX(seq), 0) FROM cache_invalidations;
+"""
+
+
+# Classes whose instances may be stored, by name (see shareable)
+_SHAREABLE = {}
+
+
+def shareable(cls):
+    """
+    Class decorator: instances of cls may be stored in the shared cache. They are encoded as
+    their attribute dict and rebuilt without calling __init__, so the attributes must be
+    values encode_value() accepts.
+    """
+    _SHAREABLE[f'{cls.__module__}.{cls.__qualname__}'] = cls
+    return cls
+
+
+def _encode(value):
+    kind = type(value)
+    if value is None or kind in (bool, int, float, str):
+        return value
+    if kind is list:
+        return [_encode(v) for v in value]
+    if kind is dict:
+        if all(type(k) is str for k in value) and '__t' not in value:
+            return {k: _encode(v) for k, v in value.items()}
+        return {'__t': 'dict', 'v': [[_encode(k), _encode(v)] for k, v in value.items()]}
+    if kind in (tuple, set, frozenset):
+        return {'__t': kind.__name__, 'v': [_encode(v) for v in value]}
+    if kind is datetime:
+        return {'__t': 'datetime', 'v': value.isoformat()}
+    if kind is date:
+        return {'__t': 'date', 'v': value.isoformat()}
+    if kind is Decimal:
+        return {'__t': 'decimal', 'v': str(value)}
+    name = f'{kind.__module__}.{kind.__qualname__}'
+    if _SHAREABLE.get(name) is kind:
+        return {'__t': 'object', 'cls': name, 'v': _encode(vars(value))}
+    raise TypeError(f'{name} is not shareable')
+
+
+_DECODERS = {
+    'dict': lambda v: {_decode(k): _decode(item) for k, item in v},
+    'tuple': lambda v: tuple(_decode(item) for item in v),
+    'set': lambda v: {_decode(item) for item in v},
+    'frozenset': lambda v: frozenset(_decode(item) for item in v),
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+    'decimal': Decimal,
+}
+
+
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    tag = value.get('__t')
+    if tag is None:
+        return {k: _decode(v) for k, v in value.items()}
+    if tag == 'object':
+        obj = object.__new__(_SHAREABLE[value['cls']])
+        obj.__dict__.update(_decode(value['v']))
+        return obj
+    return _DECODERS[tag](value['v'])
+
+
+def encode_value(value):
+    """
+    JSON text for a cached value. Only None, bool, int, float, str, list, tuple, set, frozenset,
+    dict, date, datetime, Decimal and shareable() classes are accepted (exact types, so str
+    subclasses like Markup don't come back as plain str); anything else raises TypeError.
+    """
+    return json.dumps(_encode(value), separators=(',', ':'))
+
+
+def decode_value(text):
+    return _decode(json.loads(text))
+
+
+def private_dir():
+    """A directory under the temp dir that only the app user can access (created 0700)."""
+    path = os.path.join(tempfile.gettempdir(), f'anchoros-{os.getuid()}')
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def check_private(path):
+    """
+    Raises PermissionError unless path (and its directory) belongs to the app user and no one
+    else can write to it. Creates the file 0600 if it doesn't exist yet.
+    """
+    uid = os.getuid()
+    directory = os.path.dirname(os.path.abspath(path))
+    info = os.stat(directory)
+    if info.st_uid != uid or info.st_mode & 0o022:
+        raise PermissionError(f'{directory} must be owned by uid {uid} and not writable by others')
+    try:
+        os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_NOFOLLOW', 0), 0o600))
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISREG(info.st_mode) or info.st_uid != uid or info.st_mode & 0o022:
+        raise PermissionError(f'{path} must be a regular file owned by uid {uid} and not writable by others')
+
+
+class SQLiteCacheBackend:
+    """
+    Cross-process key/value store with table tags and an invalidation log.
+    All methods swallow sqlite errors (logged) so a broken cache file degrades to L1-only.
+    """
+    
+    def __init__(self, path):
+        check_private(path)
+        self.path = path
+        self._local = threading.local()
+        # Guards schema setup and the invalidation log position shared by this process's threads
+        self._lock = threading.Lock()
+        self._last_seq = None
+        self._initialized_pid = None
+    
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # Connections must not cross a fork; reopen in the child
+        if conn is not None and getattr(self._local, 'pid', None) == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock:
+            if self._initialized_pid != os.getpid():
+                conn.executescript(SCHEMA)
+                self._last_seq = conn.execute('SELECT value FROM cache_generation WHERE id = 1').fetchone()[0]
+                self._initialized_pid = os.getpid()
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+    
+    def _run(self, fn, default=None):
+        try:
+            return fn(self._connect())
+        except sqlite3.Error as e:
+            logger.warning(f"[Cache] Shared backend error ({self.path}): {e}")
+            return default
+    
+    def get(self, key):
+        """Returns (value, expires, stale_until, tables) or None."""
+        def op(conn):
+            row = conn.execute(
+                'SELECT value, expires, stale_until, tables FROM cache_entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= time.time():
+                return None
+            try:
+                value = decode_value(row[0])
+            except Exception as e:
+                logger.warning(f"[Cache] Could not decode shared entry {key}: {e}")
+                return None
+            tables = tuple(t for t in row[3].split(',') if t)
+            return value, row[1], row[2], tables
+        return self._run(op)
+    
+    @property
+    def last_seq(self):
+        with self._lock:
+            return self._last_seq
+    
+    def set(self, key, value, expires, stale_until, tables, since_seq=None):
+        """
+        Stores an entry. With since_seq, the write is dropped if the key or any of its tables
+        was invalidated after that log position (the value may predate the write).
+        """
+        try:
+            blob = encode_value(value)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"[Cache] {key} is not shareable, keeping it process-local: {e}")
+            return
+        
+        def op(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if since_seq is not None and self._invalidated_since(conn, since_seq, key, tables):
+                    conn.execute('ROLLBACK')
+                    logger.debug(f"[Cache] {key} invalidated by another process while loading, not sharing")
+                    return
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache_entries (key, value, expires, stale_until, tables) VALUES (?, ?, ?, ?, ?)',
+                    (key, blob, expires, stale_until, ','.join(tables))
+                )
+                conn.execute('DELETE FROM cache_tags WHERE key = ?', (key,))
+                conn.executemany('INSERT OR IGNORE INTO cache_tags (table_name, key) VALUES (?, ?)',
+                                 [(table, key) for table in tables])
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        self._run(op)
+    
+    def delete(self, key):
+        def op(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+                conn.execute('DELETE FROM cache_tags WHERE key = ?', (key,))
+                self._log(conn, 'key', key)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        self._run(op)
+    
+    def invalidate_tables(self, tables):
+        def op(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                marks = ','.join('?' * len(tables))
+                conn.execute(
+                    f'DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_tags WHERE table_name IN ({marks}))',
+                    tables
+                )
+                conn.execute(f'DELETE FROM cache_tags WHERE table_name IN ({marks})', tables)
+                self._log(conn, 'tables', ','.join(tables))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        if tables:
+            self._run(op)
+    
+    def clear(self):
+        def op(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('DELETE FROM cache_entries')
+                conn.execute('DELETE FROM cache_tags')
+                self._log(conn, 'clear')
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        self._run(op)
+    
+    def _invalidated_since(self, conn, seq, key, tables):
+        rows = conn.execute('SELECT kind, target FROM cache_invalidations WHERE seq > ?', (seq,)).fetchall()
+        for kind, target in rows:
+            if kind == 'clear' or (kind == 'key' and target == key):
+                return True
+            if kind == 'tables' and set(target.split(',')) & set(tables):
+                return True
+        return False
+    
+    def _log(self, conn, kind, target=''):
+        seq = conn.execute('INSERT INTO cache_invalidations (pid, kind, target, created_at) VALUES (?, ?, ?, ?)',
+                           (os.getpid(), kind, target, time.time())).lastrowid
+        conn.execute('UPDATE cache_generation SET value = ? WHERE id = 1', (seq,))
+    
+    def poll(self):
+        """
+        Returns invalidation events written by other processes since the last poll, as
+        (kind, target) tuples. kind is 'tables' (comma-separated), 'key' or 'clear'.
+        Called on every lookup: the log itself is only read when the generation moved.
+        """
+        def op(conn):
+            with self._lock:
+                last_seq = self._last_seq
+            generation = conn.execute('SELECT value FROM cache_generation WHERE id = 1').fetchone()[0]
+            if generation <= last_seq:
+                return []
+            rows = conn.execute(
+                'SELECT seq, pid, kind, target FROM cache_invalidations WHERE seq > ? ORDER BY seq',
+                (last_seq,)
+            ).fetchall()
+            if not rows:
+                return []
+            events = []
+            # Events between our position and the first row were pruned; anything may have changed
+            if rows[0][0] > last_seq + 1:
+                events.append(('clear', ''))
+            pid = os.getpid()
+            events.extend((kind, target) for _, row_pid, kind, target in rows if row_pid != pid)
+            with self._lock:
+                self._last_seq = max(self._last_seq, rows[-1][0])
+            return events
+        return self._run(op, default=[])
+    
+    def sweep(self):
+        now = time.time()
+        
+        def op(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('DELETE FROM cache_tags WHERE key IN (SELECT key FROM cache_entries WHERE stale_until <= ?)', (now,))
+                removed = conn.execute('DELETE FROM cache_entries WHERE stale_until <= ?', (now,)).rowcount
+                conn.execute('DELETE FROM cache_invalidations WHERE created_at < ?', (now - LOG_RETENTION_SECONDS,))
+                conn.execute('COMMIT')
+                return removed
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return self._run(op, default=0)
+    
+    def stats(self):
+        def op(conn):
+            entries = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+            return {'path': self.path, 'entries': entries, 'last_seq': self.last_seq}
+        return self._run(op, default={'path': self.path})
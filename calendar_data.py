@@ -0,0 +1,222 @@
+"""
+Calendar data for AnchorOS.
+load_range() fetches the tasks, lead follow-ups, missions and boss fights of any date range
+with one projected query per table (run in parallel) and buckets them by day in one pass into
+a CalendarRange, which serves month grids, week views and agenda lists alike.
+A month view shows a 42-day grid; its CalendarRange is cached per (year, month), tagged
+`calendar:YYYY-MM`. record_write() is called for every SupabaseModel write and invalidates only
+the months whose grids show the written rows' old or new dates, so editing a task in March
+leaves every other month cached. Viewing a month prefetches its neighbours in the background.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from cache import cache, invalidate_tables
+from cache_backend import shareable
+from timezone import add_months, parse_date_only
+
+logger = logging.getLogger(__name__)
+
+# Month grids are invalidated on every write, so they can live long when the invalidation reaches
+# every worker; with a process-local cache another worker's writes can't, so keep them short
+CALENDAR_CACHE_TTL = 3600
+LOCAL_CALENDAR_CACHE_TTL = 60
+GRID_DAYS = 42
+# Longest range load_range() accepts
+MAX_RANGE_DAYS = 400
+
+# Date column placing each table's rows on the calendar
+CALENDAR_DATE_COLUMNS = {
+    'tasks': 'due_date',
+    'leads': 'next_action_date',
+    'daily_missions': 'mission_date',
+}
+# Tables whose date can change in an update; SupabaseModel reads these columns before updating
+# so the month the row moves away from is invalidated too
+CALENDAR_SOURCES = {
+    'tasks': ('due_date',),
+    'leads': ('next_action_date',),
+}
+
+_prefetcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='anchoros-calendar')
+_prefetching = set()
+_prefetch_lock = threading.Lock()
+
+
+def grid_bounds(year, month):
+    """First and last day of the month's grid (starts on the Monday on or before the 1st)."""
+    first_day = date(year, month, 1)
+    grid_start = first_day - timedelta(days=first_day.weekday())
+    return grid_start, grid_start + timedelta(days=GRID_DAYS - 1)
+
+
+def month_tag(year, month):
+    return f'calendar:{year}-{month:02d}'
+
+
+def months_showing(d):
+    """(year, month) of every month grid that includes day d (its own month and maybe a neighbour)."""
+    months = []
+    for offset in (-1, 0, 1):
+        m = add_months(date(d.year, d.month, 1), offset)
+        start, end = grid_bounds(m.year, m.month)
+        if start <= d <= end:
+            months.append((m.year, m.month))
+    return months
+
+
+def record_write(table, before=None, after=None):
+    """Invalidates the cached months showing any date of the written rows, before or after the write."""
+    rows = list(before or []) + list(after or [])
+    tags = set()
+    if table == 'boss_fights':
+        # A month's boss is part of every cached range overlapping that month
+        for row in rows:
+            d = parse_date_only(f"{row.get('month')}-01")
+            if d:
+                tags.update(month_tag(m.year, m.month) for m in (add_months(d, -1), d, add_months(d, 1)))
+    elif table in CALENDAR_DATE_COLUMNS:
+        column = CALENDAR_DATE_COLUMNS[table]
+        for row in rows:
+            d = parse_date_only(row.get(column))
+            if d:
+                tags.update(month_tag(y, m) for y, m in months_showing(d))
+    if tags:
+        invalidate_tables(*tags)
+
+
+@shareable
+class CalendarRange:
+    """Calendar items from start to end (inclusive), bucketed by ISO day."""
+
+    def __init__(self, start, end, tasks=(), leads=(), missions=(), bosses=()):
+        self.start = start
+        self.end = end
+        self.tasks = {}
+        self.leads = {}
+        self.missions = {}
+        for row in tasks:
+            self.tasks.setdefault(str(row['due_date'])[:10], []).append({
+                'id': row.get('id', 0),
+                'title': row.get('title') or '',
+                'status': row.get('status') or '',
+                'type': 'task'
+            })
+        for row in leads:
+            self.leads.setdefault(str(row['next_action_date'])[:10], []).append({
+                'id': row.get('id', 0),
+                'name': row.get('name') or '',
+                'status': row.get('status') or '',
+                'type': 'lead'
+            })
+        for row in missions:
+            self.missions[str(row['mission_date'])[:10]] = {
+                'id': row.get('id', 0),
+                'mission_type': row.get('mission_type') or '',
+                'is_completed': row.get('is_completed') or False,
+                'type': 'mission'
+            }
+        # 'YYYY-MM' -> boss_fights row
+        self.bosses = {row['month']: row for row in bosses}
+
+    def covers(self, start, end):
+        return self.start <= start and end <= self.end
+
+    def day(self, d):
+        key = d.isoformat()
+        return {
+            'date': key,
+            'tasks': self.tasks.get(key, []),
+            'leads': self.leads.get(key, []),
+            'mission': self.missions.get(key)
+        }
+
+    def days(self, start=None, end=None):
+        """day() for every date from start to end (default: the whole range)."""
+        d, end = start or self.start, end or self.end
+        result = []
+        while d <= end:
+            result.append(self.day(d))
+            d += timedelta(days=1)
+        return result
+
+    def week(self, d):
+        """The Monday-to-Sunday week containing d."""
+        monday = d - timedelta(days=d.weekday())
+        return self.days(monday, monday + timedelta(days=6))
+
+    def agenda(self, start=None, end=None):
+        """day() for the dates from start to end that have anything on them, in date order."""
+        start, end = (start or self.start).isoformat(), (end or self.end).isoformat()
+        keys = sorted(k for k in set(self.tasks) | set(self.leads) | set(self.missions) if start <= k <= end)
+        return [self.day(date.fromisoformat(k)) for k in keys]
+
+    def boss(self, year, month):
+        return self.bosses.get(f'{year}-{month:02d}')
+
+
+def load_range(start, end):
+    """CalendarRange for start..end: one query per table, only the columns the calendar shows."""
+    from db_supabase import get_supabase, parallel_queries, select_all
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise ValueError(f'Calendar ranges are limited to {MAX_RANGE_DAYS} days')
+    client = get_supabase()
+    first, last = start.isoformat(), end.isoformat()
+    months = []
+    m = date(start.year, start.month, 1)
+    while m <= end:
+        months.append(m.strftime('%Y-%m'))
+        m = add_months(m, 1)
+
+    with parallel_queries() as q:
+        tasks = q.submit(select_all, lambda: client.table('tasks').select('id,title,status,due_date')
+                         .gte('due_date', first).lte('due_date', last))
+        leads = q.submit(select_all, lambda: client.table('leads').select('id,name,status,next_action_date')
+                         .gte('next_action_date', first).lte('next_action_date', last)
+                         .filter('status', 'not.in', '("closed_won","closed_lost")').is_('converted_at', 'null'))
+        missions = q.submit(select_all, lambda: client.table('daily_missions').select('id,mission_type,is_completed,mission_date')
+                            .gte('mission_date', first).lte('mission_date', last))
+        bosses = q.submit(client.table('boss_fights').select('*').in_('month', months))
+
+    return CalendarRange(start, end, tasks.result(), leads.result(), missions.result(), bosses.result().data or [])
+
+
+def cached_month(year, month):
+    """The CalendarRange of the month's grid, from the cache. Shared with the cache: don't modify it."""
+    ttl = CALENDAR_CACHE_TTL if cache.shared else LOCAL_CALENDAR_CACHE_TTL
+    return cache.get_or_load(f'calendar:month:{year}-{month:02d}', lambda: load_range(*grid_bounds(year, month)),
+                             ttl=ttl, tables=(month_tag(year, month),))
+
+
+def calendar_range(start, end):
+    """CalendarRange covering start..end: the cached grid of start's month when the range fits in it, else a fresh load."""
+    grid_start, grid_end = grid_bounds(start.year, start.month)
+    if grid_start <= start and end <= grid_end:
+        return cached_month(start.year, start.month)
+    return load_range(start, end)
+
+
+def prefetch_adjacent(app, year, month):
+    """Loads the previous and next months into the cache in the background."""
+    current = date(year, month, 1)
+    for offset in (-1, 1):
+        m = add_months(current, offset)
+        key = (m.year, m.month)
+        with _prefetch_lock:
+            if key in _prefetching:
+                continue
+            _prefetching.add(key)
+        _prefetcher.submit(_prefetch, app, *key)
+
+
+def _prefetch(app, year, month):
+    try:
+        with app.app_context():
+            cached_month(year, month)
+    except Exception as e:
+        logger.debug(f"[Calendar] Prefetch of {year}-{month:02d} failed: {e}")
+    finally:
+        with _prefetch_lock:
+            _prefetching.discard((year, month))
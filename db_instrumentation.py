@@ -0,0 +1,159 @@
+"""
+Query instrumentation for the database client.
+Wraps the client returned by get_supabase() so every .execute() records its table,
+operation, filters, row count and duration on the current request.
+Totals are sent back as X-DB-Queries / X-DB-Time headers, and calls slower than
+DB_SLOW_QUERY_MS (default 200) are logged as a structured line. Payload sizes mean
+re-serializing the result, so they are only measured for slow calls and for requests
+sent with an `X-DB-Debug: 1` header (which also get an X-DB-Bytes total).
+"""
+
+import os
+import json
+import time
+import logging
+from flask import g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.environ.get('DB_SLOW_QUERY_MS', '200'))
+
+# Builder methods that start a statement; their arguments are payloads/column lists, not filters
+_OPERATIONS = ('select', 'insert', 'update', 'upsert', 'delete')
+
+
+def _short(value, limit=40):
+    text = str(value)
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+class InstrumentedClient:
+    """Transparent proxy around a Supabase or db_postgres client."""
+    
+    def __init__(self, client):
+        self._client = client
+    
+    @property
+    def wrapped(self):
+        return self._client
+    
+    def table(self, name):
+        return InstrumentedQuery(self._client.table(name), name)
+    
+    def from_(self, name):
+        return InstrumentedQuery(self._client.from_(name), name)
+    
+    def rpc(self, fn, *args, **kwargs):
+        return InstrumentedQuery(self._client.rpc(fn, *args, **kwargs), f'rpc:{fn}', 'rpc')
+    
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class InstrumentedQuery:
+    """Proxy around a query builder; records the chain of calls and times execute()."""
+    
+    def __init__(self, builder, table, operation=None, filters=()):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+        self._filters = filters
+    
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if callable(attr):
+            def call(*args, **kwargs):
+                return self._wrap(attr(*args, **kwargs), name, args)
+            return call
+        return self._wrap(attr, name, ())
+    
+    def _wrap(self, result, name, args):
+        if result is None or not hasattr(result, 'execute') or isinstance(result, InstrumentedQuery):
+            return result
+        operation, filters = self._operation, self._filters
+        if name in _OPERATIONS:
+            operation = operation or name
+        else:
+            filters = filters + (f"{name}({','.join(_short(a) for a in args)})",)
+        return InstrumentedQuery(result, self._table, operation, filters)
+    
+    def execute(self):
+        start = time.perf_counter()
+        error = None
+        response = None
+        try:
+            response = self._builder.execute()
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            record_query(self._table, self._operation or 'select', self._filters,
+                         response, elapsed_ms, error)
+
+
+def _debug_requested():
+    return has_request_context() and request.headers.get('X-DB-Debug') == '1'
+
+
+def _payload_size(data):
+    if not data:
+        return 0
+    try:
+        return len(json.dumps(data, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def record_query(table, operation, filters, response, elapsed_ms, error=None):
+    data = getattr(response, 'data', None)
+    rows = len(data) if isinstance(data, list) else (1 if data else 0)
+    entry = {
+        'table': table,
+        'operation': operation,
+        'filters': list(filters),
+        'rows': rows,
+        'bytes': None,
+        'ms': round(elapsed_ms, 2),
+        'error': type(error).__name__ if error else None
+    }
+
+    slow = elapsed_ms >= SLOW_QUERY_MS
+    if slow or _debug_requested():
+        entry['bytes'] = _payload_size(data)
+
+    if has_request_context():
+        # Shared by parallel_queries workers (same g); setdefault/append are atomic
+        g.setdefault('_db_queries', []).append(entry)
+
+    if slow:
+        path = request.path if has_request_context() else '-'
+        logger.warning(
+            f"[DB] slow_query ms={entry['ms']} table={table} op={operation} rows={rows} "
+            f"bytes={entry['bytes']} path={path} filters={';'.join(filters) or '-'}"
+            + (f" error={entry['error']}" if error else '')
+        )
+    return entry
+
+
+def get_request_queries():
+    """Queries recorded so far for the current request."""
+    if not has_request_context():
+        return []
+    return g.get('_db_queries', [])
+
+
+def init_app(app):
+    @app.after_request
+    def add_db_headers(response):
+        queries = g.get('_db_queries', [])
+        total_ms = sum(q['ms'] for q in queries)
+        response.headers['X-DB-Queries'] = str(len(queries))
+        response.headers['X-DB-Time'] = f'{total_ms:.1f}'
+        if _debug_requested():
+            response.headers['X-DB-Bytes'] = str(sum(q['bytes'] or 0 for q in queries))
+        if queries:
+            logger.debug(f"[DB] {request.method} {request.path}: {len(queries)} queries, {total_ms:.1f}ms, "
+                         f"{sum(q['rows'] for q in queries)} rows")
+        return response
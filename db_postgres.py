@@ -0,0 +1,686 @@
+"""
+Direct PostgreSQL backend for AnchorOS.
+Implements the subset of the PostgREST query builder used by SupabaseModel and
+the blueprints (table/select/filters/order/limit/insert/update/upsert/delete/rpc),
+executed over a pooled psycopg2 connection instead of HTTPS.
+Rows are returned in the same JSON shape PostgREST produces, so callers can't tell
+which backend served them.
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date, time
+from decimal import Decimal
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+
+class UndefinedFunction(Exception):
+    """A database function the backend doesn't have; carries Postgres' undefined_function code."""
+    pgcode = '42883'
+
+
+class APIResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class PostgresDialect:
+    placeholder = '%s'
+    ilike = 'ILIKE'
+    # Whether SQL functions can be called; otherwise only the client's Python stand-ins exist
+    functions = True
+
+    def quote(self, name):
+        if name == '*':
+            return name
+        return '"' + name.replace('"', '""') + '"'
+
+    def adapt(self, value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+
+class SQLiteDialect(PostgresDialect):
+    placeholder = '?'
+    ilike = 'LIKE'
+    functions = False
+
+    def adapt(self, value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return float(value)
+        return super().adapt(value)
+
+
+def to_json_value(value):
+    """Converts a driver value to what PostgREST would have put in the JSON payload."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, memoryview):
+        return value.tobytes().decode()
+    return value
+
+
+def _literal(value):
+    """Parses a literal from PostgREST filter syntax (or_/filter strings)."""
+    if value == 'null':
+        return None
+    if value == 'true':
+        return True
+    if value == 'false':
+        return False
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _split_top_level(text, sep=','):
+    parts = []
+    depth = 0
+    quoted = False
+    current = []
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        if ch == sep and depth == 0 and not quoted:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        parts.append(''.join(current))
+    return parts
+
+
+def _parse_list(value):
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    value = value.strip()
+    if value.startswith('(') and value.endswith(')'):
+        value = value[1:-1]
+    return [_literal(v.strip()) for v in _split_top_level(value) if v.strip()]
+
+
+class _Condition:
+    def __init__(self, column, op, value, negate=False):
+        self.column = column
+        self.op = op
+        self.value = value
+        self.negate = negate
+
+    def compile(self, dialect):
+        col = dialect.quote(self.column)
+        ph = dialect.placeholder
+        op = self.op
+        params = []
+
+        if op == 'is':
+            value = self.value if isinstance(self.value, str) else ('null' if self.value is None else str(self.value).lower())
+            keyword = {'null': 'NULL', 'true': 'TRUE', 'false': 'FALSE'}.get(value.lower())
+            if keyword is None:
+                raise ValueError(f"Unsupported IS value: {self.value!r}")
+            sql = f"{col} IS {keyword}"
+        elif op == 'in':
+            values = _parse_list(self.value)
+            if not values:
+                sql = 'FALSE' if not self.negate else 'TRUE'
+                return sql, params
+            sql = f"{col} IN ({', '.join([ph] * len(values))})"
+            params.extend(dialect.adapt(v) for v in values)
+        elif op in ('like', 'ilike'):
+            pattern = str(self.value).replace('*', '%')
+            keyword = dialect.ilike if op == 'ilike' else 'LIKE'
+            sql = f"{col} {keyword} {ph}"
+            params.append(pattern)
+        else:
+            operator = {'eq': '=', 'neq': '<>', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}.get(op)
+            if operator is None:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            sql = f"{col} {operator} {ph}"
+            params.append(dialect.adapt(self.value))
+
+        if self.negate:
+            sql = f"NOT ({sql})"
+        return sql, params
+
+
+def _parse_condition(expr):
+    """Parses 'column.op.value' or 'column.not.op.value' as used inside or_()."""
+    column, rest = expr.split('.', 1)
+    negate = False
+    if rest.startswith('not.'):
+        negate = True
+        rest = rest[4:]
+    op, value = rest.split('.', 1)
+    if op not in ('in', 'like', 'ilike'):
+        value = _literal(value)
+    return _Condition(column.strip(), op, value, negate)
+
+
+class _OrGroup:
+    def __init__(self, conditions):
+        self.conditions = conditions
+
+    def compile(self, dialect):
+        parts = []
+        params = []
+        for cond in self.conditions:
+            sql, p = cond.compile(dialect)
+            parts.append(sql)
+            params.extend(p)
+        return '(' + ' OR '.join(parts) + ')', params
+
+
+class QueryBuilder:
+    """Chainable query mirroring postgrest's SyncRequestBuilder subset."""
+
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._method = 'select'
+        self._columns = ['*']
+        self._count = None
+        self._conditions = []
+        self._order = []
+        self._limit = None
+        self._offset = None
+        self._payload = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+
+    # -- verbs -------------------------------------------------------------
+
+    def select(self, columns='*', count=None):
+        self._method = 'select'
+        self._columns = [c.strip() for c in columns.split(',') if c.strip()] or ['*']
+        self._count = count
+        return self
+
+    def insert(self, data, **kwargs):
+        self._method = 'insert'
+        self._payload = data if isinstance(data, list) else [data]
+        return self
+
+    def upsert(self, data, on_conflict='id', ignore_duplicates=False, **kwargs):
+        self._method = 'upsert'
+        self._payload = data if isinstance(data, list) else [data]
+        self._on_conflict = [c.strip() for c in on_conflict.split(',')]
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, data, **kwargs):
+        self._method = 'update'
+        self._payload = data
+        return self
+
+    def delete(self, **kwargs):
+        self._method = 'delete'
+        return self
+
+    # -- filters -----------------------------------------------------------
+
+    def _add(self, column, op, value, negate=False):
+        self._conditions.append(_Condition(column, op, value, negate))
+        return self
+
+    def eq(self, column, value):
+        return self._add(column, 'eq', value)
+
+    def neq(self, column, value):
+        return self._add(column, 'neq', value)
+
+    def gt(self, column, value):
+        return self._add(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self._add(column, 'gte', value)
+
+    def lt(self, column, value):
+        return self._add(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self._add(column, 'lte', value)
+
+    def like(self, column, pattern):
+        return self._add(column, 'like', pattern)
+
+    def ilike(self, column, pattern):
+        return self._add(column, 'ilike', pattern)
+
+    def is_(self, column, value):
+        return self._add(column, 'is', value)
+
+    def in_(self, column, values):
+        return self._add(column, 'in', list(values))
+
+    def filter(self, column, operator, value):
+        negate = operator.startswith('not.')
+        op = operator[4:] if negate else operator
+        if op not in ('in', 'like', 'ilike', 'is'):
+            value = _literal(value) if isinstance(value, str) else value
+        return self._add(column, op, value, negate)
+
+    def or_(self, filters):
+        self._conditions.append(_OrGroup([_parse_condition(f) for f in _split_top_level(filters)]))
+        return self
+
+    # -- modifiers ---------------------------------------------------------
+
+    def order(self, column, desc=False, nullsfirst=None, **kwargs):
+        self._order.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size, **kwargs):
+        self._limit = size
+        return self
+
+    def range(self, start, end, **kwargs):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # -- compilation -------------------------------------------------------
+
+    def _where(self, dialect):
+        if not self._conditions:
+            return '', []
+        parts = []
+        params = []
+        for cond in self._conditions:
+            sql, p = cond.compile(dialect)
+            parts.append(sql)
+            params.extend(p)
+        return ' WHERE ' + ' AND '.join(parts), params
+
+    def _tail(self, dialect):
+        sql = ''
+        if self._order:
+            clauses = []
+            for column, desc, nullsfirst in self._order:
+                clause = f"{dialect.quote(column)} {'DESC' if desc else 'ASC'}"
+                if nullsfirst is not None:
+                    clause += ' NULLS FIRST' if nullsfirst else ' NULLS LAST'
+                clauses.append(clause)
+            sql += ' ORDER BY ' + ', '.join(clauses)
+        if self._limit is not None:
+            sql += f' LIMIT {int(self._limit)}'
+        if self._offset is not None:
+            sql += f' OFFSET {int(self._offset)}'
+        return sql
+
+    def _insert_groups(self):
+        """Groups payload rows by key set so each group becomes one multi-row INSERT."""
+        groups = {}
+        for row in self._payload:
+            groups.setdefault(tuple(row.keys()), []).append(row)
+        return groups.items()
+
+    def compile(self, dialect):
+        """Returns a list of (sql, params) statements for this query."""
+        table = dialect.quote(self._table)
+        ph = dialect.placeholder
+
+        if self._method == 'select':
+            columns = ', '.join(dialect.quote(c) for c in self._columns)
+            if self._count:
+                columns += ', COUNT(*) OVER () AS "__count"'
+            where, params = self._where(dialect)
+            return [(f"SELECT {columns} FROM {table}{where}{self._tail(dialect)}", params)]
+
+        if self._method in ('insert', 'upsert'):
+            statements = []
+            for keys, rows in self._insert_groups():
+                if keys:
+                    cols = ', '.join(dialect.quote(k) for k in keys)
+                    row_sql = '(' + ', '.join([ph] * len(keys)) + ')'
+                    sql = f"INSERT INTO {table} ({cols}) VALUES " + ', '.join([row_sql] * len(rows))
+                    params = [dialect.adapt(row[k]) for row in rows for k in keys]
+                else:
+                    sql = f"INSERT INTO {table} DEFAULT VALUES"
+                    params = []
+                if self._method == 'upsert':
+                    target = ', '.join(dialect.quote(c) for c in self._on_conflict)
+                    updates = [k for k in keys if k not in self._on_conflict]
+                    if self._ignore_duplicates or not updates:
+                        sql += f" ON CONFLICT ({target}) DO NOTHING"
+                    else:
+                        assignments = ', '.join(f"{dialect.quote(k)} = EXCLUDED.{dialect.quote(k)}" for k in updates)
+                        sql += f" ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+                statements.append((sql + ' RETURNING *', params))
+            return statements
+
+        if self._method == 'update':
+            keys = list(self._payload.keys())
+            assignments = ', '.join(f"{dialect.quote(k)} = {ph}" for k in keys)
+            params = [dialect.adapt(self._payload[k]) for k in keys]
+            where, where_params = self._where(dialect)
+            return [(f"UPDATE {table} SET {assignments}{where} RETURNING *", params + where_params)]
+
+        if self._method == 'delete':
+            where, params = self._where(dialect)
+            return [(f"DELETE FROM {table}{where} RETURNING *", params)]
+
+        raise ValueError(f"Unsupported query method: {self._method}")
+
+    def execute(self):
+        return self._client.run(self)
+
+
+class RPCBuilder:
+    def __init__(self, client, fn, params):
+        self._client = client
+        self._fn = fn
+        self._params = params or {}
+
+    def execute(self):
+        return self._client.call(self._fn, self._params)
+
+
+class _PsycopgPool:
+    def __init__(self, dsn, minconn, maxconn):
+        from psycopg2.pool import ThreadedConnectionPool
+        self._pool = ThreadedConnectionPool(minconn, maxconn, dsn)
+        # ThreadedConnectionPool raises when exhausted; wait for a free connection instead
+        self._available = threading.BoundedSemaphore(maxconn)
+
+    @contextmanager
+    def connection(self):
+        self._available.acquire()
+        conn = self._pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+            self._available.release()
+
+    def close(self):
+        self._pool.closeall()
+
+
+class _SQLitePool:
+    """Single shared sqlite3 connection guarded by a lock. Stand-in for tests and local runs."""
+
+    def __init__(self, path):
+        import sqlite3
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            try:
+                yield self._conn
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def close(self):
+        self._conn.close()
+
+
+class PostgresClient:
+    """Drop-in replacement for the supabase Client's table()/rpc() surface."""
+
+    def __init__(self, pool, dialect=None, functions=None):
+        self._pool = pool
+        self.dialect = dialect or PostgresDialect()
+        # Python implementations of database functions, for backends that can't define them
+        self._functions = functions or {}
+
+    def table(self, name):
+        return QueryBuilder(self, name)
+
+    from_ = table
+
+    def rpc(self, fn, params=None):
+        return RPCBuilder(self, fn, params)
+
+    def run(self, query):
+        rows = []
+        with self._pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                for sql, params in query.compile(self.dialect):
+                    cur.execute(sql, params)
+                    if cur.description:
+                        names = [d[0] for d in cur.description]
+                        rows.extend({n: to_json_value(v) for n, v in zip(names, r)} for r in cur.fetchall())
+            finally:
+                cur.close()
+
+        count = None
+        if query._method == 'select' and query._count:
+            count = rows[0]['__count'] if rows else 0
+            for row in rows:
+                row.pop('__count', None)
+        return APIResponse(rows, count)
+
+    def call(self, fn, params):
+        if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', fn):
+            raise ValueError(f"Invalid function name: {fn}")
+        local = self._functions.get(fn)
+        if local:
+            with self._pool.connection() as conn:
+                cur = conn.cursor()
+                try:
+                    return APIResponse(local(cur, params))
+                finally:
+                    cur.close()
+        if not self.dialect.functions:
+            raise UndefinedFunction(f"function {fn} does not exist")
+        ph = self.dialect.placeholder
+        args = ', '.join(f"{self.dialect.quote(k)} => {ph}" for k in params)
+        values = [self.dialect.adapt(v) for v in params.values()]
+        with self._pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(f"SELECT * FROM {fn}({args})", values)
+                names = [d[0] for d in cur.description] if cur.description else []
+                rows = [{n: to_json_value(v) for n, v in zip(names, r)} for r in cur.fetchall()]
+            finally:
+                cur.close()
+        # Scalar-returning functions come back as a single column named after the function,
+        # which PostgREST unwraps to a bare value.
+        if len(names) == 1 and names[0] == fn:
+            return APIResponse(rows[0][fn] if rows else None)
+        return APIResponse(rows)
+
+    def close(self):
+        self._pool.close()
+
+
+def create_postgres_client(dsn=None):
+    dsn = dsn or os.environ.get('DATABASE_URL')
+    if not dsn:
+        raise RuntimeError("DATABASE_URL must be set when DB_BACKEND=postgres.")
+    minconn = int(os.environ.get('DB_POOL_MIN', '1'))
+    maxconn = int(os.environ.get('DB_POOL_MAX', '10'))
+    logger.info(f"[Postgres] Creating connection pool (min={minconn}, max={maxconn})")
+    return PostgresClient(_PsycopgPool(dsn, minconn, maxconn))
+
+
+def _entries(value):
+    return json.loads(value) if isinstance(value, str) else list(value or [])
+
+
+def _sqlite_add_xp(cur, params):
+    """Stand-in for gamification_add_xp (supabase_schema.sql); atomic under the pool lock."""
+    entries = _entries(params.get('p_entries'))
+    thresholds = _entries(params.get('p_thresholds'))
+    cur.execute("SELECT id, COALESCE(current_xp, 0), COALESCE(current_level, 1) FROM user_stats ORDER BY id LIMIT 1")
+    row = cur.fetchone()
+    if row is None:
+        cur.execute("INSERT INTO user_stats (current_xp, current_level, current_outreach_streak_days, "
+                    "longest_outreach_streak_days) VALUES (0, 1, 0, 0)")
+        row = (cur.lastrowid, 0, 1)
+    stats_id, xp, previous_level = row
+    xp += sum(int(e['amount']) for e in entries)
+    level = max(1, sum(1 for t in thresholds if int(t) <= xp))
+    cur.execute("UPDATE user_stats SET current_xp = ?, current_level = ? WHERE id = ?", (xp, level, stats_id))
+    cur.executemany("INSERT INTO xp_logs (amount, reason, created_at) VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP))",
+                    [(int(e['amount']), e.get('reason'), e.get('created_at')) for e in entries])
+    return [{'current_xp': xp, 'current_level': level, 'previous_level': previous_level}]
+
+
+def _sqlite_add_tokens(cur, params):
+    """Stand-in for gamification_add_tokens (supabase_schema.sql); atomic under the pool lock."""
+    entries = _entries(params.get('p_entries'))
+    cur.execute("SELECT id, COALESCE(total_tokens, 0) FROM user_tokens ORDER BY id LIMIT 1")
+    row = cur.fetchone()
+    if row is None:
+        cur.execute("INSERT INTO user_tokens (total_tokens) VALUES (0)")
+        row = (cur.lastrowid, 0)
+    tokens_id, total = row
+    amount = sum(int(e['amount']) for e in entries)
+    if params.get('p_require_balance') and total + amount < 0:
+        return [{'total_tokens': total, 'applied': False}]
+    cur.execute("UPDATE user_tokens SET total_tokens = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (total + amount, tokens_id))
+    cur.executemany("INSERT INTO token_transactions (amount, reason, created_at) VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP))",
+                    [(int(e['amount']), e.get('reason'), e.get('created_at')) for e in entries])
+    return [{'total_tokens': total + amount, 'applied': True}]
+
+
+_METRIC_COUNT_COLUMNS = ('outreach_count', 'leads_created', 'deals_won', 'deals_lost', 'clients_started',
+                         'project_revenue', 'freelance_revenue', 'xp_earned', 'tokens_earned')
+_METRIC_JSON_COLUMNS = ('outreach_by_type', 'outreach_by_outcome')
+
+
+def _add_counts(a, b):
+    total = dict(a or {})
+    for key, count in (b or {}).items():
+        total[key] = total.get(key, 0) + int(count)
+    return {key: count for key, count in total.items() if count}
+
+
+def _sqlite_daily_metrics_add(cur, params):
+    """Stand-in for daily_metrics_add (supabase_schema.sql); atomic under the pool lock."""
+    for delta in _entries(params.get('p_deltas')):
+        columns = ', '.join(_METRIC_COUNT_COLUMNS + _METRIC_JSON_COLUMNS)
+        cur.execute(f"SELECT {columns} FROM daily_metrics WHERE date = ?", (delta['date'],))
+        row = cur.fetchone()
+        current = dict(zip(_METRIC_COUNT_COLUMNS + _METRIC_JSON_COLUMNS, row)) if row else {}
+        values = [(current.get(c) or 0) + (delta.get(c) or 0) for c in _METRIC_COUNT_COLUMNS]
+        values += [json.dumps(_add_counts(json.loads(current.get(c) or '{}'), delta.get(c))) for c in _METRIC_JSON_COLUMNS]
+        marks = ', '.join('?' * len(values))
+        cur.execute(f"INSERT OR REPLACE INTO daily_metrics (date, {columns}, updated_at) "
+                    f"VALUES (?, {marks}, CURRENT_TIMESTAMP)", [delta['date']] + values)
+    return None
+
+
+def _sqlite_select(cur, sql, params):
+    cur.execute(sql, params)
+    names = [d[0] for d in cur.description]
+    return [{n: to_json_value(v) for n, v in zip(names, r)} for r in cur.fetchall()]
+
+
+# Bucket numbers 0 .. :count - 1, for the generate_series() of the analytics functions
+_SQLITE_SERIES = "WITH RECURSIVE series(i) AS (SELECT 0 WHERE :count > 0 UNION ALL SELECT i + 1 FROM series WHERE i + 1 < :count)"
+
+
+def _sqlite_weekly_outreach(cur, params):
+    """Stand-in for analytics_weekly_outreach (supabase_schema.sql)."""
+    return _sqlite_select(cur, f"""{_SQLITE_SERIES}
+        SELECT date(:start, '+' || (i * 7) || ' days') AS bucket_start, COUNT(o.id) AS outreach_count
+        FROM series LEFT JOIN outreach_logs o
+            ON o.date >= date(:start, '+' || (i * 7) || ' days') AND o.date < date(:start, '+' || ((i + 1) * 7) || ' days')
+        GROUP BY i ORDER BY i
+    """, {'start': params['p_start'], 'count': params['p_weeks']})
+
+
+def _sqlite_weekly_deals(cur, params):
+    """Stand-in for analytics_weekly_deals (supabase_schema.sql)."""
+    return _sqlite_select(cur, f"""{_SQLITE_SERIES}
+        SELECT date(:start, '+' || (i * 7) || ' days') AS bucket_start, COUNT(l.id) AS deal_count
+        FROM series LEFT JOIN leads l ON l.status = 'closed_won'
+            AND l.updated_at >= date(:start, '+' || (i * 7) || ' days')
+            AND l.updated_at < date(:start, '+' || ((i + 1) * 7) || ' days')
+            AND (:niche IS NULL OR l.niche = :niche)
+            AND (:source IS NULL OR l.source = :source)
+        GROUP BY i ORDER BY i
+    """, {'start': params['p_start'], 'count': params['p_weeks'],
+          'niche': params.get('p_niche'), 'source': params.get('p_source')})
+
+
+def _sqlite_monthly_revenue(cur, params):
+    """Stand-in for analytics_monthly_revenue (supabase_schema.sql)."""
+    return _sqlite_select(cur, f"""{_SQLITE_SERIES},
+        months AS (
+            SELECT i, date(:start, 'start of month', '+' || i || ' months') AS m_start,
+                   date(:start, 'start of month', '+' || (i + 1) || ' months') AS m_next
+            FROM series
+        )
+        SELECT m.m_start AS bucket_start,
+            COALESCE((SELECT SUM(c.amount_charged) FROM clients c
+                      WHERE c.start_date >= m.m_start AND c.start_date < m.m_next), 0) AS project_revenue,
+            COALESCE((SELECT SUM(f.amount) FROM freelance_jobs f
+                      WHERE f.date_completed >= m.m_start AND f.date_completed < m.m_next), 0) AS freelance_revenue,
+            COALESCE((SELECT SUM(c.monthly_hosting_fee) FROM clients c
+                      WHERE c.hosting_active AND c.start_date < m.m_next), 0) AS hosting_mrr,
+            COALESCE((SELECT SUM(c.monthly_saas_fee) FROM clients c
+                      WHERE c.saas_active AND c.start_date < m.m_next), 0) AS saas_mrr
+        FROM months m ORDER BY m.i
+    """, {'start': params['p_start'], 'count': params['p_months']})
+
+
+def _sqlite_lead_pipeline(cur, params):
+    """Stand-in for analytics_lead_pipeline (supabase_schema.sql)."""
+    return _sqlite_select(cur, """
+        SELECT l.status AS status, COUNT(*) AS lead_count
+        FROM leads l
+        WHERE l.converted_at IS NULL
+            AND (:niche IS NULL OR l.niche = :niche)
+            AND (:source IS NULL OR l.source = :source)
+        GROUP BY l.status
+    """, {'niche': params.get('p_niche'), 'source': params.get('p_source')})
+
+
+SQLITE_FUNCTIONS = {
+    'gamification_add_xp': _sqlite_add_xp,
+    'gamification_add_tokens': _sqlite_add_tokens,
+    'daily_metrics_add': _sqlite_daily_metrics_add,
+    'analytics_weekly_outreach': _sqlite_weekly_outreach,
+    'analytics_weekly_deals': _sqlite_weekly_deals,
+    'analytics_monthly_revenue': _sqlite_monthly_revenue,
+    'analytics_lead_pipeline': _sqlite_lead_pipeline,
+}
+
+
+def create_sqlite_client(path=':memory:', schema_path=None):
+    """
+    Returns a client backed by SQLite, using the same query compiler with a SQLite dialect.
+    Optionally loads a schema file (e.g. schema.sql) into a fresh database.
+    """
+    client = PostgresClient(_SQLitePool(path), SQLiteDialect(), SQLITE_FUNCTIONS)
+    if schema_path:
+        with open(schema_path) as f:
+            script = f.read()
+        # Exports include SQLite's internal bookkeeping table, which can't be created directly.
+        script = re.sub(r'CREATE TABLE sqlite_\w+\([^)]*\);', '', script)
+        with client._pool.connection() as conn:
+            conn.executescript(script)
+    return client
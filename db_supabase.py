@@ -1,25 +1,120 @@
 import os
 import logging
+import threading
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
 from supabase import create_client, Client
 from datetime import datetime, date
+from decimal import Decimal, InvalidOperation
 import json
 import timezone as tz
+from flask import g, has_request_context
 
 logger = logging.getLogger(__name__)
 
 
-def _clear_cache():
-    from cache import clear_all_cache
-    clear_all_cache()
+def _invalidate_cache(table):
+    """Drops cached values derived from `table` after a write through SupabaseModel."""
+    from cache import invalidate_tables
+    invalidate_tables(table)
+
+
+def _rows_before_write(table, id):
+    """
+    For tables with derived data (daily_metrics, calendar months), the columns it depends on
+    of a row (or list of rows) about to change.
+    """
+    from metrics import source_columns
+    from calendar_data import CALENDAR_SOURCES
+    columns = sorted(set(source_columns(table)) | set(CALENDAR_SOURCES.get(table, ())))
+    if not columns or not id:
+        return None
+    query = get_supabase().table(table).select(','.join(columns))
+    query = query.in_("id", id) if isinstance(id, list) else query.eq("id", id)
+    return query.execute().data
+
+
+def _record_metrics(table, before=None, after=None):
+    """Keeps daily_metrics in step with a write (see metrics.record_write)."""
+    from metrics import record_write
+    record_write(table, before, after)
+
+
+def _index_search(table, before=None, after=None):
+    """Keeps the search indexes in step with a write (see search_index / name_index.index_write)."""
+    import search_index
+    import name_index
+    search_index.index_write(table, before, after)
+    name_index.index_write(table, before, after)
+
+
+def _invalidate_calendar(table, before=None, after=None):
+    """Drops the cached calendar months showing the written rows' dates (see calendar_data.record_write)."""
+    from calendar_data import record_write
+    record_write(table, before, after)
+
+
+def _after_write(table, before=None, after=None):
+    """Runs the write hooks for rows written through SupabaseModel (before/after as in _record_metrics)."""
+    # Rollup deltas first: a cached value recomputed after the invalidation must already see them
+    _record_metrics(table, before, after)
+    _invalidate_cache(table)
+    _index_search(table, before, after)
+    _invalidate_calendar(table, before, after)
+
+
+# Counter functions found missing (schema not migrated); later calls use the read-modify-write fallback
+_unavailable_counter_rpcs = set()
+
+
+def _counter_rpc(fn, params, table, log_table, entries):
+    """
+    Runs one of the atomic counter functions in supabase_schema.sql (gamification_add_xp,
+    gamification_add_tokens) and returns its row, or None if it is not installed. Other
+    errors are raised.
+    """
+    if fn in _unavailable_counter_rpcs:
+        return None
+    try:
+        rows = get_supabase().rpc(fn, params).execute().data
+    except Exception as e:
+        if not is_missing_function(e):
+            raise
+        _unavailable_counter_rpcs.add(fn)
+        logger.warning(f"[DB] {fn} unavailable, using read-modify-write (run the schema migration): {e}")
+        return None
+    # The function updated the counter row in place; a copy remembered earlier in the request is stale
+    forget_table(table)
+    _record_metrics(log_table, after=entries)
+    _invalidate_cache(table)
+    _invalidate_cache(log_table)
+    return rows[0] if rows else {}
 
 _supabase_client: Client = None
 _client_initialized: bool = False
 
+
+def _instrument(client):
+    """Wraps the client so each query is timed and counted per request (DB_INSTRUMENT=0 disables)."""
+    if client is None or os.environ.get("DB_INSTRUMENT", "1") == "0":
+        return client
+    from db_instrumentation import InstrumentedClient
+    return InstrumentedClient(client)
+
+def get_backend() -> str:
+    """Returns the configured database backend: 'supabase' (default) or 'postgres'."""
+    return os.environ.get("DB_BACKEND", "supabase").strip().lower()
+
+
 def get_supabase() -> Client:
     """
-    Returns the singleton Supabase client instance.
+    Returns the singleton database client instance.
     The client is created exactly once per application lifecycle.
     Subsequent calls return the cached instance without any re-initialization.
+    With DB_BACKEND=postgres this is a pooled direct connection (see db_postgres)
+    exposing the same table()/rpc() builder API.
     """
     global _supabase_client, _client_initialized
     
@@ -29,6 +124,14 @@ def get_supabase() -> Client:
     if _client_initialized:
         raise RuntimeError("Supabase client was previously initialized but is now None. This should not happen.")
     
+    if get_backend() == "postgres":
+        from db_postgres import create_postgres_client
+        logger.info("[Postgres] Creating direct client instance (this should happen once per app lifecycle)")
+        _supabase_client = _instrument(create_postgres_client())
+        _client_initialized = True
+        logger.info("[Postgres] Client instance created successfully")
+        return _supabase_client
+    
     url = os.environ.get("SUPABASE_URL")
     key = os.environ.get("SUPABASE_ANON_KEY")
     
@@ -39,7 +142,7 @@ def get_supabase() -> Client:
     
     logger.info("[Supabase] Creating client instance (this should happen once per app lifecycle)")
     
-    _supabase_client = create_client(url, key)
+    _supabase_client = _instrument(create_client(url, key))
     _client_initialized = True
     
     logger.info("[Supabase] Client instance created successfully")
@@ -67,6 +170,108 @@ def is_client_initialized() -> bool:
     return _client_initialized
 
 
+def set_client(client):
+    """
+    Installs an explicit client instance, e.g. db_postgres.create_sqlite_client()
+    for running the models against a local stand-in database.
+    """
+    global _supabase_client, _client_initialized
+    _supabase_client = _instrument(client)
+    _client_initialized = client is not None
+
+
+_query_executor = None
+_query_executor_lock = threading.Lock()
+_in_query_worker = contextvars.ContextVar('in_query_worker', default=False)
+
+
+def _get_query_executor():
+    global _query_executor
+    if _query_executor is None:
+        with _query_executor_lock:
+            if _query_executor is None:
+                workers = int(os.environ.get("DB_PARALLEL_QUERIES", "6"))
+                _query_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-query")
+    return _query_executor
+
+
+def _run_in_worker(fn):
+    _in_query_worker.set(True)
+    return fn()
+
+
+class QueryBatch:
+    """
+    Collects independent reads and runs them on the shared query pool.
+    submit() returns a Future; results are read with .result() after the batch closes.
+    """
+
+    def __init__(self):
+        self._futures = []
+
+    def submit(self, query, *args, **kwargs):
+        """Queues a query builder (its .execute()) or any callable with arguments."""
+        if hasattr(query, 'execute') and not callable(query):
+            fn = query.execute
+        else:
+            fn = functools.partial(query, *args, **kwargs)
+
+        if _in_query_worker.get():
+            # Nested batch inside a worker: run inline rather than wait on our own pool
+            future = Future()
+            try:
+                future.set_result(fn())
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            # Each job runs in a copy of the caller's context so flask.g and the request are visible
+            ctx = contextvars.copy_context()
+            future = _get_query_executor().submit(ctx.run, _run_in_worker, fn)
+        self._futures.append(future)
+        return future
+
+    def wait(self):
+        """Waits for every job, then raises the first failure in submission order."""
+        first_error = None
+        for future in self._futures:
+            try:
+                future.result()
+            except Exception as e:
+                if first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+
+
+@contextmanager
+def parallel_queries():
+    """
+    Runs independent queries concurrently:
+
+        with parallel_queries() as q:
+            leads = q.submit(Lead.query_all)
+            count = q.submit(client.table('tasks').select('id', count='exact'))
+        leads.result(), count.result().count
+
+    The block exits once every job has finished. If any failed, the first one (by submission order)
+    is raised. Pool size is DB_PARALLEL_QUERIES (default 6).
+    """
+    # Make sure the request identity map exists before workers start sharing it
+    _identity_map()
+    batch = QueryBatch()
+    try:
+        yield batch
+    except BaseException:
+        for future in batch._futures:
+            future.cancel()
+        try:
+            batch.wait()
+        except Exception:
+            pass
+        raise
+    batch.wait()
+
+
 def serialize_value(value):
     if value is None:
         return None
@@ -74,6 +279,8 @@ def serialize_value(value):
         return value.isoformat()
     if isinstance(value, date):
         return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
     return value
 
 
@@ -89,8 +296,136 @@ def parse_date(value):
     return tz.parse_date_only(value)
 
 
+def parse_money(value):
+    # Through str() so a float from the JSON payload becomes the decimal it was written as
+    try:
+        return Decimal(str(value))
+    except (TypeError, ValueError, InvalidOperation):
+        return None
+
+
+def round_money(value):
+    """A money value (Decimal, float, str or None) as a float rounded to cents, for chart series and JSON."""
+    return round(float(value or 0), 2)
+
+
+def parse_json(value):
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+FIELD_DECODERS = {
+    'datetime': parse_datetime,
+    'date': parse_date,
+    'money': parse_money,
+    'json': parse_json,
+}
+
+
+PAGE_SIZE = 1000
+# "Function does not exist": PostgREST's schema cache miss, Postgres undefined_function
+MISSING_FUNCTION_CODES = ('PGRST202', '42883')
+
+
+def select_all(build, order='id'):
+    """Every row of the query build() returns, a page at a time (PostgREST caps responses at 1000 rows)."""
+    rows = []
+    while True:
+        page = build().order(order).range(len(rows), len(rows) + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+def is_missing_function(error):
+    """True if an rpc() error means the function isn't installed (schema not migrated), not that the call failed."""
+    return (getattr(error, 'code', None) or getattr(error, 'pgcode', None)) in MISSING_FUNCTION_CODES
+
+
+def select_columns(columns=None):
+    """Builds a select() argument from a list of column names (None means every column)."""
+    if not columns:
+        return "*"
+    if isinstance(columns, str):
+        return columns
+    return ",".join(columns)
+
+
+def _identity_map():
+    """
+    Returns the identity map for the current request: {(table, id): raw_row}.
+    Outside a request (startup, CLI, background threads) there is no map and every
+    lookup goes to the database.
+    """
+    if not has_request_context():
+        return None
+    identity_map = getattr(g, '_identity_map', None)
+    if identity_map is None:
+        identity_map = {}
+        g._identity_map = identity_map
+    return identity_map
+
+
+def remember_rows(table, rows):
+    """Records full rows in the request identity map. Rows without an id are ignored."""
+    identity_map = _identity_map()
+    if identity_map is None:
+        return
+    for row in rows:
+        if row and row.get('id') is not None:
+            identity_map[(table, row['id'])] = row
+
+
+def forget_row(table, id):
+    identity_map = _identity_map()
+    if identity_map is not None:
+        identity_map.pop((table, id), None)
+
+
+def forget_table(table):
+    """Drops every remembered row of `table`, e.g. after a database function updated rows by itself."""
+    identity_map = _identity_map()
+    if identity_map is not None:
+        # parallel_queries workers may add rows meanwhile: snapshot the keys in one call
+        # (list() of a dict doesn't release the GIL) and tolerate keys already gone
+        for key in list(identity_map):
+            if key[0] == table:
+                identity_map.pop(key, None)
+
+
+def clear_identity_map():
+    """Drops every row remembered in this request, e.g. after a raw client write."""
+    identity_map = _identity_map()
+    if identity_map is not None:
+        identity_map.clear()
+
+
+def preload(objects, fk_field, model, attr=None):
+    """
+    Resolves a foreign key for a list of model objects with a single query.
+    preload(tasks, 'related_lead_id', Lead) sets task.lead to the Lead (or None).
+    The attribute name defaults to fk_field without its 'related_' prefix and '_id' suffix.
+    """
+    if attr is None:
+        attr = fk_field
+        if attr.startswith('related_'):
+            attr = attr[len('related_'):]
+        if attr.endswith('_id'):
+            attr = attr[:-len('_id')]
+    related = model.get_many(getattr(obj, fk_field, None) for obj in objects)
+    for obj in objects:
+        setattr(obj, attr, related.get(getattr(obj, fk_field, None)))
+    return objects
+
+
 class SupabaseModel:
     __tablename__ = None
+    # Typed columns decoded once in _parse_row: {'column': 'datetime' | 'date' | 'money'}
+    __fields__ = {}
     
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
@@ -101,23 +436,34 @@ class SupabaseModel:
         if row is None:
             return None
         obj = cls(**row)
+        for field, kind in cls.__fields__.items():
+            value = row.get(field)
+            if value is not None and value != '':
+                setattr(obj, field, FIELD_DECODERS[kind](value))
         return obj
     
     @classmethod
-    def query_all(cls, order_by=None, order_desc=False, limit=None):
+    def _load_rows(cls, rows, columns=None):
+        # Projected rows are partial, so only full rows go into the identity map
+        if not columns:
+            remember_rows(cls.__tablename__, rows)
+        return [cls._parse_row(row) for row in rows]
+    
+    @classmethod
+    def query_all(cls, order_by=None, order_desc=False, limit=None, columns=None):
         client = get_supabase()
-        query = client.table(cls.__tablename__).select("*")
+        query = client.table(cls.__tablename__).select(select_columns(columns))
         if order_by:
             query = query.order(order_by, desc=order_desc)
         if limit:
             query = query.limit(limit)
         result = query.execute()
-        return [cls._parse_row(row) for row in result.data]
+        return cls._load_rows(result.data, columns)
     
     @classmethod
-    def query_filter(cls, filters: dict, order_by=None, order_desc=False, limit=None):
+    def query_filter(cls, filters: dict, order_by=None, order_desc=False, limit=None, columns=None):
         client = get_supabase()
-        query = client.table(cls.__tablename__).select("*")
+        query = client.table(cls.__tablename__).select(select_columns(columns))
         for key, value in filters.items():
             query = query.eq(key, serialize_value(value))
         if order_by:
@@ -125,26 +471,54 @@ class SupabaseModel:
         if limit:
             query = query.limit(limit)
         result = query.execute()
-        return [cls._parse_row(row) for row in result.data]
+        return cls._load_rows(result.data, columns)
     
     @classmethod
     def get_by_id(cls, id):
+        identity_map = _identity_map()
+        if identity_map is not None and (cls.__tablename__, id) in identity_map:
+            return cls._parse_row(identity_map[(cls.__tablename__, id)])
         client = get_supabase()
         result = client.table(cls.__tablename__).select("*").eq("id", id).limit(1).execute()
         if result.data:
-            return cls._parse_row(result.data[0])
+            return cls._load_rows(result.data[:1])[0]
         return None
     
     @classmethod
-    def get_first(cls, filters: dict = None):
+    def get_many(cls, ids):
+        """
+        Fetches several rows by id, returning {id: obj}. Rows already in the request
+        identity map are reused; the rest are loaded with one in_() query.
+        """
+        wanted = []
+        for id in ids:
+            if id is not None and id not in wanted:
+                wanted.append(id)
+        found = {}
+        missing = []
+        identity_map = _identity_map()
+        for id in wanted:
+            if identity_map is not None and (cls.__tablename__, id) in identity_map:
+                found[id] = cls._parse_row(identity_map[(cls.__tablename__, id)])
+            else:
+                missing.append(id)
+        if missing:
+            client = get_supabase()
+            result = client.table(cls.__tablename__).select("*").in_("id", missing).execute()
+            for obj in cls._load_rows(result.data):
+                found[obj.id] = obj
+        return found
+    
+    @classmethod
+    def get_first(cls, filters: dict = None, columns=None):
         client = get_supabase()
-        query = client.table(cls.__tablename__).select("*")
+        query = client.table(cls.__tablename__).select(select_columns(columns))
         if filters:
             for key, value in filters.items():
                 query = query.eq(key, serialize_value(value))
         result = query.limit(1).execute()
         if result.data:
-            return cls._parse_row(result.data[0])
+            return cls._load_rows(result.data[:1], columns)[0]
         return None
     
     @classmethod
@@ -163,31 +537,59 @@ class SupabaseModel:
         serialized = serialize_row(data)
         result = client.table(cls.__tablename__).insert(serialized).execute()
         if result.data:
-            _clear_cache()
-            return cls._parse_row(result.data[0])
+            _after_write(cls.__tablename__, after=result.data)
+            return cls._load_rows(result.data[:1])[0]
         return None
     
+    @classmethod
+    def insert_many(cls, rows):
+        """Inserts several rows in one request. Returns the inserted objects."""
+        if not rows:
+            return []
+        client = get_supabase()
+        result = client.table(cls.__tablename__).insert([serialize_row(row) for row in rows]).execute()
+        if result.data:
+            _after_write(cls.__tablename__, after=result.data)
+        return cls._load_rows(result.data or [])
+    
     @classmethod
     def update_by_id(cls, id, data: dict):
         client = get_supabase()
         serialized = serialize_row(data)
+        before = _rows_before_write(cls.__tablename__, id)
         result = client.table(cls.__tablename__).update(serialized).eq("id", id).execute()
         if result.data:
-            _clear_cache()
-            return cls._parse_row(result.data[0])
+            _after_write(cls.__tablename__, before, result.data)
+            return cls._load_rows(result.data[:1])[0]
         return None
     
+    @classmethod
+    def update_many(cls, ids, data: dict):
+        """Applies the same update to several rows in one request. Returns the updated objects."""
+        ids = list(ids)
+        if not ids:
+            return []
+        client = get_supabase()
+        before = _rows_before_write(cls.__tablename__, ids)
+        result = client.table(cls.__tablename__).update(serialize_row(data)).in_("id", ids).execute()
+        if result.data:
+            _after_write(cls.__tablename__, before, result.data)
+        return cls._load_rows(result.data or [])
+    
     @classmethod
     def delete_by_id(cls, id):
         client = get_supabase()
-        client.table(cls.__tablename__).delete().eq("id", id).execute()
-        _clear_cache()
+        result = client.table(cls.__tablename__).delete().eq("id", id).execute()
+        forget_row(cls.__tablename__, id)
+        _after_write(cls.__tablename__, before=result.data)
     
     def save(self):
         client = get_supabase()
         data = {k: serialize_value(v) for k, v in self.__dict__.items() if not k.startswith('_')}
         
+        before = None
         if hasattr(self, 'id') and self.id:
+            before = _rows_before_write(self.__tablename__, self.id)
             result = client.table(self.__tablename__).update(data).eq("id", self.id).execute()
         else:
             if 'id' in data:
@@ -195,20 +597,27 @@ class SupabaseModel:
             result = client.table(self.__tablename__).insert(data).execute()
         
         if result.data:
-            _clear_cache()
-            for key, value in result.data[0].items():
-                setattr(self, key, value)
+            _after_write(self.__tablename__, before, result.data)
+            remember_rows(self.__tablename__, result.data[:1])
+            # Decoded like a fresh read, so dates stay dates and money stays Decimal
+            self.__dict__.update(self._parse_row(result.data[0]).__dict__)
         return self
     
     def delete(self):
         if hasattr(self, 'id') and self.id:
             client = get_supabase()
-            client.table(self.__tablename__).delete().eq("id", self.id).execute()
-            _clear_cache()
+            result = client.table(self.__tablename__).delete().eq("id", self.id).execute()
+            forget_row(self.__tablename__, self.id)
+            _after_write(self.__tablename__, before=result.data)
 
 
 class Lead(SupabaseModel):
     __tablename__ = 'leads'
+    __fields__ = {
+        'created_at': 'datetime', 'updated_at': 'datetime', 'converted_at': 'datetime',
+        'archived_at': 'datetime', 'closed_at': 'datetime', 'last_contacted_at': 'datetime',
+        'next_action_date': 'date',
+    }
     
     @staticmethod
     def status_choices():
@@ -247,28 +656,13 @@ class Lead(SupabaseModel):
             return []
         return [r.strip() for r in self.close_reason.split(',') if r.strip()]
     
-    @classmethod
-    def _parse_row(cls, row: dict):
-        if row is None:
-            return None
-        obj = cls(**row)
-        # Parse datetime fields
-        datetime_fields = ['created_at', 'updated_at', 'converted_at', 'archived_at', 'closed_at', 'last_contacted_at']
-        for field in datetime_fields:
-            if hasattr(obj, field) and getattr(obj, field):
-                setattr(obj, field, parse_datetime(getattr(obj, field)))
-        # Parse date fields
-        date_fields = ['next_action_date']
-        for field in date_fields:
-            if hasattr(obj, field) and getattr(obj, field):
-                value = getattr(obj, field)
-                if isinstance(value, str):
-                    setattr(obj, field, parse_date(value))
-        return obj
-
 
 class Client(SupabaseModel):
     __tablename__ = 'clients'
+    __fields__ = {
+        'created_at': 'datetime', 'updated_at': 'datetime', 'start_date': 'date',
+        'amount_charged': 'money', 'monthly_hosting_fee': 'money', 'monthly_saas_fee': 'money',
+    }
     
     @staticmethod
     def project_type_choices():
@@ -278,28 +672,10 @@ class Client(SupabaseModel):
     def status_choices():
         return ['active', 'completed', 'paused', 'cancelled']
     
-    @classmethod
-    def _parse_row(cls, row: dict):
-        if row is None:
-            return None
-        obj = cls(**row)
-        # Parse datetime fields
-        datetime_fields = ['created_at', 'updated_at']
-        for field in datetime_fields:
-            if hasattr(obj, field) and getattr(obj, field):
-                setattr(obj, field, parse_datetime(getattr(obj, field)))
-        # Parse date fields
-        date_fields = ['start_date']
-        for field in date_fields:
-            if hasattr(obj, field) and getattr(obj, field):
-                value = getattr(obj, field)
-                if isinstance(value, str):
-                    setattr(obj, field, parse_date(value))
-        return obj
-
 
 class OutreachLog(SupabaseModel):
     __tablename__ = 'outreach_logs'
+    __fields__ = {'date': 'date'}
     
     @staticmethod
     def type_choices():
@@ -309,40 +685,15 @@ class OutreachLog(SupabaseModel):
     def outcome_choices():
         return ['contacted', 'booked_call', 'no_response', 'closed_won', 'closed_lost', 'follow_up_set']
     
-    @classmethod
-    def _parse_row(cls, row: dict):
-        if row is None:
-            return None
-        obj = cls(**row)
-        # Parse datetime/date fields
-        if hasattr(obj, 'date') and getattr(obj, 'date'):
-            value = getattr(obj, 'date')
-            if isinstance(value, str):
-                setattr(obj, 'date', parse_date(value))
-        return obj
-
 
 class Task(SupabaseModel):
     __tablename__ = 'tasks'
+    __fields__ = {'due_date': 'date', 'created_at': 'datetime'}
     
     @staticmethod
     def status_choices():
         return ['open', 'in_progress', 'done']
     
-    @classmethod
-    def _parse_row(cls, row: dict):
-        if row is None:
-            return None
-        obj = cls(**row)
-        # Parse datetime/date fields
-        if hasattr(obj, 'due_date') and getattr(obj, 'due_date'):
-            value = getattr(obj, 'due_date')
-            if isinstance(value, str):
-                setattr(obj, 'due_date', parse_date(value))
-        if hasattr(obj, 'created_at') and getattr(obj, 'created_at'):
-            setattr(obj, 'created_at', parse_datetime(getattr(obj, 'created_at')))
-        return obj
-
 
 class UserSettings(SupabaseModel):
     __tablename__ = 'user_settings'
@@ -482,6 +833,28 @@ class UserStats(SupabaseModel):
             })
         return stats
     
+    @staticmethod
+    def add_xp(entries):
+        """
+        Adds [{'amount', 'reason'}] XP entries in one atomic call: current_xp and current_level are
+        updated in place and one xp_logs row is written per entry. Returns
+        (current_xp, current_level, previous_level).
+        """
+        now = tz.now_iso()
+        entries = [{'created_at': now, **entry} for entry in entries]
+        params = {'p_entries': entries, 'p_thresholds': [threshold for _, threshold in UserStats.LEVELS]}
+        row = _counter_rpc('gamification_add_xp', params, 'user_stats', 'xp_logs', entries)
+        if row is not None:
+            return row['current_xp'], row['current_level'], row['previous_level']
+        
+        stats = UserStats.get_stats()
+        previous_level = getattr(stats, 'current_level', 1) or 1
+        stats.current_xp = (getattr(stats, 'current_xp', 0) or 0) + sum(entry['amount'] for entry in entries)
+        level = stats.get_level_from_xp()
+        UserStats.update_by_id(stats.id, {'current_xp': stats.current_xp, 'current_level': level})
+        XPLog.insert_many(entries)
+        return stats.current_xp, level, previous_level
+    
     def get_level_from_xp(self):
         xp = getattr(self, 'current_xp', 0) or 0
         level = 1
@@ -509,21 +882,6 @@ class UserStats(SupabaseModel):
 
 class Achievement(SupabaseModel):
     __tablename__ = 'achievements'
-    
-    @staticmethod
-    def seed_defaults():
-        defaults = [
-            {'key': 'streak_7', 'name': 'Week Warrior', 'description': 'Maintain a 7-day outreach streak'},
-            {'key': 'streak_30', 'name': 'Consistency King', 'description': 'Maintain a 30-day outreach streak'},
-            {'key': 'xp_1000', 'name': 'Rising Star', 'description': 'Earn 1,000 XP'},
-            {'key': 'xp_5000', 'name': 'Power Player', 'description': 'Earn 5,000 XP'},
-            {'key': 'outreach_100', 'name': 'Outreach Machine', 'description': 'Log 100 outreach activities'},
-            {'key': 'deals_10', 'name': 'Deal Closer', 'description': 'Close 10 deals'},
-        ]
-        for item in defaults:
-            existing = Achievement.get_first({'key': item['key']})
-            if not existing:
-                Achievement.insert(item)
 
 
 class Goal(SupabaseModel):
@@ -564,34 +922,10 @@ class OutreachTemplate(SupabaseModel):
 
 class LevelReward(SupabaseModel):
     __tablename__ = 'level_rewards'
-    
-    @staticmethod
-    def seed_defaults():
-        defaults = [
-            {'level_interval': 2, 'reward_text': 'Bag of favourite lollies'},
-            {'level_interval': 5, 'reward_text': 'Small treat of your choice'},
-            {'level_interval': 10, 'reward_text': 'Full free day or special reward'},
-        ]
-        for item in defaults:
-            existing = LevelReward.get_first({'level_interval': item['level_interval']})
-            if not existing:
-                LevelReward.insert({**item, 'is_active': True})
 
 
 class MilestoneReward(SupabaseModel):
     __tablename__ = 'milestone_rewards'
-    
-    @staticmethod
-    def seed_defaults():
-        defaults = [
-            {'target_level': 10, 'reward_text': 'Take yourself out for sushi'},
-            {'target_level': 25, 'reward_text': 'Buy a small gift for yourself'},
-            {'target_level': 50, 'reward_text': 'Weekend getaway fund contribution'},
-        ]
-        for item in defaults:
-            existing = MilestoneReward.get_first({'target_level': item['target_level']})
-            if not existing:
-                MilestoneReward.insert({**item, 'is_active': True})
 
 
 class UnlockedReward(SupabaseModel):
@@ -600,28 +934,6 @@ class UnlockedReward(SupabaseModel):
 
 class RevenueReward(SupabaseModel):
     __tablename__ = 'revenue_rewards'
-    
-    @staticmethod
-    def seed_defaults():
-        defaults = [
-            {'target_revenue': 1000, 'reward_text': 'Nice dinner out', 'reward_icon': 'utensils'},
-            {'target_revenue': 2500, 'reward_text': 'New pair of sneakers', 'reward_icon': 'shoe'},
-            {'target_revenue': 5000, 'reward_text': 'Weekend spa day', 'reward_icon': 'spa'},
-            {'target_revenue': 10000, 'reward_text': 'New tech gadget', 'reward_icon': 'laptop'},
-            {'target_revenue': 15000, 'reward_text': 'Designer item', 'reward_icon': 'star'},
-            {'target_revenue': 25000, 'reward_text': 'Weekend getaway trip', 'reward_icon': 'plane'},
-            {'target_revenue': 50000, 'reward_text': 'Luxury watch', 'reward_icon': 'watch'},
-            {'target_revenue': 75000, 'reward_text': 'High-end home upgrade', 'reward_icon': 'home'},
-            {'target_revenue': 100000, 'reward_text': 'Dream vacation package', 'reward_icon': 'globe'},
-            {'target_revenue': 150000, 'reward_text': 'Investment portfolio contribution', 'reward_icon': 'chart'},
-            {'target_revenue': 200000, 'reward_text': 'Luxury experience of choice', 'reward_icon': 'crown'},
-            {'target_revenue': 250000, 'reward_text': 'Major life upgrade fund', 'reward_icon': 'rocket'},
-            {'target_revenue': 300000, 'reward_text': 'McLaren MP4-12C Spider', 'reward_icon': 'car'},
-        ]
-        for item in defaults:
-            existing = RevenueReward.get_first({'target_revenue': item['target_revenue']})
-            if not existing:
-                RevenueReward.insert({**item, 'is_active': True})
 
 
 class UserTokens(SupabaseModel):
@@ -640,51 +952,69 @@ class UserTokens(SupabaseModel):
         return getattr(tokens, 'total_tokens', 0) or 0
     
     @staticmethod
-    def add_tokens(amount, reason):
+    def change_tokens(entries, require_balance=False):
+        """
+        Applies [{'amount', 'reason'}] token changes in one atomic call, writing one
+        token_transactions row per entry. With require_balance nothing is applied if the
+        balance would go negative. Returns (total_tokens, applied).
+        """
+        now = tz.now_iso()
+        entries = [{'created_at': now, **entry} for entry in entries]
+        params = {'p_entries': entries, 'p_require_balance': require_balance}
+        row = _counter_rpc('gamification_add_tokens', params, 'user_tokens', 'token_transactions', entries)
+        if row is not None:
+            return row['total_tokens'], bool(row['applied'])
+        
         tokens = UserTokens.get_tokens()
-        new_total = (getattr(tokens, 'total_tokens', 0) or 0) + amount
-        tokens.total_tokens = new_total
-        tokens.save()
-        TokenTransaction.insert({'amount': amount, 'reason': reason})
-        return new_total
+        current = getattr(tokens, 'total_tokens', 0) or 0
+        new_total = current + sum(entry['amount'] for entry in entries)
+        if require_balance and new_total < 0:
+            return current, False
+        UserTokens.update_by_id(tokens.id, {'total_tokens': new_total, 'updated_at': now})
+        TokenTransaction.insert_many(entries)
+        return new_total, True
+    
+    @staticmethod
+    def add_tokens(amount, reason):
+        return UserTokens.change_tokens([{'amount': amount, 'reason': reason}])[0]
     
     @staticmethod
     def spend_tokens(amount, reason):
-        tokens = UserTokens.get_tokens()
-        current = getattr(tokens, 'total_tokens', 0) or 0
-        if current >= amount:
-            tokens.total_tokens = current - amount
-            tokens.save()
-            TokenTransaction.insert({'amount': -amount, 'reason': reason})
-            return True
-        return False
+        return UserTokens.change_tokens([{'amount': -amount, 'reason': reason}], require_balance=True)[1]
 
 
 class TokenTransaction(SupabaseModel):
     __tablename__ = 'token_transactions'
 
 
-class RewardItem(SupabaseModel):
-    __tablename__ = 'reward_items'
+class RewardGrant(SupabaseModel):
+    """One row per periodic reward granted, keyed by (rule, period), e.g. ('daily_goal', '2026-10-18')."""
+    __tablename__ = 'reward_grants'
     
     @staticmethod
-    def seed_defaults():
-        defaults = [
-            {'name': 'Bag of favourite lollies', 'cost': 8, 'description': 'Treat yourself to your favourite sweets'},
-            {'name': 'Coffee or drink', 'cost': 10, 'description': 'A nice coffee or beverage of your choice'},
-            {'name': '1 hour guilt-free gaming', 'cost': 12, 'description': 'Take a break and play your favourite game'},
-            {'name': 'Nice lunch treat', 'cost': 20, 'description': 'Enjoy a nice lunch out'},
-            {'name': 'Car care item', 'cost': 50, 'description': 'Something nice for your car'},
-            {'name': 'T-shirt', 'cost': 75, 'description': 'Buy yourself a new t-shirt'},
-        ]
-        for item in defaults:
-            existing = RewardItem.get_first({'name': item['name']})
-            if not existing:
-                RewardItem.insert({**item, 'is_active': True})
+    def is_granted(rule, period):
+        return RewardGrant.get_first({'rule': rule, 'period': period}, columns=['rule']) is not None
+    
+    @staticmethod
+    def claim(rule, period):
+        """
+        Records the grant unless it already exists. Returns True only for the caller whose insert
+        created the row, so a reward is granted once per period even under concurrent requests.
+        """
+        row = {'rule': rule, 'period': period, 'granted_at': tz.now_iso()}
+        result = get_supabase().table('reward_grants').upsert(row, on_conflict='rule,period', ignore_duplicates=True).execute()
+        if result.data:
+            _invalidate_cache('reward_grants')
+        return bool(result.data)
+
+
+class RewardItem(SupabaseModel):
+    __tablename__ = 'reward_items'
 
 
 class DailyMission(SupabaseModel):
     __tablename__ = 'daily_missions'
+    __fields__ = {'mission_date': 'date'}
     
     @staticmethod
     def is_weekday(check_date=None):
@@ -775,15 +1105,7 @@ class BossBattle(SupabaseModel):
 
 class ActivityLog(SupabaseModel):
     __tablename__ = 'activity_log'
-    
-    @classmethod
-    def _parse_row(cls, row: dict):
-        if row is None:
-            return None
-        obj = cls(**row)
-        if hasattr(obj, 'timestamp') and obj.timestamp:
-            obj.timestamp = parse_datetime(obj.timestamp)
-        return obj
+    __fields__ = {'timestamp': 'datetime'}
     
     def get_icon(self):
         icons = {
@@ -854,6 +1176,7 @@ class ActivityLog(SupabaseModel):
 
 class Note(SupabaseModel):
     __tablename__ = 'notes'
+    __fields__ = {'created_at': 'datetime', 'updated_at': 'datetime'}
     
     def get_tags_list(self):
         if not hasattr(self, 'tags') or not self.tags:
@@ -870,30 +1193,11 @@ class Note(SupabaseModel):
             return content[:length-3] + "..."
         return content
 
-    @classmethod
-    def _parse_row(cls, row: dict):
-        obj = super()._parse_row(row)
-        if obj:
-            if hasattr(obj, 'created_at') and obj.created_at:
-                obj.created_at = parse_datetime(obj.created_at)
-            if hasattr(obj, 'updated_at') and obj.updated_at:
-                obj.updated_at = parse_datetime(obj.updated_at)
-        return obj
-
 
 class WinsLog(SupabaseModel):
     __tablename__ = 'wins_log'
+    __fields__ = {'created_at': 'datetime'}
     
-    @classmethod
-    def _parse_row(cls, row: dict):
-        if row is None:
-            return None
-        obj = cls(**row)
-        # Handle missing created_at in some environments
-        if hasattr(obj, 'created_at') and obj.created_at:
-            obj.created_at = parse_datetime(obj.created_at)
-        return obj
-
 
 class MonthlyReview(SupabaseModel):
     __tablename__ = 'monthly_reviews'
@@ -941,7 +1245,16 @@ class BattlePassTier(SupabaseModel):
 
 class FreelancingIncome(SupabaseModel):
     __tablename__ = 'freelance_jobs'
+    __fields__ = {'date_completed': 'date', 'amount': 'money'}
     
     @staticmethod
     def category_choices():
         return ['photography', 'one_off_job', 'consulting', 'side_project', 'cash_work', 'other']
+
+
+class DailyMetric(SupabaseModel):
+    __tablename__ = 'daily_metrics'
+    __fields__ = {
+        'date': 'date', 'updated_at': 'datetime', 'project_revenue': 'money', 'freelance_revenue': 'money',
+        'outreach_by_type': 'json', 'outreach_by_outcome': 'json',
+    }
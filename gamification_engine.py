@@ -0,0 +1,311 @@
+"""
+Gamification engine for AnchorOS.
+Routes report what happened with emit() after their own write (outreach_logged,
+lead_status_changed, task_done, focus_completed, xp_awarded). The engine loads the state those
+events touch in one parallel batch (user stats, settings, today's mission, this month's boss),
+applies the XP, token, streak, mission and boss rules to that snapshot in memory, and writes
+the outcome in one batch: one update per changed row, one multi-row insert per log table, and
+XP/tokens through the atomic counter functions (UserStats.add_xp, UserTokens.change_tokens). Achievements are then checked against the new
+totals (see achievements.py, usually answered from cache) while any level-up rows are written.
+"""
+
+from datetime import timedelta
+from flask import flash, has_request_context
+import timezone as tz
+from db_supabase import (UserStats, UserTokens, UserSettings, DailyMission, BossBattle, TokenTransaction,
+                         ActivityLog, WinsLog, parallel_queries, parse_date)
+from achievements import unlock_earned
+from blueprints.gamification import XP_RULES, TOKEN_RULES, check_level_interval_rewards, check_milestone_rewards
+
+# XP_RULES / TOKEN_RULES keys, log reason, mission and boss advanced, and activity type per event
+EVENT_RULES = {
+    'outreach_logged': {'xp': 'outreach_log', 'tokens': 'outreach_log', 'reason': 'Outreach logged',
+                        'mission': 'outreach', 'boss': 'outreach', 'activity': 'outreach_logged', 'streak': True},
+    'task_done': {'xp': 'task_done', 'tokens': 'task_done', 'reason': 'Task completed',
+                  'mission': 'complete_tasks', 'activity': 'task_completed'},
+    'focus_completed': {'xp': 'focus_session', 'tokens': 'focus_session', 'reason': 'Focus session completed',
+                        'activity': 'focus_completed'},
+    'xp_awarded': {},
+}
+
+# lead_status_changed is looked up by the new status; other statuses earn nothing
+LEAD_STATUS_RULES = {
+    'contacted': {'xp': 'lead_contacted', 'tokens': 'lead_contacted', 'reason': 'Lead contacted',
+                  'mission': 'contact_lead', 'activity': 'lead_contacted'},
+    'call_booked': {'xp': 'lead_call_booked', 'reason': 'Call booked', 'activity': 'call_booked'},
+    'proposal_sent': {'xp': 'lead_proposal_sent', 'tokens': 'proposal_sent', 'reason': 'Proposal sent',
+                      'boss': 'proposals', 'activity': 'proposal_sent'},
+    'closed_won': {'xp': 'lead_closed_won', 'reason': 'Deal closed', 'boss': 'close_deals',
+                   'activity': 'deal_closed_won'},
+}
+
+STREAK_XP_BONUSES = [
+    (10, 'streak_10', '10-day outreach streak!'),
+    (30, 'streak_30', '30-day outreach streak!'),
+]
+
+STREAK_TOKEN_MILESTONES = [
+    (3, 'streak_3', '3-day streak bonus'),
+    (7, 'streak_7', '7-day streak bonus'),
+    (14, 'streak_14', '14-day streak bonus'),
+    (30, 'streak_30', '30-day streak bonus'),
+]
+
+STREAK_WIN_MILESTONES = (7, 14, 30)
+
+
+def _rules_for(name, data):
+    if name == 'lead_status_changed':
+        return LEAD_STATUS_RULES.get(data.get('status'), {})
+    if name not in EVENT_RULES:
+        raise ValueError(f"Unknown gamification event: {name}")
+    return EVENT_RULES[name]
+
+
+class Outcome:
+    """What one process() call changed."""
+
+    def __init__(self):
+        self.xp_gained = 0
+        self.tokens_gained = 0
+        self.xp = 0
+        self.level = 1
+        self.tokens = None
+        self.achievements = []
+        self.leveled_up = False
+        self.streak = None
+        self.messages = []
+
+
+class _Run:
+    """Snapshot, rule evaluation and pending writes for one batch of events."""
+
+    def __init__(self, events):
+        self.events = [(name, data, _rules_for(name, data)) for name, data in events]
+        self.outcome = Outcome()
+        self.now = tz.now_iso()
+        self.stats_update = {}
+        self.mission_update = None
+        self.boss_update = None
+        self.xp_rows = []
+        self.token_rows = []
+        self.activity_rows = []
+        self.win_rows = []
+
+    def load(self):
+        rules = [r for _, _, r in self.events]
+
+        def wants(key):
+            return any(r.get(key) for r in rules)
+
+        revives = any(data.get('revived') for _, data, _ in self.events)
+
+        with parallel_queries() as q:
+            stats = q.submit(UserStats.get_stats)
+            settings = q.submit(UserSettings.get_settings) if wants('streak') else None
+            mission = q.submit(DailyMission.get_first, {'mission_date': tz.today().isoformat()}) if wants('mission') else None
+            boss = q.submit(BossBattle.get_current_battle) if wants('boss') or revives else None
+
+        self.stats = stats.result()
+        self.mission = mission.result() if mission else None
+        self.boss = boss.result() if boss else None
+        self.paused = False
+        if settings:
+            settings = settings.result()
+            # An expired pause moves last_outreach_date forward, so re-read the stats it changed
+            if settings.check_pause_expiry():
+                self.stats = UserStats.get_stats()
+            self.paused = bool(getattr(settings, 'pause_active', False))
+        self.streak = getattr(self.stats, 'current_outreach_streak_days', 0) or 0
+
+    def message(self, text, category='success'):
+        self.outcome.messages.append((text, category))
+
+    def activity(self, action_type, description, related_id=None, related_object_type=None):
+        self.activity_rows.append({
+            'action_type': action_type,
+            'description': description,
+            'related_id': related_id,
+            'related_object_type': related_object_type,
+            'timestamp': self.now
+        })
+
+    def win(self, title, description, xp_value=0, token_value=0):
+        self.win_rows.append({
+            'title': title,
+            'description': description,
+            'xp_value': xp_value,
+            'token_value': token_value,
+            'timestamp': self.now
+        })
+
+    def add_xp(self, amount, reason):
+        if amount:
+            self.outcome.xp_gained += amount
+            self.xp_rows.append({'amount': amount, 'reason': reason, 'created_at': self.now})
+
+    def add_tokens(self, amount, reason):
+        if amount:
+            self.outcome.tokens_gained += amount
+            self.token_rows.append({'amount': amount, 'reason': reason, 'created_at': self.now})
+
+    def apply(self):
+        for name, data, rules in self.events:
+            if name == 'xp_awarded':
+                self.add_xp(data.get('amount', 0), data.get('reason', ''))
+                continue
+            reason = data.get('reason') or rules.get('reason', '')
+            if rules.get('xp'):
+                self.add_xp(XP_RULES.get(rules['xp'], 0), reason)
+            if rules.get('tokens'):
+                self.add_tokens(TOKEN_RULES.get(rules['tokens'], 0), reason)
+            if rules.get('streak'):
+                self.apply_streak()
+            if rules.get('mission'):
+                self.advance_mission(rules['mission'])
+            if rules.get('boss'):
+                self.advance_boss(rules['boss'])
+            if data.get('revived'):
+                self.advance_boss('revive_leads')
+            if rules.get('activity') and data.get('description'):
+                self.activity(rules['activity'], data['description'], data.get('related_id'), data.get('related_type'))
+        self.outcome.streak = self.streak
+
+    def apply_streak(self):
+        today = tz.today()
+        yesterday = today - timedelta(days=1)
+        last_outreach = parse_date(self.stats_update.get('last_outreach_date') or getattr(self.stats, 'last_outreach_date', None))
+        old_streak = self.streak
+        if last_outreach == today:
+            return
+        if self.paused:
+            self.stats_update['last_outreach_date'] = today.isoformat()
+            return
+
+        if last_outreach == yesterday:
+            new_streak = old_streak + 1
+        elif last_outreach is None or last_outreach < yesterday:
+            new_streak = 1
+        else:
+            new_streak = old_streak
+        longest = max(getattr(self.stats, 'longest_outreach_streak_days', 0) or 0, new_streak)
+
+        self.streak = new_streak
+        self.stats_update.update({
+            'current_outreach_streak_days': new_streak,
+            'longest_outreach_streak_days': longest,
+            'last_outreach_date': today.isoformat()
+        })
+        if new_streak > old_streak:
+            self.activity('streak_increased', f'Streak increased to {new_streak} days!')
+
+        for days, rule_key, reason in STREAK_XP_BONUSES:
+            if old_streak < days <= new_streak:
+                self.add_xp(XP_RULES[rule_key], reason)
+                self.message(f'{days}-day streak bonus: +{XP_RULES[rule_key]} XP!')
+
+        for days, rule_key, reason in STREAK_TOKEN_MILESTONES:
+            if old_streak < days <= new_streak and not TokenTransaction.get_first({'reason': reason}):
+                self.add_tokens(TOKEN_RULES[rule_key], reason)
+                self.message(f'{reason}: +{TOKEN_RULES[rule_key]} tokens!')
+                if days in STREAK_WIN_MILESTONES:
+                    self.win(f'{days}-Day Streak!', f'Reached a {days}-day outreach streak. Keep it up!',
+                             XP_RULES.get(rule_key, 0), TOKEN_RULES[rule_key])
+
+    def advance_mission(self, mission_type, count=1):
+        mission = self.mission
+        if not mission or getattr(mission, 'mission_type', '') != mission_type or getattr(mission, 'is_completed', False):
+            return
+        mission.progress_count = (getattr(mission, 'progress_count', 0) or 0) + count
+        mission.is_completed = mission.progress_count >= (getattr(mission, 'target_count', 0) or 0)
+        self.mission_update = {'progress_count': mission.progress_count, 'is_completed': mission.is_completed}
+        if mission.is_completed:
+            reward_tokens = getattr(mission, 'reward_tokens', 0) or 0
+            self.add_tokens(reward_tokens, f'Mission completed: {mission_type}')
+            self.message(f'Mission complete! +{reward_tokens} tokens!')
+
+    def advance_boss(self, boss_type, increment=1):
+        boss = self.boss
+        if not boss or getattr(boss, 'boss_type', '') != boss_type or getattr(boss, 'is_completed', False):
+            return
+        boss.progress_value = (getattr(boss, 'progress_value', 0) or 0) + increment
+        target_value = getattr(boss, 'target_value', 0) or 0
+        self.boss_update = {'progress_value': boss.progress_value}
+        if target_value > 0 and boss.progress_value >= target_value:
+            boss.is_completed = True
+            self.boss_update['is_completed'] = True
+            reward_tokens = getattr(boss, 'reward_tokens', 0) or 0
+            description = getattr(boss, 'description', 'Monthly Boss')
+            self.add_tokens(reward_tokens, f'Boss completed: {description}')
+            self.message(f'Boss Defeated! +{reward_tokens} tokens!')
+            self.activity('boss_defeated', f'Boss defeated: {description}', boss.id, 'boss')
+            self.win('Boss Defeated!', f'Defeated the monthly boss: {description}', 0, reward_tokens)
+
+    def apply_level(self, previous_level):
+        if self.outcome.level > previous_level:
+            self.outcome.leveled_up = True
+            # Shown before the streak, mission and boss messages, as the XP comes first
+            self.outcome.messages.insert(0, (f'Level Up! You are now Level {self.outcome.level}!', 'success'))
+            self.activity('level_up', f'Leveled up to Level {self.outcome.level}!')
+            self.win(f'Level Up to {self.outcome.level}', f'Reached Level {self.outcome.level} after gaining XP.',
+                     self.outcome.xp_gained, 0)
+
+    def submit_logs(self, q):
+        for model, rows in ((ActivityLog, self.activity_rows), (WinsLog, self.win_rows)):
+            if rows:
+                q.submit(model.insert_many, rows)
+        self.activity_rows, self.win_rows = [], []
+
+    def write(self):
+        with parallel_queries() as q:
+            xp = q.submit(UserStats.add_xp, self.xp_rows) if self.xp_rows else None
+            tokens = q.submit(UserTokens.change_tokens, self.token_rows) if self.token_rows else None
+            if self.stats_update:
+                q.submit(UserStats.update_by_id, self.stats.id, self.stats_update)
+            if self.mission_update:
+                q.submit(DailyMission.update_by_id, self.mission.id, self.mission_update)
+            if self.boss_update:
+                q.submit(BossBattle.update_by_id, self.boss.id, self.boss_update)
+            self.submit_logs(q)
+
+        # XP and tokens are applied atomically in the database, so the level and balance come back from there
+        if xp:
+            self.outcome.xp, self.outcome.level, previous_level = xp.result()
+        else:
+            self.outcome.xp = getattr(self.stats, 'current_xp', 0) or 0
+            self.outcome.level = previous_level = getattr(self.stats, 'current_level', 1) or 1
+        if tokens:
+            self.outcome.tokens = tokens.result()[0]
+        self.apply_level(previous_level)
+
+        with parallel_queries() as q:
+            unlocked = q.submit(unlock_earned, {'xp': self.outcome.xp, 'outreach_streak': self.streak})
+            self.submit_logs(q)
+        self.outcome.achievements = unlocked.result()
+
+
+def process(events):
+    """
+    Applies (event_name, data) pairs with one snapshot load and one batched write, flashes the
+    resulting messages and returns an Outcome. Data keys: description/related_id/related_type
+    for the activity feed, reason to override the XP/token log reason, status for
+    lead_status_changed, revived for outreach_logged, amount for xp_awarded.
+    """
+    run = _Run(events)
+    run.load()
+    run.apply()
+    run.write()
+
+    if has_request_context():
+        for text, category in run.outcome.messages:
+            flash(text, category)
+
+    if run.outcome.leveled_up:
+        check_level_interval_rewards(run.outcome.level)
+        check_milestone_rewards(run.outcome.level)
+    return run.outcome
+
+
+def emit(event, **data):
+    """Processes a single event; see process()."""
+    return process([(event, data)])
@@ -0,0 +1,320 @@
+"""
+Daily metrics rollup for AnchorOS.
+`daily_metrics` holds one row per day with the counts and sums that dashboards keep
+re-deriving from raw tables (outreach, leads, deals, revenue, XP, tokens).
+SupabaseModel writes to a source table call record_write(), which turns the rows before and
+after the write into per-day deltas and applies them with one daily_metrics_add() call; the
+function adds to each day's columns in place, so concurrent writers never overwrite each
+other. The nightly `daily_metrics` job (and `flask --app app rebuild-metrics`) recomputes the
+table from the raw tables, which also repairs any delta that failed.
+daily() serves the readers (dashboard, analytics, mobile, monthly review, consistency score):
+a range scan of daily_metrics once a full rebuild has finished, the raw tables until then.
+"""
+
+import time
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+import click
+import timezone as tz
+from timezone import parse_date_only
+from db_supabase import get_supabase, select_all, serialize_row, parse_money, is_missing_function, DailyMetric
+
+logger = logging.getLogger(__name__)
+
+# Source table -> columns a row's contribution depends on (read before updates)
+METRIC_SOURCES = {
+    'outreach_logs': ('date', 'type', 'outcome'),
+    'leads': ('created_at', 'closed_at', 'status'),
+    'clients': ('start_date', 'amount_charged'),
+    'freelance_jobs': ('date_completed', 'amount'),
+    'xp_logs': ('created_at', 'amount'),
+    'token_transactions': ('created_at', 'amount'),
+}
+
+# Source table -> columns whose calendar day a row is counted under
+DATE_COLUMNS = {
+    'outreach_logs': ('date',),
+    'leads': ('created_at', 'closed_at'),
+    'clients': ('start_date',),
+    'freelance_jobs': ('date_completed',),
+    'xp_logs': ('created_at',),
+    'token_transactions': ('created_at',),
+}
+
+# daily_metrics columns owned by each source table (reset to these when a day has no rows)
+METRIC_COLUMNS = {
+    'outreach_logs': {'outreach_count': 0, 'outreach_by_type': {}, 'outreach_by_outcome': {}},
+    'leads': {'leads_created': 0, 'deals_won': 0, 'deals_lost': 0},
+    'clients': {'clients_started': 0, 'project_revenue': Decimal(0)},
+    'freelance_jobs': {'freelance_revenue': Decimal(0)},
+    'xp_logs': {'xp_earned': 0},
+    'token_transactions': {'tokens_earned': 0},
+}
+
+# Scheduler job that rebuilds the table; readers use the rollup once one of its runs is done
+REBUILD_JOB = 'daily_metrics'
+# How often a process that found the rollup not ready looks again
+READY_RECHECK_SECONDS = 60
+
+UPSERT_CHUNK = 500
+
+# daily_metrics_add() is not installed (schema not migrated): no deltas, readers use raw tables
+_missing = False
+_ready = False
+_next_ready_check = 0
+
+
+def _in_range(query, column, start, end):
+    # Bare dates bound both DATE and TIMESTAMP columns (a date compares as its midnight)
+    if start is not None:
+        query = query.gte(column, start.isoformat())
+    if end is not None:
+        query = query.lt(column, (end + timedelta(days=1)).isoformat())
+    return query
+
+
+def _contributions(table, row):
+    """(day, column, key, amount) for everything one source row adds to daily_metrics; key is set for the JSON count columns."""
+    if table == 'outreach_logs':
+        d = parse_date_only(row.get('date'))
+        if not d:
+            return []
+        result = [(d, 'outreach_count', None, 1)]
+        for column, key in (('outreach_by_type', row.get('type')), ('outreach_by_outcome', row.get('outcome'))):
+            if key:
+                result.append((d, column, key, 1))
+        return result
+
+    if table == 'leads':
+        result = []
+        d = parse_date_only(row.get('created_at'))
+        if d:
+            result.append((d, 'leads_created', None, 1))
+        d = parse_date_only(row.get('closed_at'))
+        if d and row.get('status') in ('closed_won', 'closed_lost'):
+            result.append((d, 'deals_won' if row['status'] == 'closed_won' else 'deals_lost', None, 1))
+        return result
+
+    if table == 'clients':
+        d = parse_date_only(row.get('start_date'))
+        if not d:
+            return []
+        return [(d, 'clients_started', None, 1),
+                (d, 'project_revenue', None, parse_money(row.get('amount_charged') or 0) or Decimal(0))]
+
+    if table == 'freelance_jobs':
+        d = parse_date_only(row.get('date_completed'))
+        return [(d, 'freelance_revenue', None, parse_money(row.get('amount') or 0) or Decimal(0))] if d else []
+
+    if table in ('xp_logs', 'token_transactions'):
+        d = parse_date_only(row.get('created_at'))
+        amount = int(row.get('amount') or 0)
+        return [(d, 'xp_earned' if table == 'xp_logs' else 'tokens_earned', None, amount)] if d and amount > 0 else []
+
+    return []
+
+
+def _accumulate(days, table, rows, sign=1, start=None, end=None):
+    """Adds the contributions of `rows` (times sign) to {day: {column: value}}, keeping days in [start, end]."""
+    for row in rows:
+        for d, column, key, amount in _contributions(table, row):
+            if (start and d < start) or (end and d > end):
+                continue
+            values = days.setdefault(d, {})
+            if key is None:
+                values[column] = values.get(column, 0) + sign * amount
+            else:
+                counts = values.setdefault(column, {})
+                counts[key] = counts.get(key, 0) + sign * amount
+    return days
+
+
+def _source_rows(table, start=None, end=None):
+    """The rows of `table` counted under a day in [start, end] (all rows if None), with the columns they contribute through."""
+    client = get_supabase()
+    columns = ','.join(('id',) + METRIC_SOURCES[table])
+    date_columns = DATE_COLUMNS[table] if (start or end) else DATE_COLUMNS[table][:1]
+    rows = {}
+    for column in date_columns:
+        for row in select_all(lambda: _in_range(client.table(table).select(columns), column, start, end)):
+            rows[row['id']] = row
+    return rows.values()
+
+
+def _compute(table, start=None, end=None):
+    """Recomputes the metric columns of `table` for days in [start, end] (all days if None)."""
+    days = _accumulate({}, table, _source_rows(table, start, end), start=start, end=end)
+    return {d: {**{k: (dict(v) if isinstance(v, dict) else v) for k, v in METRIC_COLUMNS[table].items()}, **values}
+            for d, values in days.items()}
+
+
+def _deltas(table, before, after):
+    """Per-day changes (zero entries dropped) between the contributions of the rows before and after a write."""
+    days = _accumulate({}, table, before or [], -1)
+    _accumulate(days, table, after or [], 1)
+    result = {}
+    for d, values in days.items():
+        changed = {}
+        for column, value in values.items():
+            if isinstance(value, dict):
+                value = {key: count for key, count in value.items() if count}
+            if value:
+                changed[column] = value
+        if changed:
+            result[d] = changed
+    return result
+
+
+def _write(table_days):
+    """Upserts {day: {column: value}} rows; only the given columns are overwritten."""
+    now = tz.now_iso()
+    rows = [serialize_row({'date': d, **values, 'updated_at': now}) for d, values in sorted(table_days.items())]
+    client = get_supabase()
+    for i in range(0, len(rows), UPSERT_CHUNK):
+        client.table('daily_metrics').upsert(rows[i:i + UPSERT_CHUNK], on_conflict='date').execute()
+
+
+def _apply(deltas):
+    """Sends {day: {column: delta}} to daily_metrics_add(). Returns False if the function isn't installed."""
+    global _missing
+    payload = [serialize_row({'date': d, **values}) for d, values in sorted(deltas.items())]
+    try:
+        get_supabase().rpc('daily_metrics_add', {'p_deltas': payload}).execute()
+    except Exception as e:
+        if not is_missing_function(e):
+            raise
+        if not _missing:
+            logger.warning(f"[Metrics] daily_metrics_add unavailable, readers use the raw tables (run the schema migration): {e}")
+        _missing = True
+        return False
+    return True
+
+
+def source_columns(table):
+    """Columns SupabaseModel reads before updating `table` so record_write() can subtract the old values."""
+    return () if _missing else METRIC_SOURCES.get(table, ())
+
+
+def record_write(table, before=None, after=None):
+    """
+    Called by SupabaseModel after a write to a source table with the affected rows before
+    and after the write. Failures are logged and never fail the write itself; the nightly
+    rebuild repairs the rollup.
+    """
+    if _missing or table not in METRIC_SOURCES:
+        return
+    deltas = _deltas(table, before, after)
+    if not deltas:
+        return
+    try:
+        _apply(deltas)
+    except Exception as e:
+        logger.warning(f"[Metrics] Could not update daily_metrics for a {table} write: {e}")
+
+
+def rollup_ready():
+    """
+    True once daily_metrics has been fully built (a `daily_metrics` scheduler run or a full
+    rebuild-metrics finished) and daily_metrics_add() is installed. A process that finds it
+    not ready looks again after READY_RECHECK_SECONDS.
+    """
+    global _ready, _next_ready_check
+    if _missing:
+        return False
+    if _ready:
+        return True
+    now = time.monotonic()
+    if now < _next_ready_check:
+        return False
+    _next_ready_check = now + READY_RECHECK_SECONDS
+    try:
+        built = get_supabase().table('scheduler_runs').select('run_key') \
+            .eq('job_name', REBUILD_JOB).eq('status', 'done').limit(1).execute().data
+        # An empty call is a no-op that fails only if the function is missing
+        _ready = bool(built) and _apply({})
+    except Exception as e:
+        logger.debug(f"[Metrics] Could not check the daily_metrics rollup: {e}")
+    return _ready
+
+
+def daily(start, end=None, tables=tuple(METRIC_SOURCES)):
+    """
+    {day: {column: value}} for days from start to end (no upper bound if None). Read from
+    daily_metrics once the rollup is built; until then computed from the raw rows of `tables`,
+    so only their columns are present. Days without activity may be absent.
+    """
+    if rollup_ready():
+        try:
+            rows = select_all(lambda: _in_range(get_supabase().table('daily_metrics').select('*'), 'date', start, end),
+                              order='date')
+            defaults = {column: value for values in METRIC_COLUMNS.values() for column, value in values.items()}
+            return {m.date: {column: default if getattr(m, column, None) is None else getattr(m, column)
+                             for column, default in defaults.items()}
+                    for m in DailyMetric._load_rows(rows)}
+        except Exception as e:
+            logger.warning(f"[Metrics] Could not read daily_metrics, counting raw rows: {e}")
+    days = {}
+    for table in tables:
+        for d, values in _compute(table, start, end).items():
+            days.setdefault(d, {}).update(values)
+    return days
+
+
+def total(days, column, start=None, end=None):
+    """Sum of `column` over the days of a daily() result from start to end (either bound optional)."""
+    return sum((values.get(column) or 0 for d, values in days.items()
+                if (start is None or d >= start) and (end is None or d <= end)), 0)
+
+
+def rebuild(start=None, end=None):
+    """
+    Recomputes daily_metrics from the raw tables, for all days or [start, end], and removes
+    days that no longer have any source rows. Returns rows written.
+    """
+    merged = {}
+    for table in METRIC_SOURCES:
+        for d, values in _compute(table, start, end).items():
+            merged.setdefault(d, {}).update(values)
+
+    # Every column is written for every day so stale values from earlier runs are overwritten
+    defaults = {}
+    for values in METRIC_COLUMNS.values():
+        defaults.update(values)
+    full = {d: {**{k: (dict(v) if isinstance(v, dict) else v) for k, v in defaults.items()}, **values}
+            for d, values in merged.items()}
+
+    # Upsert before pruning, so readers never see the range empty and deltas applied meanwhile
+    # to days still present are kept. A delta landing between the raw reads above and this
+    # upsert is still overwritten; the next rebuild repairs it.
+    _write(full)
+    client = get_supabase()
+    existing = select_all(lambda: _in_range(client.table('daily_metrics').select('date'), 'date', start, end), order='date')
+    stale = sorted(d.isoformat() for d in {parse_date_only(row['date']) for row in existing} - set(full))
+    for i in range(0, len(stale), UPSERT_CHUNK):
+        client.table('daily_metrics').delete().in_('date', stale[i:i + UPSERT_CHUNK]).execute()
+    logger.info(f"[Metrics] Rebuilt daily_metrics: {len(full)} days")
+    return len(full)
+
+
+def init_app(app):
+    @app.cli.command('rebuild-metrics')
+    @click.option('--start', default=None, help='First day to rebuild (YYYY-MM-DD); default all')
+    @click.option('--end', default=None, help='Last day to rebuild (YYYY-MM-DD); default all')
+    def rebuild_metrics_command(start, end):
+        """Recompute the daily_metrics rollup from raw tables."""
+        if start or end:
+            count = rebuild(date.fromisoformat(start) if start else None, date.fromisoformat(end) if end else None)
+            click.echo(f"Rebuilt {count} days of daily_metrics")
+            return
+        # Recorded as a run of the nightly job, which is what tells readers the rollup is built
+        from scheduler import JOBS, run_job
+        job = next(job for job in JOBS if job.name == REBUILD_JOB)
+        run_key = tz.now().strftime('manual-%Y%m%d%H%M')
+        if not run_job(job, run_key):
+            click.echo("A rebuild started this minute is already running")
+            return
+        status = get_supabase().table('scheduler_runs').select('status,error') \
+            .eq('job_name', REBUILD_JOB).eq('run_key', run_key).execute().data
+        click.echo("Rebuilt daily_metrics" if status and status[0]['status'] == 'done'
+                   else f"Rebuild failed: {status[0]['error'] if status else 'unknown error'}")
@@ -0,0 +1,249 @@
+"""
+Typo-tolerant name lookup for AnchorOS.
+Keeps a trigram index of lead and client `name` + `business_name` in memory, so the search box
+still finds "Acme Plumbing" when the user types "acme plumbng". Each record is one document;
+postings are compact `array('I')` lists of document numbers per trigram. A lookup counts the
+query's trigrams across their postings (no table scan) and scores each candidate by the share
+of the query it covers, then by Dice similarity. SupabaseModel writes in this process update
+the index incrementally. Writes made elsewhere trigger a reload in the background, while lookups
+keep using the current index: when the cache's table versions move (which only sees other
+workers on this host, and only with the shared cache backend), when the tables' row count or
+latest updated_at changes (checked at most once a minute), and in any case once the index is
+MAX_AGE_SECONDS old.
+"""
+
+import re
+import time
+import heapq
+import logging
+import threading
+from array import array
+from collections import Counter
+from flask import current_app
+from cache import table_versions
+
+logger = logging.getLogger(__name__)
+
+# table -> (result category, include(row))
+TABLES = {
+    'leads': ('leads', lambda row: row.get('status') != 'closed_won'),
+    'clients': ('clients', lambda row: True),
+}
+COLUMNS = ['id', 'name', 'business_name', 'status']
+# Share of the query's trigrams a name must contain to count as a match
+MIN_COVERAGE = 0.5
+# Shorter queries share a trigram or two with most names; the full-text prefix match covers them
+MIN_QUERY_LENGTH = 4
+# Rebuild the postings once this share of documents is dead (updated or deleted)
+COMPACT_RATIO = 0.5
+# Reload at least this often; writes from other hosts (or with a process-local cache) leave no other trace
+MAX_AGE_SECONDS = 10 * 60
+# Minimum time between two row count / latest updated_at checks
+FINGERPRINT_SECONDS = 60
+
+
+def trigrams(text, partial_last=False):
+    """
+    Distinct trigrams of the words in text, each word padded like pg_trgm ('  a', ' ac', 'acm',
+    'cme', 'me '). With partial_last the last word is still being typed, so it gets no end padding.
+    """
+    words = re.findall(r'\w+', (text or '').lower())
+    grams = set()
+    for i, word in enumerate(words):
+        padded = '  ' + word + ('' if partial_last and i == len(words) - 1 else ' ')
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+def _label(row):
+    return (row.get('name') or '') + (f" ({row['business_name']})" if row.get('business_name') else '')
+
+
+class NameIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self._loaded = False
+        self._loading = False
+        self._seen = None
+        self._fingerprint = None
+        self._loaded_at = 0
+        self._next_check = 0
+
+    def _reset(self):
+        # Per document: table slot, row id, trigram count, live flag, label
+        self._tables = array('B')
+        self._ids = array('I')
+        self._sizes = array('H')
+        self._alive = bytearray()
+        self._labels = []
+        self._postings = {}
+        self._docs = {}
+        self._dead = 0
+
+    def _add(self, slot, row):
+        grams = trigrams(f"{row.get('name') or ''} {row.get('business_name') or ''}")
+        if not grams:
+            return
+        doc = len(self._ids)
+        self._tables.append(slot)
+        self._ids.append(int(row['id']))
+        self._sizes.append(min(len(grams), 65535))
+        self._alive.append(1)
+        self._labels.append(_label(row))
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array('I')
+            postings.append(doc)
+        self._docs[(slot, int(row['id']))] = doc
+
+    def _remove(self, slot, id):
+        doc = self._docs.pop((slot, int(id)), None)
+        if doc is not None:
+            self._alive[doc] = 0
+            self._labels[doc] = None
+            self._dead += 1
+
+    def _compact(self):
+        live = [(self._tables[doc], self._ids[doc], self._labels[doc]) for doc in self._docs.values()]
+        self._reset()
+        for slot, id, label in live:
+            # The label holds both names, which is all the trigrams are built from
+            self._add(slot, {'id': id, 'name': label})
+
+    def _replace(self, rows_by_table):
+        self._reset()
+        for slot, (table, (_, include)) in enumerate(TABLES.items()):
+            for row in rows_by_table.get(table, []):
+                if include(row):
+                    self._add(slot, row)
+
+    def apply(self, table, upserts=(), deletes=()):
+        """Applies one local write to `table` (rows written, ids deleted)."""
+        slot = list(TABLES).index(table)
+        include = TABLES[table][1]
+        with self._lock:
+            for id in deletes:
+                self._remove(slot, id)
+            for row in upserts:
+                self._remove(slot, row['id'])
+                if include(row):
+                    self._add(slot, row)
+            # This write's own invalidation is accounted for; any other one means a reload
+            if self._seen is not None:
+                self._seen[1][table] += 1
+            if self._dead > len(self._docs) * COMPACT_RATIO:
+                self._compact()
+
+    def load(self):
+        """Reloads every lead and client from the database."""
+        from search_index import load_rows
+        versions = table_versions(*TABLES)
+        # Taken before the rows, so a write landing during the load shows up at the next check
+        fingerprint = fingerprint_tables()
+        rows_by_table = {table: load_rows(table, COLUMNS) for table in TABLES}
+        with self._lock:
+            self._replace(rows_by_table)
+            self._seen = versions
+            self._fingerprint = fingerprint
+            self._loaded_at = time.monotonic()
+            self._loaded = True
+        logger.info(f"[NameIndex] Loaded {len(self._docs)} names, {len(self._postings)} trigrams")
+
+    def _is_stale(self):
+        if self._seen is None or time.monotonic() - self._loaded_at > MAX_AGE_SECONDS:
+            return True
+        epoch, versions = table_versions(*TABLES)
+        return epoch != self._seen[0] or any(versions[t] > self._seen[1][t] for t in TABLES)
+
+    def _check_due(self):
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_check:
+                return False
+            self._next_check = now + FINGERPRINT_SECONDS
+            return True
+
+    def refresh_in_background(self, app, only_if_changed=False):
+        """Reloads in a background thread; with only_if_changed, only if fingerprint_tables() moved since the last load."""
+        with self._lock:
+            if self._loading:
+                return
+            self._loading = True
+
+        def run():
+            try:
+                with app.app_context():
+                    if not only_if_changed or fingerprint_tables() != self._fingerprint:
+                        self.load()
+            except Exception as e:
+                logger.warning(f"[NameIndex] Could not load names: {e}")
+            finally:
+                self._loading = False
+        threading.Thread(target=run, name='anchoros-name-index', daemon=True).start()
+
+    def lookup(self, q, limit=20):
+        """
+        {category: [(id, label, score)]} of the best fuzzy matches for q, the typed text. Before
+        the first load finishes it returns no matches rather than waiting.
+        """
+        results = {category: [] for category, _ in TABLES.values()}
+        if self._is_stale():
+            self.refresh_in_background(current_app._get_current_object())
+        elif self._check_due():
+            self.refresh_in_background(current_app._get_current_object(), only_if_changed=True)
+        grams = trigrams(q, partial_last=True)
+        if len(q) < MIN_QUERY_LENGTH or not grams or not self._loaded:
+            return results
+
+        with self._lock:
+            counts = Counter()
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    counts.update(postings)
+            needed = max(1, int(len(grams) * MIN_COVERAGE + 0.999))
+            candidates = [[] for _ in TABLES]
+            for doc, shared in counts.items():
+                if shared >= needed and self._alive[doc]:
+                    candidates[self._tables[doc]].append((doc, shared))
+            for (category, _), docs in zip(TABLES.values(), candidates):
+                best = heapq.nlargest(limit, docs, key=lambda c: (c[1], 2 * c[1] / (len(grams) + self._sizes[c[0]])))
+                results[category] = [(self._ids[doc], self._labels[doc], round(shared / len(grams), 3)) for doc, shared in best]
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {'documents': len(self._docs), 'dead': self._dead, 'trigrams': len(self._postings),
+                    'postings': sum(len(p) for p in self._postings.values()), 'loaded': self._loaded}
+
+
+index = NameIndex()
+
+
+def fingerprint_tables():
+    """(row count, latest updated_at) of each table; changes with any insert, delete or update that sets updated_at."""
+    from db_supabase import get_supabase, parallel_queries
+    client = get_supabase()
+    with parallel_queries() as q:
+        futures = [(q.submit(client.table(table).select('id', count='exact').limit(1)),
+                    q.submit(client.table(table).select('updated_at').filter('updated_at', 'not.is', 'null')
+                             .order('updated_at', desc=True).limit(1)))
+                   for table in TABLES]
+    return tuple((count.result().count, (latest.result().data or [{}])[0].get('updated_at')) for count, latest in futures)
+
+
+def index_write(table, before=None, after=None):
+    """Write hook for SupabaseModel, like search_index.index_write."""
+    if table not in TABLES:
+        return
+    after = [row for row in (after or []) if row.get('id') is not None]
+    kept = {row['id'] for row in after}
+    deleted = [row['id'] for row in (before or []) if row.get('id') is not None and row['id'] not in kept]
+    index.apply(table, after, deleted)
+
+
+def init_app(app):
+    # Load in the background so the first search doesn't wait for it
+    index.refresh_in_background(app)
@@ -0,0 +1,131 @@
+"""
+Revenue time series for AnchorOS.
+RevenueSeries buckets clients and freelance jobs by calendar month in one pass, then answers
+any month range from the buckets: project revenue (clients by start_date), hosting/SaaS MRR
+(fees of flagged clients from their start month onwards, via running sums), freelance income
+and totals. Building is O(clients + jobs) and each range is O(log n + months), so the dashboard,
+analytics, mobile and monthly review pages share one implementation instead of looping over
+every client for every month.
+"""
+
+from bisect import bisect_left
+from datetime import date
+from timezone import add_months, parse_date_only
+from db_supabase import round_money
+
+
+def _field(row, name):
+    # Accepts SupabaseModel instances and raw row dicts
+    if isinstance(row, dict):
+        return row.get(name)
+    return getattr(row, name, None)
+
+
+def _amount(value):
+    return float(value or 0)
+
+
+def _month_index(d):
+    return d.year * 12 + d.month - 1
+
+
+def current_mrr(clients):
+    """(hosting_mrr, saas_mrr) of the given clients' active recurring fees, regardless of start date."""
+    hosting = sum(_amount(_field(c, 'monthly_hosting_fee')) for c in clients if _field(c, 'hosting_active'))
+    saas = sum(_amount(_field(c, 'monthly_saas_fee')) for c in clients if _field(c, 'saas_active'))
+    return round_money(hosting), round_money(saas)
+
+
+class RevenueSeries:
+    """Monthly revenue buckets built once from client and freelance job rows."""
+    
+    def __init__(self, clients=(), jobs=()):
+        self._project = {}
+        self._new_clients = {}
+        self._freelance = {}
+        recurring = {}
+        self.undated_project = 0.0
+        self.undated_freelance = 0.0
+        
+        for c in clients:
+            amount = _amount(_field(c, 'amount_charged'))
+            start = parse_date_only(_field(c, 'start_date'))
+            if start is None:
+                # No start month: counted in lifetime totals only
+                self.undated_project += amount
+                continue
+            m = _month_index(start)
+            self._project[m] = self._project.get(m, 0.0) + amount
+            self._new_clients[m] = self._new_clients.get(m, 0) + 1
+            hosting = _amount(_field(c, 'monthly_hosting_fee')) if _field(c, 'hosting_active') else 0.0
+            saas = _amount(_field(c, 'monthly_saas_fee')) if _field(c, 'saas_active') else 0.0
+            if hosting or saas:
+                h, s = recurring.get(m, (0.0, 0.0))
+                recurring[m] = (h + hosting, s + saas)
+        
+        for job in jobs:
+            amount = _amount(_field(job, 'amount'))
+            completed = parse_date_only(_field(job, 'date_completed'))
+            if completed is None:
+                self.undated_freelance += amount
+                continue
+            m = _month_index(completed)
+            self._freelance[m] = self._freelance.get(m, 0.0) + amount
+        
+        # Running MRR after each month in which recurring fees start
+        self._mrr_months = sorted(recurring)
+        self._mrr_totals = []
+        hosting_total = saas_total = 0.0
+        for m in self._mrr_months:
+            h, s = recurring[m]
+            hosting_total += h
+            saas_total += s
+            self._mrr_totals.append((hosting_total, saas_total))
+    
+    def series(self, start, months):
+        """
+        Per calendar month for `months` months from the month of `start`. Returns a dict of
+        equally long lists: months (first days), labels, project_revenue, new_clients,
+        hosting_mrr, saas_mrr, mrr, freelance_revenue and total (project + MRR + freelance).
+        """
+        first = _month_index(start)
+        result = {name: [] for name in ('months', 'labels', 'project_revenue', 'new_clients', 'hosting_mrr',
+                                        'saas_mrr', 'mrr', 'freelance_revenue', 'total')}
+        i = bisect_left(self._mrr_months, first)
+        hosting, saas = self._mrr_totals[i - 1] if i else (0.0, 0.0)
+        
+        for m in range(first, first + months):
+            if i < len(self._mrr_months) and self._mrr_months[i] == m:
+                hosting, saas = self._mrr_totals[i]
+                i += 1
+            month_start = date(m // 12, m % 12 + 1, 1)
+            project = self._project.get(m, 0.0)
+            freelance = self._freelance.get(m, 0.0)
+            result['months'].append(month_start)
+            result['labels'].append(month_start.strftime('%b %Y'))
+            result['project_revenue'].append(round_money(project))
+            result['new_clients'].append(self._new_clients.get(m, 0))
+            result['hosting_mrr'].append(round_money(hosting))
+            result['saas_mrr'].append(round_money(saas))
+            result['mrr'].append(round_money(hosting + saas))
+            result['freelance_revenue'].append(round_money(freelance))
+            result['total'].append(round_money(project + hosting + saas + freelance))
+        return result
+    
+    def month(self, d):
+        """The series() values for the single calendar month containing d, as scalars."""
+        return {name: values[0] for name, values in self.series(d, 1).items()}
+    
+    def trailing(self, d, months):
+        """series() for the `months` full calendar months before the month of d."""
+        return self.series(add_months(d, -months), months)
+    
+    def totals(self):
+        """All-time project and freelance revenue, including rows without a date."""
+        project = sum(self._project.values()) + self.undated_project
+        freelance = sum(self._freelance.values()) + self.undated_freelance
+        return {
+            'project_revenue': round_money(project),
+            'freelance_revenue': round_money(freelance),
+            'lifetime_revenue': round_money(project + freelance),
+        }
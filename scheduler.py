@@ -0,0 +1,250 @@
+"""
+Background scheduler for AnchorOS.
+Runs the daily/monthly jobs that used to happen as a side effect of loading the dashboard
+(today's mission, the monthly boss battle, the end-of-month review, the stored consistency
+score). Every gunicorn worker runs the scheduler thread; a job runs once per period because
+each run is claimed by inserting a (job_name, run_key) row into `scheduler_runs` first,
+and only the worker whose insert succeeds executes it.
+`flask --app app run-scheduler` runs it as a separate worker process instead.
+With autoscaling to zero no worker may be up when a job is due: catch_up jobs also run a
+missed previous period, and pages that need a job's output call ensure() to run it on read.
+"""
+
+import os
+import time
+import zlib
+import socket
+import logging
+import threading
+from datetime import timedelta
+import click
+import timezone as tz
+from db_supabase import get_supabase
+
+logger = logging.getLogger(__name__)
+
+TICK_SECONDS = int(os.environ.get('SCHEDULER_TICK_SECONDS', '60'))
+# A claim still 'running' after this long is treated as abandoned (worker died mid-job)
+STALE_CLAIM_SECONDS = 30 * 60
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def _owner():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _host_tag():
+    # Short enough that an hourly key plus the tag fits scheduler_runs.run_key (VARCHAR(20))
+    return f'{zlib.crc32(socket.gethostname().encode()) & 0xffffff:06x}'
+
+
+class Job:
+    """
+    A function run once per period ('hourly', 'daily' or 'monthly') at or after a local
+    time. Monthly jobs run on day `day` of the month, or on its last day with day=-1.
+    A per_host job runs once per period on every host instead of once overall (for work on
+    host-local files). A catch_up job also runs the previous period if it never ran there;
+    its func takes the due time of the period it runs for.
+    """
+
+    def __init__(self, name, func, period, hour=0, minute=5, day=1, per_host=False, catch_up=False):
+        self.name = name
+        self.func = func
+        self.period = period
+        self.hour = hour
+        self.minute = minute
+        self.day = day
+        self.per_host = per_host
+        self.catch_up = catch_up
+
+    def run_key(self, now):
+        if self.period == 'hourly':
+            key = now.strftime('%Y-%m-%dT%H')
+        elif self.period == 'daily':
+            key = now.strftime('%Y-%m-%d')
+        else:
+            key = now.strftime('%Y-%m')
+        return f'{key}@{_host_tag()}' if self.per_host else key
+
+    def due_at(self, now):
+        """When the run for the period containing `now` becomes due."""
+        if self.period == 'hourly':
+            return now.replace(minute=self.minute, second=0, microsecond=0)
+        at = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if self.period == 'daily':
+            return at
+        if self.day == -1:
+            last_day = (tz.add_months(now.date(), 1) - timedelta(days=1)).day
+            return at.replace(day=last_day)
+        return at.replace(day=self.day)
+
+    def previous_due_at(self, now):
+        """When the run for the period before the one containing `now` became due."""
+        if self.period == 'hourly':
+            return self.due_at(now - timedelta(hours=1))
+        if self.period == 'daily':
+            return self.due_at(now - timedelta(days=1))
+        return self.due_at(now.replace(day=1) - timedelta(days=1))
+
+
+def _claim(job, run_key):
+    """Returns True if this process now owns the run (new claim, or takeover of an abandoned one)."""
+    client = get_supabase()
+    now = tz.now_iso()
+    row = {'job_name': job.name, 'run_key': run_key, 'status': 'running', 'owner': _owner(), 'claimed_at': now}
+    # Only the insert that creates the row gets it back; everyone else hits the primary key
+    inserted = client.table('scheduler_runs').upsert(row, on_conflict='job_name,run_key', ignore_duplicates=True).execute()
+    if inserted.data:
+        return True
+
+    cutoff = (tz.now() - timedelta(seconds=STALE_CLAIM_SECONDS)).isoformat()
+    taken = client.table('scheduler_runs').update({'owner': _owner(), 'claimed_at': now, 'status': 'running'}) \
+        .eq('job_name', job.name).eq('run_key', run_key).in_('status', ['running', 'failed']).lt('claimed_at', cutoff).execute()
+    return bool(taken.data)
+
+
+def _finish(job, run_key, error=None):
+    data = {'status': 'failed' if error else 'done', 'finished_at': tz.now_iso(), 'error': str(error)[:500] if error else None}
+    get_supabase().table('scheduler_runs').update(data).eq('job_name', job.name).eq('run_key', run_key).execute()
+
+
+def run_job(job, run_key, due_at=None):
+    """Claims and runs one period of a job. Returns True if it ran here."""
+    if not _claim(job, run_key):
+        return False
+    started = time.monotonic()
+    try:
+        if job.catch_up:
+            job.func(due_at or job.due_at(tz.now()))
+        else:
+            job.func()
+    except Exception as e:
+        logger.exception(f"[Scheduler] {job.name} ({run_key}) failed: {e}")
+        _finish(job, run_key, e)
+        return True
+    _finish(job, run_key)
+    logger.info(f"[Scheduler] {job.name} ({run_key}) done in {time.monotonic() - started:.1f}s")
+    return True
+
+
+def run_due_jobs(now=None):
+    """
+    Runs every job whose current period is due and not yet claimed, and the missed previous
+    period of catch_up jobs. Returns the names that ran.
+    """
+    now = now or tz.now()
+    ran = []
+    for job in JOBS:
+        periods = [job.previous_due_at(now)] if job.catch_up else []
+        if now >= job.due_at(now):
+            periods.append(job.due_at(now))
+        for due_at in periods:
+            try:
+                if run_job(job, job.run_key(due_at), due_at):
+                    ran.append(job.name)
+            except Exception as e:
+                # e.g. scheduler_runs missing; retried on the next tick
+                logger.warning(f"[Scheduler] Could not run {job.name}: {e}")
+    return ran
+
+
+def ensure(name):
+    """
+    Runs the current period of a job now if it is due and has not run yet, for pages that
+    would otherwise wait for the next tick (e.g. right after a scale-from-zero cold start).
+    Goes through the same claim, so it never runs twice. Returns True if it ran here.
+    """
+    job = next(job for job in JOBS if job.name == name)
+    now = tz.now()
+    due_at = job.due_at(now)
+    if now < due_at:
+        return False
+    try:
+        return run_job(job, job.run_key(now), due_at)
+    except Exception as e:
+        logger.warning(f"[Scheduler] Could not run {job.name}: {e}")
+        return False
+
+
+def _create_daily_mission():
+    from db_supabase import DailyMission
+    DailyMission.create_today_mission()
+
+
+def _create_boss_battle():
+    from db_supabase import BossBattle
+    BossBattle.create_current_battle()
+
+
+def _generate_monthly_review(due_at):
+    from blueprints.monthly_review import auto_generate_monthly_review_if_needed
+    auto_generate_monthly_review_if_needed(due_at.date())
+
+
+def _record_consistency_score():
+    from blueprints.gamification import record_consistency_score
+    record_consistency_score()
+
+
+def _rebuild_daily_metrics():
+    # Repairs any delta a failed write hook missed
+    from metrics import rebuild
+    rebuild()
+
+
+def _rebuild_search_index():
+    # Catches any row the write hooks missed on this host's index file
+    from search_index import rebuild
+    rebuild()
+
+
+JOBS = [
+    Job('daily_mission', _create_daily_mission, 'daily', hour=0, minute=5),
+    Job('boss_battle', _create_boss_battle, 'monthly', hour=0, minute=5, day=1),
+    Job('monthly_review', _generate_monthly_review, 'monthly', hour=21, minute=0, day=-1, catch_up=True),
+    Job('consistency_score', _record_consistency_score, 'hourly', minute=0),
+    Job('search_index', _rebuild_search_index, 'daily', hour=3, minute=0, per_host=True),
+    Job('daily_metrics', _rebuild_daily_metrics, 'daily', hour=3, minute=30),
+]
+
+
+def _loop(app):
+    # Let the worker finish booting before the first tick
+    time.sleep(min(10, TICK_SECONDS))
+    while True:
+        try:
+            with app.app_context():
+                run_due_jobs()
+        except Exception as e:
+            logger.warning(f"[Scheduler] Tick failed: {e}")
+        time.sleep(TICK_SECONDS)
+
+
+def start(app):
+    """Starts the scheduler thread once per process."""
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_loop, args=(app,), name='anchoros-scheduler', daemon=True).start()
+    logger.info(f"[Scheduler] Started (tick {TICK_SECONDS}s, jobs: {', '.join(job.name for job in JOBS)})")
+
+
+def init_app(app):
+    # SCHEDULER_ENABLED=0 when a separate `flask run-scheduler` process runs the jobs
+    if os.environ.get('SCHEDULER_ENABLED', '1') != '0':
+        start(app)
+
+    @app.cli.command('run-scheduler')
+    @click.option('--once', is_flag=True, help='Run due jobs once and exit')
+    def run_scheduler_command(once):
+        """Run scheduled jobs in this process."""
+        if once:
+            ran = run_due_jobs()
+            click.echo(f"Ran: {', '.join(ran) or 'nothing due'}")
+            return
+        start(app)
+        threading.Event().wait()
@@ -1,296 +1,350 @@
 -- AnchorOS CRM Database Schema
--- Exported from: /home/runner/workspace/instance/database.db
+-- SQLite export of supabase_schema.sql (functions and data backfills omitted)
 
 CREATE TABLE achievements (
-	id INTEGER NOT NULL, 
-	"key" VARCHAR(100) NOT NULL, 
-	name VARCHAR(200) NOT NULL, 
-	description TEXT, 
-	unlocked_at DATETIME, 
-	PRIMARY KEY (id), 
-	UNIQUE ("key")
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    "key" VARCHAR(100) NOT NULL UNIQUE,
+    name VARCHAR(200) NOT NULL,
+    description TEXT,
+    unlocked_at DATETIME
 );
 
 CREATE TABLE activity_log (
-	id INTEGER NOT NULL, 
-	timestamp DATETIME, 
-	action_type VARCHAR(50) NOT NULL, 
-	description TEXT NOT NULL, 
-	related_id INTEGER, 
-	related_object_type VARCHAR(50), 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    action_type VARCHAR(50) NOT NULL,
+    description TEXT NOT NULL,
+    related_id INTEGER,
+    related_object_type VARCHAR(50)
 );
 
+CREATE INDEX idx_activity_log_timestamp ON activity_log(timestamp);
+
 CREATE TABLE boss_fight_history (
-	id INTEGER NOT NULL, 
-	boss_fight_id INTEGER NOT NULL, 
-	month VARCHAR(7) NOT NULL, 
-	completed_at DATETIME NOT NULL, 
-	reward_tokens INTEGER NOT NULL, 
-	PRIMARY KEY (id), 
-	FOREIGN KEY(boss_fight_id) REFERENCES boss_fights (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    boss_fight_id INTEGER NOT NULL REFERENCES boss_fights(id),
+    month VARCHAR(7) NOT NULL,
+    completed_at DATETIME NOT NULL,
+    reward_tokens INTEGER NOT NULL
 );
 
 CREATE TABLE boss_fights (
-	id INTEGER NOT NULL, 
-	month VARCHAR(7) NOT NULL, 
-	description TEXT NOT NULL, 
-	boss_type VARCHAR(50) NOT NULL, 
-	target_value INTEGER NOT NULL, 
-	progress_value INTEGER, 
-	reward_tokens INTEGER NOT NULL, 
-	is_completed BOOLEAN, 
-	completed_at DATETIME, 
-	created_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    month VARCHAR(7) NOT NULL,
+    description TEXT NOT NULL,
+    boss_type VARCHAR(50) NOT NULL,
+    target_value INTEGER NOT NULL,
+    progress_value INTEGER DEFAULT 0,
+    reward_tokens INTEGER NOT NULL,
+    is_completed BOOLEAN DEFAULT 0,
+    completed_at DATETIME,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE clients (
-	id INTEGER NOT NULL, 
-	name VARCHAR(200) NOT NULL, 
-	business_name VARCHAR(200), 
-	contact_email VARCHAR(200), 
-	phone VARCHAR(50), 
-	project_type VARCHAR(50), 
-	start_date DATE, 
-	amount_charged NUMERIC(10, 2), 
-	status VARCHAR(50), 
-	hosting_active BOOLEAN, 
-	monthly_hosting_fee NUMERIC(10, 2), 
-	saas_active BOOLEAN, 
-	monthly_saas_fee NUMERIC(10, 2), 
-	notes TEXT, 
-	created_at DATETIME, 
-	updated_at DATETIME, 
-	related_lead_id INTEGER, 
-	PRIMARY KEY (id), 
-	FOREIGN KEY(related_lead_id) REFERENCES leads (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(200) NOT NULL,
+    business_name VARCHAR(200),
+    contact_email VARCHAR(200),
+    phone VARCHAR(50),
+    project_type VARCHAR(50),
+    start_date DATE,
+    amount_charged NUMERIC(10, 2),
+    status VARCHAR(50),
+    hosting_active BOOLEAN DEFAULT 0,
+    monthly_hosting_fee NUMERIC(10, 2),
+    saas_active BOOLEAN DEFAULT 0,
+    monthly_saas_fee NUMERIC(10, 2),
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    related_lead_id INTEGER REFERENCES leads(id)
+);
+
+CREATE INDEX idx_clients_start_date ON clients(start_date);
+
+CREATE INDEX idx_clients_status ON clients(status);
+
+CREATE TABLE daily_metrics (
+    date DATE PRIMARY KEY,
+    outreach_count INTEGER NOT NULL DEFAULT 0,
+    outreach_by_type TEXT NOT NULL DEFAULT '{}',
+    outreach_by_outcome TEXT NOT NULL DEFAULT '{}',
+    leads_created INTEGER NOT NULL DEFAULT 0,
+    deals_won INTEGER NOT NULL DEFAULT 0,
+    deals_lost INTEGER NOT NULL DEFAULT 0,
+    clients_started INTEGER NOT NULL DEFAULT 0,
+    project_revenue NUMERIC(12, 2) NOT NULL DEFAULT 0,
+    freelance_revenue NUMERIC(12, 2) NOT NULL DEFAULT 0,
+    xp_earned INTEGER NOT NULL DEFAULT 0,
+    tokens_earned INTEGER NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE daily_missions (
-	id INTEGER NOT NULL, 
-	mission_date DATE NOT NULL, 
-	description VARCHAR(200) NOT NULL, 
-	mission_type VARCHAR(50) NOT NULL, 
-	target_count INTEGER NOT NULL, 
-	reward_tokens INTEGER NOT NULL, 
-	is_completed BOOLEAN, 
-	progress_count INTEGER, 
-	created_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mission_date DATE NOT NULL,
+    description VARCHAR(200) NOT NULL,
+    mission_type VARCHAR(50) NOT NULL,
+    target_count INTEGER NOT NULL,
+    reward_tokens INTEGER NOT NULL,
+    is_completed BOOLEAN DEFAULT 0,
+    progress_count INTEGER DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE TABLE focus_sessions (id INTEGER PRIMARY KEY AUTOINCREMENT, start_time DATETIME NOT NULL, end_time DATETIME, duration_minutes INTEGER NOT NULL, completed BOOLEAN DEFAULT 0, created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+CREATE INDEX idx_daily_missions_date ON daily_missions(mission_date);
+
+CREATE TABLE focus_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME,
+    duration_minutes INTEGER NOT NULL,
+    completed BOOLEAN DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
 
 CREATE TABLE freelance_jobs (
-	id INTEGER NOT NULL, 
-	title VARCHAR(200) NOT NULL, 
-	description TEXT, 
-	category VARCHAR(50), 
-	amount NUMERIC(10, 2) NOT NULL, 
-	date_completed DATE, 
-	client_name VARCHAR(200), 
-	notes TEXT, 
-	created_at DATETIME, 
-	updated_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    category VARCHAR(50),
+    amount NUMERIC(10, 2) NOT NULL,
+    date_completed DATE,
+    client_name VARCHAR(200),
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_freelance_jobs_date_completed ON freelance_jobs(date_completed);
+
 CREATE TABLE goals (
-	id INTEGER NOT NULL, 
-	goal_type VARCHAR(50) NOT NULL, 
-	period VARCHAR(20) NOT NULL, 
-	target_value INTEGER, 
-	is_manual BOOLEAN, 
-	created_at DATETIME, 
-	updated_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    goal_type VARCHAR(50) NOT NULL,
+    period VARCHAR(20) NOT NULL,
+    target_value INTEGER,
+    is_manual BOOLEAN DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE leads (
-	id INTEGER NOT NULL, 
-	name VARCHAR(200) NOT NULL, 
-	business_name VARCHAR(200), 
-	niche VARCHAR(100), 
-	email VARCHAR(200), 
-	phone VARCHAR(50), 
-	source VARCHAR(100), 
-	status VARCHAR(50), 
-	notes TEXT, 
-	created_at DATETIME, 
-	updated_at DATETIME, 
-	last_contacted_at DATETIME, 
-	next_action_date DATE, has_website BOOLEAN DEFAULT 0, website_quality VARCHAR(50), demo_site_built BOOLEAN DEFAULT 0, converted_at DATETIME, close_reason VARCHAR(500), closed_at DATETIME, archived_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(200) NOT NULL,
+    business_name VARCHAR(200),
+    niche VARCHAR(100),
+    email VARCHAR(200),
+    phone VARCHAR(50),
+    source VARCHAR(100),
+    status VARCHAR(50),
+    notes TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    last_contacted_at DATETIME,
+    next_action_date DATE,
+    has_website BOOLEAN DEFAULT 0,
+    website_quality VARCHAR(50),
+    demo_site_built BOOLEAN DEFAULT 0,
+    converted_at DATETIME,
+    close_reason VARCHAR(500),
+    closed_at DATETIME,
+    archived_at DATETIME
 );
 
+CREATE INDEX idx_leads_next_action_date ON leads(next_action_date);
+
+CREATE INDEX idx_leads_status ON leads(status);
+
+CREATE INDEX idx_leads_updated_at ON leads(updated_at);
+
 CREATE TABLE level_rewards (
-	id INTEGER NOT NULL, 
-	level_interval INTEGER NOT NULL, 
-	reward_text TEXT NOT NULL, 
-	is_active BOOLEAN, 
-	created_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    level_interval INTEGER NOT NULL,
+    reward_text TEXT NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE milestone_rewards (
-	id INTEGER NOT NULL, 
-	target_level INTEGER NOT NULL, 
-	reward_text TEXT NOT NULL, 
-	is_active BOOLEAN, 
-	unlocked_at DATETIME, 
-	created_at DATETIME, 
-	PRIMARY KEY (id), 
-	UNIQUE (target_level)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    target_level INTEGER NOT NULL UNIQUE,
+    reward_text TEXT NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    unlocked_at DATETIME,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE monthly_reviews (
-	id INTEGER NOT NULL, 
-	year_month VARCHAR(7) NOT NULL, 
-	content_json TEXT NOT NULL, 
-	generated_at DATETIME NOT NULL, 
-	PRIMARY KEY (id), 
-	UNIQUE (year_month)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    year_month VARCHAR(7) NOT NULL UNIQUE,
+    content_json TEXT NOT NULL,
+    generated_at DATETIME NOT NULL
 );
 
 CREATE TABLE notes (
-	id INTEGER NOT NULL, 
-	title VARCHAR(200) NOT NULL, 
-	content TEXT NOT NULL, 
-	tags VARCHAR(500), 
-	pinned BOOLEAN, 
-	created_at DATETIME, 
-	updated_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(200) NOT NULL,
+    content TEXT NOT NULL,
+    tags VARCHAR(500),
+    pinned BOOLEAN DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE outreach_logs (
-	id INTEGER NOT NULL, 
-	date DATE, 
-	type VARCHAR(50), 
-	lead_id INTEGER, 
-	notes TEXT, 
-	outcome VARCHAR(50), 
-	created_at DATETIME, 
-	PRIMARY KEY (id), 
-	FOREIGN KEY(lead_id) REFERENCES leads (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date DATE,
+    type VARCHAR(50),
+    lead_id INTEGER REFERENCES leads(id),
+    notes TEXT,
+    outcome VARCHAR(50),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_outreach_logs_date ON outreach_logs(date);
+
 CREATE TABLE outreach_templates (
-	id INTEGER NOT NULL, 
-	name VARCHAR(200) NOT NULL, 
-	category VARCHAR(50) NOT NULL, 
-	subcategory VARCHAR(100), 
-	content TEXT NOT NULL, 
-	is_favourite BOOLEAN, 
-	created_at DATETIME, 
-	updated_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(200) NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    subcategory VARCHAR(100),
+    content TEXT NOT NULL,
+    is_favourite BOOLEAN DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE revenue_rewards (
-	id INTEGER NOT NULL, 
-	target_revenue FLOAT NOT NULL, 
-	reward_text TEXT NOT NULL, 
-	reward_icon VARCHAR(50), 
-	is_active BOOLEAN, 
-	unlocked_at DATETIME, 
-	claimed_at DATETIME, 
-	created_at DATETIME, 
-	PRIMARY KEY (id), 
-	UNIQUE (target_revenue)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    target_revenue FLOAT NOT NULL UNIQUE,
+    reward_text TEXT NOT NULL,
+    reward_icon VARCHAR(50),
+    is_active BOOLEAN DEFAULT 1,
+    unlocked_at DATETIME,
+    claimed_at DATETIME,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE reward_grants (
+    rule VARCHAR(50) NOT NULL,
+    period VARCHAR(20) NOT NULL,
+    granted_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (rule, period)
 );
 
 CREATE TABLE reward_items (
-	id INTEGER NOT NULL, 
-	name VARCHAR(200) NOT NULL, 
-	cost INTEGER NOT NULL, 
-	description TEXT, 
-	is_active BOOLEAN, 
-	created_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(200) NOT NULL,
+    cost INTEGER NOT NULL,
+    description TEXT,
+    is_active BOOLEAN DEFAULT 1,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE scheduler_runs (
+    job_name VARCHAR(50) NOT NULL,
+    run_key VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'running',
+    owner VARCHAR(100),
+    claimed_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at DATETIME,
+    error TEXT,
+    PRIMARY KEY (job_name, run_key)
+);
+
+CREATE TABLE seed_versions (
+    version INTEGER PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'running',
+    applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE sqlite_sequence(name,seq);
 
 CREATE TABLE tasks (
-	id INTEGER NOT NULL, 
-	title VARCHAR(200) NOT NULL, 
-	description TEXT, 
-	due_date DATE, 
-	status VARCHAR(50), 
-	related_lead_id INTEGER, 
-	related_client_id INTEGER, 
-	created_at DATETIME, 
-	PRIMARY KEY (id), 
-	FOREIGN KEY(related_lead_id) REFERENCES leads (id), 
-	FOREIGN KEY(related_client_id) REFERENCES clients (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    due_date DATE,
+    status VARCHAR(50),
+    related_lead_id INTEGER REFERENCES leads(id),
+    related_client_id INTEGER REFERENCES clients(id),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_tasks_due_date ON tasks(due_date);
+
+CREATE INDEX idx_tasks_status ON tasks(status);
+
 CREATE TABLE token_transactions (
-	id INTEGER NOT NULL, 
-	amount INTEGER NOT NULL, 
-	reason VARCHAR(200), 
-	created_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    amount INTEGER NOT NULL,
+    reason VARCHAR(200),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE unlocked_rewards (
-	id INTEGER NOT NULL, 
-	reward_type VARCHAR(20) NOT NULL, 
-	reward_reference_id INTEGER NOT NULL, 
-	level_achieved INTEGER NOT NULL, 
-	reward_text TEXT NOT NULL, 
-	unlocked_at DATETIME, claimed_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reward_type VARCHAR(20) NOT NULL,
+    reward_reference_id INTEGER NOT NULL,
+    level_achieved INTEGER NOT NULL,
+    reward_text TEXT NOT NULL,
+    unlocked_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    claimed_at DATETIME
 );
 
 CREATE TABLE user_settings (
-	id INTEGER NOT NULL, 
-	show_mrr_widget BOOLEAN, 
-	show_project_revenue_widget BOOLEAN, 
-	show_outreach_widget BOOLEAN, 
-	show_deals_widget BOOLEAN, 
-	show_consistency_score_widget BOOLEAN, 
-	show_forecast_widget BOOLEAN, 
-	show_followup_widget BOOLEAN, pause_active BOOLEAN DEFAULT 0, pause_start DATE, pause_end DATE, pause_reason TEXT, focus_timer_active BOOLEAN DEFAULT 0, focus_timer_end DATETIME, focus_timer_length INTEGER DEFAULT 25, dashboard_layout TEXT, dashboard_active_widgets TEXT, dashboard_order TEXT, dashboard_active TEXT, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    show_mrr_widget BOOLEAN DEFAULT 1,
+    show_project_revenue_widget BOOLEAN DEFAULT 1,
+    show_outreach_widget BOOLEAN DEFAULT 1,
+    show_deals_widget BOOLEAN DEFAULT 1,
+    show_consistency_score_widget BOOLEAN DEFAULT 1,
+    show_forecast_widget BOOLEAN DEFAULT 1,
+    show_followup_widget BOOLEAN DEFAULT 1,
+    pause_active BOOLEAN DEFAULT 0,
+    pause_start DATE,
+    pause_end DATE,
+    pause_reason TEXT,
+    focus_timer_active BOOLEAN DEFAULT 0,
+    focus_timer_end DATETIME,
+    focus_timer_length INTEGER DEFAULT 25,
+    dashboard_layout TEXT,
+    dashboard_active_widgets TEXT,
+    dashboard_order TEXT,
+    dashboard_active TEXT
 );
 
 CREATE TABLE user_stats (
-	id INTEGER NOT NULL, 
-	current_xp INTEGER, 
-	current_level INTEGER, 
-	current_outreach_streak_days INTEGER, 
-	longest_outreach_streak_days INTEGER, 
-	last_outreach_date DATE, 
-	last_consistency_score INTEGER, 
-	last_consistency_calculated_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    current_xp INTEGER DEFAULT 0,
+    current_level INTEGER DEFAULT 1,
+    current_outreach_streak_days INTEGER DEFAULT 0,
+    longest_outreach_streak_days INTEGER DEFAULT 0,
+    last_outreach_date DATE,
+    last_consistency_score INTEGER DEFAULT 0,
+    last_consistency_calculated_at DATETIME
 );
 
 CREATE TABLE user_tokens (
-	id INTEGER NOT NULL, 
-	total_tokens INTEGER, 
-	created_at DATETIME, 
-	updated_at DATETIME, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    total_tokens INTEGER DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE wins_log (
-	id INTEGER NOT NULL, 
-	timestamp DATETIME NOT NULL, 
-	title VARCHAR(200) NOT NULL, 
-	description TEXT, 
-	xp_value INTEGER, 
-	token_value INTEGER, 
-	PRIMARY KEY (id)
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp DATETIME NOT NULL,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    xp_value INTEGER,
+    token_value INTEGER
 );
 
 CREATE TABLE xp_logs (
-	id INTEGER NOT NULL, 
-	amount INTEGER NOT NULL, 
-	reason VARCHAR(200), 
-	created_at DATETIME, 
-	PRIMARY KEY (id)
-);
\ No newline at end of file
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    amount INTEGER NOT NULL,
+    reason VARCHAR(200),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,432 @@
+"""
+Local full-text search index for AnchorOS.
+Leads, clients, tasks, notes, the activity timeline, daily missions and boss fights are
+mirrored into an SQLite FTS5 table on local disk (WAL mode, shared by every gunicorn worker
+on the host). SupabaseModel writes keep it current through index_write(); rebuild() reloads
+it from the source tables (at first boot, when SOURCES change, daily from the scheduler and
+from `flask --app app rebuild-search-index`). search() answers /search with one ranked
+query: bm25 over title and body, top N per source, with highlighted snippets.
+cached_search() puts the cache in front of it (see its docstring).
+The index only sees SupabaseModel writes made on this host. Writes from other hosts, scripts
+or the Supabase dashboard are picked up by a full rebuild when a source table's row count or
+latest updated_at changes (checked at most once per FINGERPRINT_SECONDS across the host's
+workers, see check_freshness()). Edits that change neither (an update to a table without
+updated_at, or one that leaves updated_at alone) stay invisible until the nightly rebuild.
+"""
+
+import os
+import re
+import html
+import json
+import time
+import unicodedata
+import sqlite3
+import logging
+import threading
+import click
+from flask import current_app
+from cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Bump when SOURCES change so existing index files are rebuilt at boot
+INDEX_VERSION = 1
+# FTS rowid = source row id * SOURCE_SLOTS + position in SOURCES, so a write touches one rowid
+SOURCE_SLOTS = 16
+SNIPPET_TOKENS = 12
+# Matches in titles count for more than matches in bodies
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+# Cached search results are keyed on the index generation (see SearchIndex.generation)
+SEARCH_CACHE_TTL = 300
+# Minimum time between two row count / latest updated_at checks on a host
+FINGERPRINT_SECONDS = 60
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS search_docs USING fts5(
+    title, body, label UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE TABLE IF NOT EXISTS search_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Snippet markers; replaced with <mark> after the text is escaped
+_OPEN, _CLOSE = '\x02', '\x03'
+_MARK = '<mark class="bg-aqua/30 text-aqua px-0.5 rounded">'
+
+
+def _text(*values):
+    return ' '.join(str(v) for v in values if v)
+
+
+def _clip(text, length=80):
+    text = text or ''
+    return text[:length] + ('...' if len(text) > length else '')
+
+
+class Source:
+    """How rows of one table become documents: indexed title/body text and the stored label."""
+
+    def __init__(self, table, category, columns, title, body, label, include=None, updated_at=False):
+        self.table = table
+        self.category = category
+        self.columns = ['id'] + columns
+        self.title = title
+        self.body = body
+        self.label = label
+        self.include = include or (lambda row: True)
+        # Whether the table has an updated_at column for fingerprint_tables()
+        self.updated_at = updated_at
+
+    def document(self, row):
+        return self.title(row), self.body(row), self.label(row)
+
+
+def _name_label(row):
+    return (row.get('name') or '') + (f" ({row['business_name']})" if row.get('business_name') else '')
+
+
+SOURCES = [
+    Source('leads', 'leads', ['name', 'business_name', 'niche', 'notes', 'status'],
+           title=lambda r: _text(r.get('name'), r.get('business_name')),
+           body=lambda r: _text(r.get('niche'), r.get('notes')),
+           label=_name_label,
+           include=lambda r: r.get('status') != 'closed_won',
+           updated_at=True),
+    Source('clients', 'clients', ['name', 'business_name', 'project_type', 'notes'],
+           title=lambda r: _text(r.get('name'), r.get('business_name')),
+           body=lambda r: _text(r.get('project_type'), r.get('notes')),
+           label=_name_label,
+           updated_at=True),
+    Source('tasks', 'tasks', ['title', 'description'],
+           title=lambda r: r.get('title') or '',
+           body=lambda r: r.get('description') or '',
+           label=lambda r: r.get('title') or ''),
+    Source('notes', 'notes', ['title', 'content', 'tags'],
+           title=lambda r: _text(r.get('title'), r.get('tags')),
+           body=lambda r: r.get('content') or '',
+           label=lambda r: r.get('title') or '',
+           updated_at=True),
+    Source('activity_log', 'timeline', ['action_type', 'description'],
+           title=lambda r: '',
+           body=lambda r: _text(r.get('description'), r.get('action_type')),
+           label=lambda r: _clip(r.get('description'))),
+    Source('daily_missions', 'missions', ['mission_date', 'mission_type', 'description'],
+           title=lambda r: r.get('description') or '',
+           body=lambda r: _text(r.get('mission_type'), r.get('mission_date')),
+           label=lambda r: f"{r.get('mission_type', '')} - {r.get('mission_date', '')}"),
+    Source('boss_fights', 'boss_fights', ['month', 'description', 'boss_type'],
+           title=lambda r: r.get('description') or '',
+           body=lambda r: _text(r.get('boss_type'), r.get('month')),
+           label=lambda r: _clip(r.get('description'))),
+]
+SOURCES_BY_TABLE = {source.table: (slot, source) for slot, source in enumerate(SOURCES)}
+CATEGORIES = [source.category for source in SOURCES]
+
+
+def _rowid(slot, id):
+    return int(id) * SOURCE_SLOTS + slot
+
+
+def words(text):
+    """Lowercased words without diacritics, split the way the unicode61 tokenizer splits them."""
+    folded = unicodedata.normalize('NFKD', (text or '').lower())
+    return re.findall(r'[^\W_]+', ''.join(c for c in folded if not unicodedata.combining(c)))
+
+
+def match_expression(query_words):
+    """FTS5 query for the words typed by the user: every word must match, as a prefix."""
+    return ' '.join(f'"{word}"*' for word in query_words)
+
+
+def _matches(query_words, tokens):
+    # match_expression() evaluated in Python against a document's tokens
+    return all(any(token.startswith(word) for token in tokens) for word in query_words)
+
+
+def _snippet_html(snippet):
+    if not snippet or _OPEN not in snippet:
+        return None
+    return html.escape(snippet).replace(_OPEN, _MARK).replace(_CLOSE, '</mark>')
+
+
+class SearchIndex:
+    """
+    The FTS5 index file. Like the shared cache backend, every method logs and swallows sqlite
+    errors, so a broken index file only degrades search and never fails a write.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized_pid = None
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # Connections must not cross a fork; reopen in the child
+        if conn is not None and getattr(self._local, 'pid', None) == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        with self._init_lock:
+            if self._initialized_pid != os.getpid():
+                conn.executescript(SCHEMA)
+                self._initialized_pid = os.getpid()
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _run(self, fn, default=None):
+        try:
+            return fn(self._connect())
+        except sqlite3.Error as e:
+            logger.warning(f"[Search] Index error ({self.path}): {e}")
+            return default
+
+    def _transaction(self, fn):
+        def op(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn(conn)
+                conn.execute('COMMIT')
+                return result
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return self._run(op)
+
+    def meta(self, key):
+        row = self._run(lambda conn: conn.execute('SELECT value FROM search_meta WHERE key = ?', (key,)).fetchone())
+        return row[0] if row else None
+
+    def generation(self):
+        """Changes with every commit to the index, from any process on the host."""
+        return self.meta('generation')
+
+    def is_current(self):
+        return self.meta('version') == str(INDEX_VERSION)
+
+    def apply(self, table, upserts=(), deletes=()):
+        """Indexes the given rows of `table` and removes the given ids, in one transaction."""
+        slot, source = SOURCES_BY_TABLE[table]
+        docs = []
+        removed = [(_rowid(slot, id),) for id in deletes]
+        for row in upserts:
+            if source.include(row):
+                docs.append((_rowid(slot, row['id']), *source.document(row)))
+            else:
+                removed.append((_rowid(slot, row['id']),))
+
+        def op(conn):
+            conn.executemany('DELETE FROM search_docs WHERE rowid = ?', removed + [(doc[0],) for doc in docs])
+            conn.executemany('INSERT INTO search_docs (rowid, title, body, label) VALUES (?, ?, ?, ?)', docs)
+            conn.execute("INSERT INTO search_meta (key, value) VALUES ('generation', '1') "
+                         "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+        if docs or removed:
+            self._transaction(op)
+
+    def claim_check(self):
+        """True for at most one caller per FINGERPRINT_SECONDS among every process on the host."""
+        now = time.time()
+
+        def op(conn):
+            conn.execute("INSERT OR IGNORE INTO search_meta (key, value) VALUES ('checked_at', '0')")
+            return conn.execute("UPDATE search_meta SET value = ? WHERE key = 'checked_at' AND CAST(value AS REAL) <= ?",
+                                (str(now), now - FINGERPRINT_SECONDS)).rowcount == 1
+        return bool(self._transaction(op))
+
+    def replace_all(self, rows_by_table, fingerprint=None):
+        """
+        Swaps the whole index for the given rows in one transaction (searches see old or new, never
+        empty). `fingerprint` is the fingerprint_tables() value the rows were loaded at.
+        """
+        docs = []
+        for table, rows in rows_by_table.items():
+            slot, source = SOURCES_BY_TABLE[table]
+            docs.extend((_rowid(slot, row['id']), *source.document(row)) for row in rows if source.include(row))
+
+        def op(conn):
+            conn.execute('DELETE FROM search_docs')
+            conn.executemany('INSERT INTO search_docs (rowid, title, body, label) VALUES (?, ?, ?, ?)', docs)
+            conn.execute("INSERT INTO search_docs (search_docs) VALUES ('optimize')")
+            # Seeded from the clock so a recreated index file can't reuse an old generation
+            conn.executemany('INSERT OR REPLACE INTO search_meta (key, value) VALUES (?, ?)',
+                             [('version', str(INDEX_VERSION)), ('built_at', str(time.time())),
+                              ('generation', str(time.time_ns())), ('fingerprint', json.dumps(fingerprint))])
+            return len(docs)
+        return self._transaction(op)
+
+    def search(self, query_words, per_source=20):
+        """
+        {category: [(id, label, snippet_html, tokens)]} for every source, best bm25 match first and
+        at most `per_source` per category, from a single query. `tokens` are the document's words.
+        """
+        results = {category: [] for category in CATEGORIES}
+        expression = match_expression(query_words)
+        if not expression:
+            return results
+
+        def op(conn):
+            # snippet() can't share a SELECT with a window function, so rank first and join back
+            return conn.execute(f"""
+                WITH ranked AS (
+                    SELECT rowid AS doc, row_number() OVER (
+                        PARTITION BY rowid % {SOURCE_SLOTS}
+                        ORDER BY bm25(search_docs, {TITLE_WEIGHT}, {BODY_WEIGHT})) AS n
+                    FROM search_docs WHERE search_docs MATCH :q
+                )
+                SELECT search_docs.rowid, label,
+                       snippet(search_docs, 1, :open, :close, '…', {SNIPPET_TOKENS}), title, body
+                FROM ranked JOIN search_docs ON search_docs.rowid = ranked.doc
+                WHERE search_docs MATCH :q AND ranked.n <= :limit
+                ORDER BY ranked.doc % {SOURCE_SLOTS}, ranked.n
+            """, {'q': expression, 'open': _OPEN, 'close': _CLOSE, 'limit': per_source}).fetchall()
+
+        for rowid, label, snippet, title, body in self._run(op, default=[]):
+            source = SOURCES[rowid % SOURCE_SLOTS]
+            tokens = tuple(set(words(title)) | set(words(body)))
+            results[source.category].append((rowid // SOURCE_SLOTS, label, _snippet_html(snippet), tokens))
+        return results
+
+    def stats(self):
+        def op(conn):
+            docs = conn.execute('SELECT COUNT(*) FROM search_docs').fetchone()[0]
+            return {'path': self.path, 'documents': docs, 'version': self.meta('version'), 'built_at': self.meta('built_at')}
+        return self._run(op, default={'path': self.path})
+
+
+index = SearchIndex(os.environ.get('SEARCH_INDEX_PATH', '/tmp/anchoros-search.db'))
+
+
+def index_write(table, before=None, after=None):
+    """Write hook for SupabaseModel: indexes `after` rows, drops `before` rows that are gone."""
+    if table not in SOURCES_BY_TABLE:
+        return
+    after = after or []
+    kept = {row.get('id') for row in after}
+    deleted = [row['id'] for row in (before or []) if row.get('id') is not None and row['id'] not in kept]
+    index.apply(table, [row for row in after if row.get('id') is not None], deleted)
+
+
+def _narrowed(query_words, per_source, generation):
+    """
+    The results for query_words filtered out of a cached result for a broader query ('acm' for
+    'acme', 'acme' for 'acme plu'), or None. Only used when no category of the broader result
+    was cut off at per_source, since only then does it hold every match of the narrower query.
+    """
+    last = query_words[-1]
+    broader = [query_words[:-1] + [last[:n]] for n in range(len(last) - 1, 0, -1)]
+    if len(query_words) > 1:
+        broader.append(query_words[:-1])
+    for candidate in broader:
+        value, found = cache.get(_cache_key(candidate, per_source, generation))
+        if found and all(len(matches) < per_source for matches in value.values()):
+            return {category: [m for m in matches if _matches(query_words, m[3])] for category, matches in value.items()}
+    return None
+
+
+def _cache_key(query_words, per_source, generation):
+    return f"search:{generation}:{per_source}:{' '.join(query_words)}"
+
+
+def cached_search(q, per_source=20):
+    """
+    search() behind the process cache. Repeated queries are answered from the LRU, concurrent
+    identical queries share one execution (get_or_load), and a query that narrows a cached one
+    is answered by filtering that result. Keys include the index generation, so a write to the
+    index by any worker on the host moves every search to new keys (the old entries age out).
+    Result lists are shared with the cache and must not be modified. Also starts the periodic
+    check_freshness() for writes made outside this host.
+    """
+    query_words = words(q)
+    if not query_words:
+        return {category: [] for category in CATEGORIES}
+    check_freshness(current_app._get_current_object())
+    generation = index.generation()
+    return cache.get_or_load(_cache_key(query_words, per_source, generation),
+                             lambda: _narrowed(query_words, per_source, generation) or index.search(query_words, per_source),
+                             ttl=SEARCH_CACHE_TTL)
+
+
+def load_rows(table, columns):
+    """Every row of `table` (the given columns), a page at a time."""
+    from db_supabase import get_supabase, select_all
+    client = get_supabase()
+    return select_all(lambda: client.table(table).select(','.join(columns)))
+
+
+def fingerprint_tables():
+    """
+    [row count, latest updated_at] of each source table, like name_index.fingerprint_tables().
+    Tables without updated_at only contribute their row count.
+    """
+    from db_supabase import get_supabase, parallel_queries
+    client = get_supabase()
+    with parallel_queries() as q:
+        futures = [(q.submit(client.table(source.table).select('id', count='exact').limit(1)),
+                    q.submit(client.table(source.table).select('updated_at').filter('updated_at', 'not.is', 'null')
+                             .order('updated_at', desc=True).limit(1)) if source.updated_at else None)
+                   for source in SOURCES]
+    return [[count.result().count, (latest.result().data or [{}])[0].get('updated_at') if latest else None]
+            for count, latest in futures]
+
+
+def rebuild():
+    """Reloads every source table into the index. Returns the number of documents."""
+    from db_supabase import parallel_queries
+    started = time.monotonic()
+    # Taken before the rows, so a write landing during the load shows up at the next check
+    fingerprint = fingerprint_tables()
+    with parallel_queries() as q:
+        loads = {source.table: q.submit(load_rows, source.table, source.columns) for source in SOURCES}
+    count = index.replace_all({table: future.result() for table, future in loads.items()}, fingerprint)
+    logger.info(f"[Search] Indexed {count} documents in {time.monotonic() - started:.1f}s")
+    return count
+
+
+def _rebuild_in_background(app, only_if_changed=False):
+    def run():
+        try:
+            with app.app_context():
+                if not only_if_changed or json.dumps(fingerprint_tables()) != index.meta('fingerprint'):
+                    rebuild()
+        except Exception as e:
+            logger.warning(f"[Search] Could not build index: {e}")
+    threading.Thread(target=run, name='anchoros-search-index', daemon=True).start()
+
+
+_check_lock = threading.Lock()
+_next_check = 0
+
+
+def check_freshness(app):
+    """
+    Rebuilds the index in the background if fingerprint_tables() moved since the last rebuild,
+    which catches writes this host's hooks never saw. Runs at most once per FINGERPRINT_SECONDS
+    per process (cheap clock check) and per host (claim_check() in the index file).
+    """
+    global _next_check
+    now = time.monotonic()
+    with _check_lock:
+        if now < _next_check:
+            return
+        _next_check = now + FINGERPRINT_SECONDS
+    if index.claim_check():
+        _rebuild_in_background(app, only_if_changed=True)
+
+
+def init_app(app):
+    # A new host (or a changed SOURCES definition) starts with an empty index; fill it without delaying boot
+    if not index.is_current():
+        _rebuild_in_background(app)
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Rebuild the local full-text search index from the database."""
+        click.echo(f"Indexed {rebuild()} documents into {index.path}")
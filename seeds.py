@@ -0,0 +1,165 @@
+"""
+Default rows for AnchorOS (achievements, level/milestone/revenue rewards, reward shop items).
+They used to be checked with one get_first per default row on every gamification, rewards
+and battle pass page view. Now they are applied once per SEED_VERSION: at boot the runner
+reads the `seed_versions` row for the current version and, only if it is missing, claims it,
+reads the existing keys of each table in one parallel batch and bulk-inserts the missing
+defaults. Bump SEED_VERSION after changing SEEDS so the next deploy applies the new rows.
+`flask --app app seed` runs it by hand (`--force` re-applies the current version).
+"""
+
+import os
+import logging
+from datetime import timedelta
+import click
+import timezone as tz
+from db_supabase import (get_supabase, parallel_queries, Achievement, LevelReward, MilestoneReward,
+                         RevenueReward, RewardItem)
+
+logger = logging.getLogger(__name__)
+
+SEED_VERSION = 1
+# A claim still 'running' after this long is treated as abandoned (worker died mid-seed)
+STALE_CLAIM_SECONDS = 10 * 60
+
+
+class Seed:
+    """Default rows for one model, identified by `key` (existing rows with that key are left alone)."""
+
+    def __init__(self, model, key, rows, defaults=None):
+        self.model = model
+        self.key = key
+        self.rows = [{**(defaults or {}), **row} for row in rows]
+
+    def existing_keys(self):
+        keys = [row[self.key] for row in self.rows]
+        result = get_supabase().table(self.model.__tablename__).select(self.key).in_(self.key, keys).execute()
+        return {row[self.key] for row in (result.data or [])}
+
+    def missing(self, existing):
+        # Revenue targets come back as floats, so compare keys as strings of their numeric value
+        seen = {_key(value) for value in existing}
+        return [row for row in self.rows if _key(row[self.key]) not in seen]
+
+
+def _key(value):
+    return str(float(value)) if isinstance(value, (int, float)) else str(value)
+
+
+SEEDS = [
+    Seed(Achievement, 'key', [
+        {'key': 'streak_7', 'name': 'Week Warrior', 'description': 'Maintain a 7-day outreach streak'},
+        {'key': 'streak_30', 'name': 'Consistency King', 'description': 'Maintain a 30-day outreach streak'},
+        {'key': 'xp_1000', 'name': 'Rising Star', 'description': 'Earn 1,000 XP'},
+        {'key': 'xp_5000', 'name': 'Power Player', 'description': 'Earn 5,000 XP'},
+        {'key': 'outreach_100', 'name': 'Outreach Machine', 'description': 'Log 100 outreach activities'},
+        {'key': 'deals_10', 'name': 'Deal Closer', 'description': 'Close 10 deals'},
+    ]),
+    Seed(LevelReward, 'level_interval', [
+        {'level_interval': 2, 'reward_text': 'Bag of favourite lollies'},
+        {'level_interval': 5, 'reward_text': 'Small treat of your choice'},
+        {'level_interval': 10, 'reward_text': 'Full free day or special reward'},
+    ], defaults={'is_active': True}),
+    Seed(MilestoneReward, 'target_level', [
+        {'target_level': 10, 'reward_text': 'Take yourself out for sushi'},
+        {'target_level': 25, 'reward_text': 'Buy a small gift for yourself'},
+        {'target_level': 50, 'reward_text': 'Weekend getaway fund contribution'},
+    ], defaults={'is_active': True}),
+    Seed(RevenueReward, 'target_revenue', [
+        {'target_revenue': 1000, 'reward_text': 'Nice dinner out', 'reward_icon': 'utensils'},
+        {'target_revenue': 2500, 'reward_text': 'New pair of sneakers', 'reward_icon': 'shoe'},
+        {'target_revenue': 5000, 'reward_text': 'Weekend spa day', 'reward_icon': 'spa'},
+        {'target_revenue': 10000, 'reward_text': 'New tech gadget', 'reward_icon': 'laptop'},
+        {'target_revenue': 15000, 'reward_text': 'Designer item', 'reward_icon': 'star'},
+        {'target_revenue': 25000, 'reward_text': 'Weekend getaway trip', 'reward_icon': 'plane'},
+        {'target_revenue': 50000, 'reward_text': 'Luxury watch', 'reward_icon': 'watch'},
+        {'target_revenue': 75000, 'reward_text': 'High-end home upgrade', 'reward_icon': 'home'},
+        {'target_revenue': 100000, 'reward_text': 'Dream vacation package', 'reward_icon': 'globe'},
+        {'target_revenue': 150000, 'reward_text': 'Investment portfolio contribution', 'reward_icon': 'chart'},
+        {'target_revenue': 200000, 'reward_text': 'Luxury experience of choice', 'reward_icon': 'crown'},
+        {'target_revenue': 250000, 'reward_text': 'Major life upgrade fund', 'reward_icon': 'rocket'},
+        {'target_revenue': 300000, 'reward_text': 'McLaren MP4-12C Spider', 'reward_icon': 'car'},
+    ], defaults={'is_active': True}),
+    Seed(RewardItem, 'name', [
+        {'name': 'Bag of favourite lollies', 'cost': 8, 'description': 'Treat yourself to your favourite sweets'},
+        {'name': 'Coffee or drink', 'cost': 10, 'description': 'A nice coffee or beverage of your choice'},
+        {'name': '1 hour guilt-free gaming', 'cost': 12, 'description': 'Take a break and play your favourite game'},
+        {'name': 'Nice lunch treat', 'cost': 20, 'description': 'Enjoy a nice lunch out'},
+        {'name': 'Car care item', 'cost': 50, 'description': 'Something nice for your car'},
+        {'name': 'T-shirt', 'cost': 75, 'description': 'Buy yourself a new t-shirt'},
+    ], defaults={'is_active': True}),
+]
+
+
+def is_applied(version=SEED_VERSION):
+    result = get_supabase().table('seed_versions').select('version').eq('version', version).eq('status', 'done').execute()
+    return bool(result.data)
+
+
+def _claim(version):
+    """True if this process now owns the version (new row, or takeover of an abandoned one); other
+    workers booting at the same time skip seeding."""
+    row = {'version': version, 'status': 'running', 'applied_at': tz.now_iso()}
+    client = get_supabase()
+    result = client.table('seed_versions').upsert(row, on_conflict='version', ignore_duplicates=True).execute()
+    if result.data:
+        return True
+    cutoff = (tz.now() - timedelta(seconds=STALE_CLAIM_SECONDS)).isoformat()
+    taken = client.table('seed_versions').update({'applied_at': row['applied_at']}) \
+        .eq('version', version).eq('status', 'running').lt('applied_at', cutoff).execute()
+    return bool(taken.data)
+
+
+def apply_seeds():
+    """Inserts every missing default row, one key read and at most one bulk insert per table.
+    Returns {table: inserted count}."""
+    with parallel_queries() as q:
+        existing = [(seed, q.submit(seed.existing_keys)) for seed in SEEDS]
+    with parallel_queries() as q:
+        inserted = [(seed, q.submit(seed.model.insert_many, seed.missing(keys.result()))) for seed, keys in existing]
+    return {seed.model.__tablename__: len(rows.result()) for seed, rows in inserted}
+
+
+def run(force=False):
+    """Applies SEED_VERSION unless it already has been. Returns the apply_seeds() counts, or None if skipped."""
+    try:
+        if not force and is_applied():
+            return None
+        if not _claim(SEED_VERSION) and not force:
+            logger.info(f"[Seeds] Version {SEED_VERSION} is being applied by another worker")
+            return None
+    except Exception as e:
+        # seed_versions not created yet: seeding is idempotent, so apply without recording it
+        logger.warning(f"[Seeds] Could not read seed_versions, applying defaults unversioned: {e}")
+        return apply_seeds()
+
+    try:
+        counts = apply_seeds()
+    except Exception:
+        # Release the claim so the next boot retries
+        get_supabase().table('seed_versions').delete().eq('version', SEED_VERSION).execute()
+        raise
+    get_supabase().table('seed_versions').update({'status': 'done', 'applied_at': tz.now_iso()}) \
+        .eq('version', SEED_VERSION).execute()
+    logger.info(f"[Seeds] Applied version {SEED_VERSION}: {counts}")
+    return counts
+
+
+def init_app(app):
+    # SEED_ON_BOOT=0 when seeds are applied by `flask seed` in the deploy step instead
+    if os.environ.get('SEED_ON_BOOT', '1') != '0':
+        with app.app_context():
+            try:
+                run()
+            except Exception as e:
+                logger.warning(f"[Seeds] Could not apply seed version {SEED_VERSION}: {e}")
+
+    @app.cli.command('seed')
+    @click.option('--force', is_flag=True, help='Re-apply the current seed version')
+    def seed_command(force):
+        """Insert missing default rows."""
+        counts = run(force=force)
+        if counts is None:
+            click.echo(f"Seed version {SEED_VERSION} already applied")
+            return
+        click.echo(f"Seed version {SEED_VERSION}: " + ', '.join(f'{table} +{n}' for table, n in counts.items()))
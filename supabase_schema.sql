@@ -294,3 +294,252 @@ CREATE INDEX idx_tasks_due_date ON tasks(due_date);
 CREATE INDEX idx_outreach_logs_date ON outreach_logs(date);
 CREATE INDEX idx_activity_log_timestamp ON activity_log(timestamp);
 CREATE INDEX idx_daily_missions_date ON daily_missions(mission_date);
+
+-- Analytics aggregates: whole bucketed series in one call via client.rpc().
+-- Python fallbacks with identical results live in aggregates.py.
+CREATE OR REPLACE FUNCTION analytics_weekly_outreach(p_start DATE, p_weeks INTEGER)
+RETURNS TABLE (bucket_start DATE, outreach_count BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT p_start + i * 7, COUNT(o.id)
+    FROM generate_series(0, p_weeks - 1) AS i
+    LEFT JOIN outreach_logs o ON o.date >= p_start + i * 7 AND o.date < p_start + (i + 1) * 7
+    GROUP BY i
+    ORDER BY i;
+$$;
+
+CREATE OR REPLACE FUNCTION analytics_weekly_deals(p_start DATE, p_weeks INTEGER,
+                                                  p_niche TEXT DEFAULT NULL, p_source TEXT DEFAULT NULL)
+RETURNS TABLE (bucket_start DATE, deal_count BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT p_start + i * 7, COUNT(l.id)
+    FROM generate_series(0, p_weeks - 1) AS i
+    LEFT JOIN leads l ON l.status = 'closed_won'
+        AND l.updated_at >= p_start + i * 7 AND l.updated_at < p_start + (i + 1) * 7
+        AND (p_niche IS NULL OR l.niche = p_niche)
+        AND (p_source IS NULL OR l.source = p_source)
+    GROUP BY i
+    ORDER BY i;
+$$;
+
+CREATE OR REPLACE FUNCTION analytics_monthly_revenue(p_start DATE, p_months INTEGER)
+RETURNS TABLE (bucket_start DATE, project_revenue NUMERIC, freelance_revenue NUMERIC,
+               hosting_mrr NUMERIC, saas_mrr NUMERIC)
+LANGUAGE sql STABLE AS $$
+    WITH months AS (
+        SELECT i,
+               (date_trunc('month', p_start) + make_interval(months => i))::date AS m_start,
+               (date_trunc('month', p_start) + make_interval(months => i + 1))::date AS m_next
+        FROM generate_series(0, p_months - 1) AS i
+    )
+    SELECT m.m_start,
+        COALESCE((SELECT SUM(c.amount_charged) FROM clients c
+                  WHERE c.start_date >= m.m_start AND c.start_date < m.m_next), 0),
+        COALESCE((SELECT SUM(f.amount) FROM freelance_jobs f
+                  WHERE f.date_completed >= m.m_start AND f.date_completed < m.m_next), 0),
+        COALESCE((SELECT SUM(c.monthly_hosting_fee) FROM clients c
+                  WHERE c.hosting_active AND c.start_date < m.m_next), 0),
+        COALESCE((SELECT SUM(c.monthly_saas_fee) FROM clients c
+                  WHERE c.saas_active AND c.start_date < m.m_next), 0)
+    FROM months m
+    ORDER BY m.i;
+$$;
+
+CREATE OR REPLACE FUNCTION analytics_lead_pipeline(p_niche TEXT DEFAULT NULL, p_source TEXT DEFAULT NULL)
+RETURNS TABLE (status VARCHAR, lead_count BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT l.status, COUNT(*)
+    FROM leads l
+    WHERE l.converted_at IS NULL
+        AND (p_niche IS NULL OR l.niche = p_niche)
+        AND (p_source IS NULL OR l.source = p_source)
+    GROUP BY l.status;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_leads_updated_at ON leads(updated_at);
+CREATE INDEX IF NOT EXISTS idx_clients_start_date ON clients(start_date);
+CREATE INDEX IF NOT EXISTS idx_freelance_jobs_date_completed ON freelance_jobs(date_completed);
+
+-- Daily rollup maintained by metrics.py (per-day deltas applied by daily_metrics_add on model
+-- writes; the nightly `daily_metrics` job and `flask --app app rebuild-metrics` recompute it
+-- from the raw tables)
+CREATE TABLE IF NOT EXISTS daily_metrics (
+    date DATE PRIMARY KEY,
+    outreach_count INTEGER NOT NULL DEFAULT 0,
+    outreach_by_type JSONB NOT NULL DEFAULT '{}',
+    outreach_by_outcome JSONB NOT NULL DEFAULT '{}',
+    leads_created INTEGER NOT NULL DEFAULT 0,
+    deals_won INTEGER NOT NULL DEFAULT 0,
+    deals_lost INTEGER NOT NULL DEFAULT 0,
+    clients_started INTEGER NOT NULL DEFAULT 0,
+    project_revenue NUMERIC(12, 2) NOT NULL DEFAULT 0,
+    freelance_revenue NUMERIC(12, 2) NOT NULL DEFAULT 0,
+    xp_earned INTEGER NOT NULL DEFAULT 0,
+    tokens_earned INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Adds two {key: count} objects key by key, dropping keys that reach zero
+CREATE OR REPLACE FUNCTION jsonb_add_counts(a JSONB, b JSONB)
+RETURNS JSONB
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT COALESCE(jsonb_object_agg(key, total), '{}'::JSONB)
+    FROM (
+        SELECT key, SUM(value::INTEGER) AS total
+        FROM (SELECT * FROM jsonb_each_text(COALESCE(a, '{}'::JSONB))
+              UNION ALL
+              SELECT * FROM jsonb_each_text(COALESCE(b, '{}'::JSONB))) e
+        GROUP BY key
+        HAVING SUM(value::INTEGER) <> 0
+    ) t;
+$$;
+
+-- Applies per-day deltas ([{"date", "<column>": delta, "outreach_by_type": {key: delta}, ...}],
+-- one element per date; missing columns add nothing) in one statement. Each day row is updated
+-- in place under its row lock, so concurrent writers never overwrite each other's counts.
+CREATE OR REPLACE FUNCTION daily_metrics_add(p_deltas JSONB)
+RETURNS VOID
+LANGUAGE sql AS $$
+    INSERT INTO daily_metrics AS m (date, outreach_count, outreach_by_type, outreach_by_outcome, leads_created,
+                                    deals_won, deals_lost, clients_started, project_revenue, freelance_revenue,
+                                    xp_earned, tokens_earned, updated_at)
+    SELECT (d->>'date')::DATE,
+           COALESCE((d->>'outreach_count')::INTEGER, 0),
+           jsonb_add_counts(NULL, d->'outreach_by_type'),
+           jsonb_add_counts(NULL, d->'outreach_by_outcome'),
+           COALESCE((d->>'leads_created')::INTEGER, 0),
+           COALESCE((d->>'deals_won')::INTEGER, 0),
+           COALESCE((d->>'deals_lost')::INTEGER, 0),
+           COALESCE((d->>'clients_started')::INTEGER, 0),
+           COALESCE((d->>'project_revenue')::NUMERIC, 0),
+           COALESCE((d->>'freelance_revenue')::NUMERIC, 0),
+           COALESCE((d->>'xp_earned')::INTEGER, 0),
+           COALESCE((d->>'tokens_earned')::INTEGER, 0),
+           NOW()
+    FROM jsonb_array_elements(p_deltas) d
+    ON CONFLICT (date) DO UPDATE SET
+        outreach_count = m.outreach_count + EXCLUDED.outreach_count,
+        outreach_by_type = jsonb_add_counts(m.outreach_by_type, EXCLUDED.outreach_by_type),
+        outreach_by_outcome = jsonb_add_counts(m.outreach_by_outcome, EXCLUDED.outreach_by_outcome),
+        leads_created = m.leads_created + EXCLUDED.leads_created,
+        deals_won = m.deals_won + EXCLUDED.deals_won,
+        deals_lost = m.deals_lost + EXCLUDED.deals_lost,
+        clients_started = m.clients_started + EXCLUDED.clients_started,
+        project_revenue = m.project_revenue + EXCLUDED.project_revenue,
+        freelance_revenue = m.freelance_revenue + EXCLUDED.freelance_revenue,
+        xp_earned = m.xp_earned + EXCLUDED.xp_earned,
+        tokens_earned = m.tokens_earned + EXCLUDED.tokens_earned,
+        updated_at = NOW();
+$$;
+
+-- One row per scheduled job run (scheduler.py); the primary key makes each period's run
+-- claimable by exactly one worker
+CREATE TABLE IF NOT EXISTS scheduler_runs (
+    job_name VARCHAR(50) NOT NULL,
+    run_key VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'running',
+    owner VARCHAR(100),
+    claimed_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMP,
+    error TEXT,
+    PRIMARY KEY (job_name, run_key)
+);
+
+-- Atomic XP / token counters (UserStats.add_xp, UserTokens.change_tokens). Each call locks the
+-- single counter row, applies every entry of p_entries ([{"amount", "reason", "created_at"}]),
+-- writes one log row per entry and returns the new values, so concurrent requests never lose
+-- an increment.
+CREATE OR REPLACE FUNCTION gamification_add_xp(p_entries JSONB, p_thresholds JSONB)
+RETURNS TABLE (current_xp INTEGER, current_level INTEGER, previous_level INTEGER)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    v_id INTEGER;
+    v_xp INTEGER;
+    v_previous INTEGER;
+    v_level INTEGER;
+BEGIN
+    SELECT s.id, COALESCE(s.current_xp, 0), COALESCE(s.current_level, 1) INTO v_id, v_xp, v_previous
+    FROM user_stats s ORDER BY s.id LIMIT 1 FOR UPDATE;
+    IF v_id IS NULL THEN
+        INSERT INTO user_stats (current_xp, current_level, current_outreach_streak_days, longest_outreach_streak_days)
+        VALUES (0, 1, 0, 0) RETURNING id INTO v_id;
+        v_xp := 0;
+        v_previous := 1;
+    END IF;
+
+    SELECT v_xp + COALESCE(SUM((e->>'amount')::INTEGER), 0) INTO v_xp FROM jsonb_array_elements(p_entries) e;
+    SELECT GREATEST(1, COUNT(*)::INTEGER) INTO v_level
+    FROM jsonb_array_elements_text(p_thresholds) t WHERE t::INTEGER <= v_xp;
+
+    UPDATE user_stats SET current_xp = v_xp, current_level = v_level WHERE id = v_id;
+    INSERT INTO xp_logs (amount, reason, created_at)
+    SELECT (e->>'amount')::INTEGER, e->>'reason', COALESCE((e->>'created_at')::TIMESTAMP, NOW())
+    FROM jsonb_array_elements(p_entries) e;
+
+    RETURN QUERY SELECT v_xp, v_level, v_previous;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION gamification_add_tokens(p_entries JSONB, p_require_balance BOOLEAN DEFAULT FALSE)
+RETURNS TABLE (total_tokens INTEGER, applied BOOLEAN)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    v_id INTEGER;
+    v_total INTEGER;
+    v_amount INTEGER;
+BEGIN
+    SELECT t.id, COALESCE(t.total_tokens, 0) INTO v_id, v_total
+    FROM user_tokens t ORDER BY t.id LIMIT 1 FOR UPDATE;
+    IF v_id IS NULL THEN
+        INSERT INTO user_tokens (total_tokens) VALUES (0) RETURNING id INTO v_id;
+        v_total := 0;
+    END IF;
+
+    SELECT COALESCE(SUM((e->>'amount')::INTEGER), 0) INTO v_amount FROM jsonb_array_elements(p_entries) e;
+    IF p_require_balance AND v_total + v_amount < 0 THEN
+        RETURN QUERY SELECT v_total, FALSE;
+        RETURN;
+    END IF;
+
+    UPDATE user_tokens SET total_tokens = v_total + v_amount, updated_at = NOW() WHERE id = v_id;
+    INSERT INTO token_transactions (amount, reason, created_at)
+    SELECT (e->>'amount')::INTEGER, e->>'reason', COALESCE((e->>'created_at')::TIMESTAMP, NOW())
+    FROM jsonb_array_elements(p_entries) e;
+
+    RETURN QUERY SELECT v_total + v_amount, TRUE;
+END;
+$$;
+
+-- Periodic rewards already granted (goal bonuses), one row per rule and period
+-- ('daily_goal' / '2026-10-18', 'weekly_goal' / '2026-W42', 'monthly_revenue_goal' / '2026-10').
+-- RewardGrant.claim() inserts with ON CONFLICT DO NOTHING, so only one request grants each period.
+CREATE TABLE IF NOT EXISTS reward_grants (
+    rule VARCHAR(50) NOT NULL,
+    period VARCHAR(20) NOT NULL,
+    granted_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (rule, period)
+);
+
+-- Backfill from the xp_logs rows that used to mark these grants
+INSERT INTO reward_grants (rule, period, granted_at)
+SELECT 'daily_goal', to_char(created_at, 'YYYY-MM-DD'), MIN(created_at)
+FROM xp_logs WHERE reason = 'Daily outreach goal hit!' GROUP BY 2
+ON CONFLICT DO NOTHING;
+
+INSERT INTO reward_grants (rule, period, granted_at)
+SELECT 'weekly_goal', to_char(created_at, 'IYYY-"W"IW'), MIN(created_at)
+FROM xp_logs WHERE reason = 'Weekly outreach goal hit!' GROUP BY 2
+ON CONFLICT DO NOTHING;
+
+INSERT INTO reward_grants (rule, period, granted_at)
+SELECT 'monthly_revenue_goal', to_char(created_at, 'YYYY-MM'), MIN(created_at)
+FROM xp_logs WHERE reason = 'Monthly revenue goal hit!' GROUP BY 2
+ON CONFLICT DO NOTHING;
+
+-- Default-row seed versions applied by seeds.py (one row per SEED_VERSION, claimed before seeding)
+CREATE TABLE IF NOT EXISTS seed_versions (
+    version INTEGER PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'running',
+    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
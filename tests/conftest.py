@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep the host-local files written by model hooks out of the real locations
+os.environ.setdefault('SEARCH_INDEX_PATH', os.path.join(tempfile.mkdtemp(prefix='anchoros-tests-'), 'search.db'))
+os.environ.setdefault('SCHEDULER_ENABLED', '0')
+os.environ.setdefault('CACHE_BACKEND', 'memory')
+
+
+@pytest.fixture
+def db():
+    """A fresh in-memory SQLite stand-in built from schema.sql, installed as the models' client."""
+    import db_supabase
+    from db_postgres import create_sqlite_client
+    from cache import cache
+    client = create_sqlite_client(':memory:', os.path.join(ROOT, 'schema.sql'))
+    db_supabase.set_client(client)
+    cache.clear()
+    yield client
+    cache.clear()
+    db_supabase.set_client(None)
+    client.close()
@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+import pytest
+
+import aggregates
+from aggregates import compare_aggregates, weekly_deal_counts, lead_pipeline_counts
+
+WEEK_START = date(2026, 7, 6)
+MONTH_START = date(2026, 5, 1)
+
+
+@pytest.fixture
+def analytics_db(db):
+    aggregates._unavailable_rpcs.clear()
+    for day in (0, 1, 8, 15, 15, 40, 83, 84):
+        db.table('outreach_logs').insert({'date': (WEEK_START + timedelta(days=day)).isoformat(),
+                                          'type': 'email', 'outcome': 'contacted'}).execute()
+    leads = [
+        ('Won early', 'closed_won', 'cafe', 'cold', '2026-07-06T09:00:00', None),
+        ('Won later', 'closed_won', 'gym', 'referral', '2026-08-20T17:30:00', '2026-08-20T17:30:00'),
+        ('Won cafe', 'closed_won', 'cafe', 'referral', '2026-09-27T23:59:00', None),
+        ('Won before range', 'closed_won', 'cafe', 'cold', '2026-06-30T12:00:00', None),
+        ('Contacted', 'contacted', 'cafe', 'cold', '2026-07-10T10:00:00', None),
+        ('New', 'new', 'gym', 'referral', '2026-07-11T10:00:00', None),
+        ('Lost', 'closed_lost', 'cafe', 'cold', '2026-07-12T10:00:00', None),
+    ]
+    for name, status, niche, source, updated_at, converted_at in leads:
+        db.table('leads').insert({'name': name, 'status': status, 'niche': niche, 'source': source,
+                                  'updated_at': updated_at, 'converted_at': converted_at}).execute()
+    clients = [
+        ('2026-04-20', 1000, True, 30, False, 0),
+        ('2026-05-15', 1500.5, True, 25, True, 49.99),
+        ('2026-07-31', 800, False, 30, True, 20),
+        ('2026-09-01', 0, True, 15, False, 10),
+        ('2027-06-01', 400, True, 99, True, 99),
+    ]
+    for start, amount, hosting, hosting_fee, saas, saas_fee in clients:
+        db.table('clients').insert({'name': start, 'start_date': start, 'amount_charged': amount,
+                                    'hosting_active': hosting, 'monthly_hosting_fee': hosting_fee,
+                                    'saas_active': saas, 'monthly_saas_fee': saas_fee}).execute()
+    for completed, amount in (('2026-05-01', 250), ('2026-06-30', 99.95), ('2026-06-30', 0.05), ('2026-11-12', 300)):
+        db.table('freelance_jobs').insert({'title': 'Job', 'amount': amount, 'date_completed': completed}).execute()
+    return db
+
+
+def test_rpc_and_fallback_agree(analytics_db):
+    assert compare_aggregates(WEEK_START, MONTH_START) == {}
+    # Both paths really ran: no RPC was found missing and skipped
+    assert aggregates._unavailable_rpcs == set()
+
+
+def test_rpc_and_fallback_agree_with_filters(analytics_db):
+    for niche, source in (('cafe', None), (None, 'referral'), ('cafe', 'referral'), ('none', None)):
+        assert weekly_deal_counts.uncached(WEEK_START, 12, niche, source, use_rpc=True) == \
+            weekly_deal_counts.uncached(WEEK_START, 12, niche, source, use_rpc=False)
+        assert lead_pipeline_counts.uncached(niche, source, use_rpc=True) == \
+            lead_pipeline_counts.uncached(niche, source, use_rpc=False)
+
+
+def test_series_values(analytics_db):
+    assert aggregates.weekly_outreach_counts.uncached(WEEK_START, 12) == [2, 1, 2, 0, 0, 1, 0, 0, 0, 0, 0, 1]
+    assert weekly_deal_counts.uncached(WEEK_START, 12) == [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1]
+    revenue = aggregates.monthly_revenue_series.uncached(MONTH_START, 3)
+    assert revenue == {
+        'project_revenue': [1500.5, 0, 800.0],
+        'freelance_revenue': [250.0, 100.0, 0],
+        'hosting_mrr': [55.0, 55.0, 55.0],
+        'saas_mrr': [49.99, 49.99, 69.99],
+    }
+    assert lead_pipeline_counts.uncached() == {'closed_won': 3, 'contacted': 1, 'new': 1, 'closed_lost': 1}
+
+
+def test_empty_tables_agree(db):
+    aggregates._unavailable_rpcs.clear()
+    assert compare_aggregates(WEEK_START, MONTH_START) == {}
+    assert aggregates.weekly_outreach_counts.uncached(WEEK_START, 4) == [0, 0, 0, 0]
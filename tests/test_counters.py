@@ -0,0 +1,62 @@
+import pytest
+from flask import Flask
+
+import db_supabase
+from db_supabase import UserStats, UserTokens, _identity_map
+
+COUNTER_RPCS = ('gamification_add_xp', 'gamification_add_tokens')
+
+
+@pytest.fixture(params=['rpc', 'fallback'])
+def counters(request, db, monkeypatch):
+    """The SQLite stand-in with the counter functions installed, or without them (schema not migrated)."""
+    db_supabase._unavailable_counter_rpcs.clear()
+    if request.param == 'fallback':
+        for fn in COUNTER_RPCS:
+            monkeypatch.delitem(db._functions, fn)
+    yield request.param
+    db_supabase._unavailable_counter_rpcs.clear()
+
+
+def rows(db, table):
+    return db.table(table).select('*').order('id').execute().data
+
+
+def test_add_xp(db, counters):
+    assert UserStats.add_xp([{'amount': 100, 'reason': 'a'}, {'amount': 60, 'reason': 'b'}]) == (160, 2, 1)
+    assert UserStats.add_xp([{'amount': 5, 'reason': 'c'}]) == (165, 2, 2)
+    stats = rows(db, 'user_stats')
+    assert len(stats) == 1 and stats[0]['current_xp'] == 165 and stats[0]['current_level'] == 2
+    assert [(r['amount'], r['reason']) for r in rows(db, 'xp_logs')] == [(100, 'a'), (60, 'b'), (5, 'c')]
+    expected = {'gamification_add_xp'} if counters == 'fallback' else set()
+    assert db_supabase._unavailable_counter_rpcs == expected
+
+
+def test_tokens(db, counters):
+    assert UserTokens.add_tokens(10, 'earned') == 10
+    assert UserTokens.spend_tokens(4, 'spent') is True
+    # Not enough left: nothing is applied or logged
+    assert UserTokens.spend_tokens(7, 'too much') is False
+    assert UserTokens.get_balance() == 6
+    assert [(r['amount'], r['reason']) for r in rows(db, 'token_transactions')] == [(10, 'earned'), (-4, 'spent')]
+
+
+def test_counter_row_is_reread_after_update_in_request(db, counters):
+    with Flask(__name__).test_request_context('/'):
+        stats = UserStats.get_stats()
+        assert UserStats.get_by_id(stats.id).current_xp == 0
+        assert ('user_stats', stats.id) in _identity_map()
+        UserStats.add_xp([{'amount': 40, 'reason': 'x'}])
+        assert UserStats.get_by_id(stats.id).current_xp == 40
+
+
+def test_transient_rpc_error_is_raised_and_keeps_the_rpc(db, monkeypatch):
+    db_supabase._unavailable_counter_rpcs.clear()
+
+    def fail(cur, params):
+        raise RuntimeError('connection reset')
+    monkeypatch.setitem(db._functions, 'gamification_add_tokens', fail)
+    with pytest.raises(RuntimeError):
+        UserTokens.add_tokens(5, 'x')
+    assert db_supabase._unavailable_counter_rpcs == set()
+    assert rows(db, 'token_transactions') == []
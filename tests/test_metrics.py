@@ -0,0 +1,103 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+import metrics
+from db_supabase import OutreachLog, Lead, Client, FreelancingIncome, UserStats
+
+
+@pytest.fixture
+def rollup(db, monkeypatch):
+    """The SQLite stand-in with daily_metrics_add installed and the rollup treated as built."""
+    monkeypatch.setattr(metrics, '_missing', False)
+    monkeypatch.setattr(metrics, '_ready', True)
+    return db
+
+
+def rollup_rows(db):
+    """daily_metrics as {day: {column: value}} without zero values or empty days."""
+    result = {}
+    for day, values in metrics.daily(date(2000, 1, 1)).items():
+        kept = {column: (float(value) if isinstance(value, Decimal) else value)
+                for column, value in values.items() if value}
+        if kept:
+            result[day] = kept
+    return result
+
+
+def test_deltas_for_insert_update_and_delete():
+    row = {'id': 1, 'date': '2026-10-12', 'type': 'email', 'outcome': 'contacted'}
+    assert metrics._deltas('outreach_logs', None, [row]) == {
+        date(2026, 10, 12): {'outreach_count': 1, 'outreach_by_type': {'email': 1}, 'outreach_by_outcome': {'contacted': 1}}}
+    moved = {**row, 'date': '2026-10-13', 'outcome': 'booked_call'}
+    assert metrics._deltas('outreach_logs', [row], [moved]) == {
+        date(2026, 10, 12): {'outreach_count': -1, 'outreach_by_type': {'email': -1}, 'outreach_by_outcome': {'contacted': -1}},
+        date(2026, 10, 13): {'outreach_count': 1, 'outreach_by_type': {'email': 1}, 'outreach_by_outcome': {'booked_call': 1}}}
+    assert metrics._deltas('outreach_logs', [row], None) == {
+        date(2026, 10, 12): {'outreach_count': -1, 'outreach_by_type': {'email': -1}, 'outreach_by_outcome': {'contacted': -1}}}
+
+
+def test_deltas_only_keep_what_changed():
+    lead = {'id': 1, 'created_at': '2026-10-01T09:00:00', 'closed_at': None, 'status': 'contacted'}
+    won = {**lead, 'status': 'closed_won', 'closed_at': '2026-10-18T15:00:00+13:00'}
+    assert metrics._deltas('leads', [lead], [won]) == {date(2026, 10, 18): {'deals_won': 1}}
+    assert metrics._deltas('leads', [lead], [dict(lead)]) == {}
+    client = {'id': 1, 'start_date': '2026-09-30', 'amount_charged': '1500.00'}
+    assert metrics._deltas('clients', [client], [{**client, 'amount_charged': 1750}]) == {
+        date(2026, 9, 30): {'project_revenue': Decimal(250)}}
+    # Spending tokens never counts as tokens earned
+    assert metrics._deltas('token_transactions', None, [{'id': 1, 'created_at': '2026-10-18', 'amount': -5}]) == {}
+
+
+def test_record_write_skips_unchanged_rows(rollup, monkeypatch):
+    calls = []
+    monkeypatch.setattr(metrics, '_apply', calls.append)
+    row = {'id': 1, 'date_completed': '2026-10-01', 'amount': 99}
+    metrics.record_write('freelance_jobs', [row], [dict(row)])
+    metrics.record_write('notes', None, [{'id': 1}])
+    assert calls == []
+    metrics.record_write('freelance_jobs', None, [row])
+    assert calls == [{date(2026, 10, 1): {'freelance_revenue': Decimal(99)}}]
+
+
+def test_model_writes_keep_the_rollup_equal_to_a_rebuild(rollup):
+    metrics.rebuild()
+    log = OutreachLog.insert({'date': '2026-10-12', 'type': 'email', 'outcome': 'contacted'})
+    OutreachLog.insert({'date': '2026-10-12', 'type': 'call', 'outcome': 'no_reply'})
+    OutreachLog.update_by_id(log.id, {'date': '2026-10-14', 'outcome': 'booked_call'})
+    lead = Lead.insert({'name': 'Acme', 'status': 'contacted', 'created_at': '2026-10-10T10:00:00'})
+    Lead.update_by_id(lead.id, {'status': 'closed_won', 'closed_at': '2026-10-15T12:00:00'})
+    gone = Lead.insert({'name': 'Gone', 'status': 'new', 'created_at': '2026-10-11T10:00:00'})
+    Lead.delete_by_id(gone.id)
+    client = Client.insert({'name': 'Acme', 'start_date': '2026-10-15', 'amount_charged': 1200})
+    Client.update_by_id(client.id, {'amount_charged': 1350.5})
+    FreelancingIncome.insert({'title': 'Shoot', 'amount': 250, 'date_completed': '2026-10-16'})
+    UserStats.add_xp([{'amount': 25, 'reason': 'x', 'created_at': '2026-10-16T08:00:00'}])
+
+    incremental = rollup_rows(rollup)
+    assert incremental[date(2026, 10, 12)] == {'outreach_count': 1, 'outreach_by_type': {'call': 1},
+                                               'outreach_by_outcome': {'no_reply': 1}}
+    assert incremental[date(2026, 10, 15)] == {'deals_won': 1, 'clients_started': 1, 'project_revenue': 1350.5}
+    metrics.rebuild()
+    assert rollup_rows(rollup) == incremental
+
+
+def test_missing_function_switches_to_raw_tables(db, monkeypatch):
+    monkeypatch.setattr(metrics, '_missing', False)
+    monkeypatch.delitem(db._functions, 'daily_metrics_add')
+    OutreachLog.insert({'date': '2026-10-12', 'type': 'email', 'outcome': 'contacted'})
+    assert metrics._missing is True
+    assert metrics.source_columns('leads') == ()
+    assert metrics.rollup_ready() is False
+    assert metrics.daily(date(2026, 10, 1))[date(2026, 10, 12)]['outreach_count'] == 1
+
+
+def test_rebuild_prunes_only_stale_days_in_range(rollup):
+    FreelancingIncome.insert({'title': 'Shoot', 'amount': 250, 'date_completed': '2026-10-16'})
+    for day in ('2026-01-05', '2026-10-01'):
+        rollup.table('daily_metrics').insert({'date': day, 'outreach_count': 3}).execute()
+    metrics.rebuild(date(2026, 10, 1), date(2026, 10, 31))
+    assert set(rollup_rows(rollup)) == {date(2026, 1, 5), date(2026, 10, 16)}
+    metrics.rebuild()
+    assert set(rollup_rows(rollup)) == {date(2026, 10, 16)}
@@ -0,0 +1,64 @@
+from datetime import date
+
+from revenue import RevenueSeries, current_mrr
+
+
+def client(start, amount=0, hosting=None, saas=None):
+    return {'start_date': start, 'amount_charged': amount,
+            'hosting_active': hosting is not None, 'monthly_hosting_fee': hosting or 30,
+            'saas_active': saas is not None, 'monthly_saas_fee': saas or 20}
+
+
+def test_client_starting_mid_month_counts_from_its_start_month():
+    series = RevenueSeries([client('2026-03-17', 1200, hosting=30, saas=20)]).series(date(2026, 2, 1), 3)
+    assert series['months'] == [date(2026, 2, 1), date(2026, 3, 1), date(2026, 4, 1)]
+    assert series['project_revenue'] == [0, 1200.0, 0]
+    assert series['new_clients'] == [0, 1, 0]
+    # Recurring fees apply to the whole start month and every month after it
+    assert series['hosting_mrr'] == [0, 30.0, 30.0]
+    assert series['saas_mrr'] == [0, 20.0, 20.0]
+    assert series['total'] == [0, 1250.0, 50.0]
+
+
+def test_inactive_hosting_and_saas_are_not_recurring_revenue():
+    clients = [client('2026-01-10', 500), client('2026-01-20', 700, saas=15)]
+    series = RevenueSeries(clients).series(date(2026, 1, 1), 2)
+    assert series['project_revenue'] == [1200.0, 0]
+    assert series['hosting_mrr'] == [0, 0]
+    assert series['saas_mrr'] == [15.0, 15.0]
+    assert current_mrr(clients) == (0, 15.0)
+
+
+def test_empty_dataset():
+    revenue = RevenueSeries()
+    series = revenue.series(date(2026, 11, 15), 3)
+    assert series['labels'] == ['Nov 2026', 'Dec 2026', 'Jan 2027']
+    for name in ('project_revenue', 'new_clients', 'hosting_mrr', 'saas_mrr', 'mrr', 'freelance_revenue', 'total'):
+        assert series[name] == [0, 0, 0]
+    assert revenue.month(date(2026, 11, 15))['total'] == 0
+    assert revenue.totals() == {'project_revenue': 0, 'freelance_revenue': 0, 'lifetime_revenue': 0}
+    assert current_mrr([]) == (0, 0)
+
+
+def test_trailing_three_months_excludes_the_current_month():
+    clients = [client('2026-06-30', 100, hosting=10), client('2026-09-01', 400), client('2026-10-05', 900)]
+    jobs = [{'amount': 50, 'date_completed': '2026-07-15'}, {'amount': 25, 'date_completed': '2026-10-18'}]
+    trailing = RevenueSeries(clients, jobs).trailing(date(2026, 10, 18), 3)
+    assert trailing['months'] == [date(2026, 7, 1), date(2026, 8, 1), date(2026, 9, 1)]
+    assert trailing['project_revenue'] == [0, 0, 400.0]
+    assert trailing['freelance_revenue'] == [50.0, 0, 0]
+    # Started before the window, so its MRR is carried into the first month
+    assert trailing['hosting_mrr'] == [10.0, 10.0, 10.0]
+    assert trailing['total'] == [60.0, 10.0, 410.0]
+
+
+def test_trailing_window_across_a_year_boundary():
+    trailing = RevenueSeries([client('2025-11-03', 300)]).trailing(date(2026, 1, 2), 3)
+    assert trailing['labels'] == ['Oct 2025', 'Nov 2025', 'Dec 2025']
+    assert trailing['project_revenue'] == [0, 300.0, 0]
+
+
+def test_undated_rows_only_count_in_totals():
+    revenue = RevenueSeries([client(None, 250, hosting=30)], [{'amount': '19.99', 'date_completed': None}])
+    assert revenue.series(date(2026, 1, 1), 1)['total'] == [0]
+    assert revenue.totals() == {'project_revenue': 250.0, 'freelance_revenue': 19.99, 'lifetime_revenue': 269.99}
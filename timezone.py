@@ -51,6 +51,11 @@ def start_of_month(d=None):
         d = today()
     return date(d.year, d.month, 1)
 
+def add_months(d, months):
+    """First day of the month `months` after (or before, if negative) the month of d."""
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
 def parse_datetime_to_local(value):
     if value is None:
         return None
@@ -70,19 +75,26 @@ def parse_datetime_to_local(value):
             return None
     return None
 
+def local_date(dt):
+    """Calendar date of a datetime in the app timezone (UTC timestamps can fall on the previous day)."""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.date()
+    return dt.astimezone(_FIXED_OFFSET).date()
+
 def parse_date_only(value):
+    """The calendar day of a date, datetime or ISO string ('YYYY-MM-DD' plus any time part), or None."""
     if value is None:
         return None
-    if isinstance(value, date) and not isinstance(value, datetime):
-        return value
     if isinstance(value, datetime):
         return value.date()
-    if isinstance(value, str):
-        try:
-            return date.fromisoformat(value.split('T')[0])
-        except:
-            return None
-    return None
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
 
 def format_datetime(dt, fmt='%Y-%m-%d %H:%M'):
     if dt is None: